@@ -1,17 +1,225 @@
+import atexit
 import sqlite3
 import json
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
 DB_FILE = "backend/research.db"
 
+PRICE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _downsample_ohlc(arrays, max_bars):
+    """Merge runs of consecutive bars into max_bars OHLC buckets."""
+    n = len(arrays['timestamp'])
+    step = -(-n // max_bars)  # ceil
+    starts = np.arange(0, n, step)
+    ends = np.minimum(starts + step, n) - 1
+    return {
+        'timestamp': arrays['timestamp'][starts],
+        'open': arrays['open'][starts],
+        'high': np.maximum.reduceat(arrays['high'], starts),
+        'low': np.minimum.reduceat(arrays['low'], starts),
+        'close': arrays['close'][ends],
+        'volume': np.add.reduceat(arrays['volume'], starts),
+    }
+
+
+class WriteBatcher:
+    """Groups inserts into transactions instead of one connect/commit per row.
+
+    Statements are queued with add() and written in one transaction (runs
+    of the same SQL go through executemany) once max_rows are pending or
+    max_seconds have passed since the last flush. With background=True a
+    daemon thread also flushes on that interval, so a quiet writer (live
+    trades) doesn't hold rows indefinitely.
+
+    With atomic=True a flush is all or nothing: no row is ever left out,
+    so statements queued together (e.g. a result and the mark saying it
+    was produced) commit together or not at all.
+
+    The connection runs in WAL mode so readers aren't blocked by the
+    writer. Pending rows are flushed on close(), when leaving a `with`
+    block (also on exceptions) and at interpreter exit.
+    """
+
+    def __init__(self, db_file=DB_FILE, max_rows=200, max_seconds=5.0, background=False,
+                 atomic=False):
+        self.db_file = db_file
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.atomic = atomic
+        self._pending = []
+        self._lock = threading.RLock()
+        self._last_flush = time.time()
+        self._conn = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._closed = False
+
+        # Flush on interpreter exit (including unhandled exceptions)
+        self._atexit = _flush_at_exit(weakref.ref(self))
+        atexit.register(self._atexit)
+
+        self._stop = threading.Event()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, sql, params):
+        """Queue one statement; flushes when the batch is full or stale."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WriteBatcher is closed")
+            self._pending.append((sql, tuple(params)))
+            if (len(self._pending) >= self.max_rows
+                    or time.time() - self._last_flush >= self.max_seconds):
+                self.flush()
+
+    def flush(self):
+        """Write everything pending in one transaction. Returns rows written.
+
+        Rows that violate a constraint (sqlite3.IntegrityError) are left
+        out and the rest still commit together (unless atomic). Any other
+        error (a locked
+        database, a missing table) writes nothing: the rows go back to
+        the queue and the error is raised.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.time()
+            if not pending:
+                return 0
+            try:
+                try:
+                    with self._conn:
+                        start = 0
+                        for end in range(1, len(pending) + 1):
+                            if end == len(pending) or pending[end][0] != pending[start][0]:
+                                self._conn.executemany(
+                                    pending[start][0], [p for _, p in pending[start:end]]
+                                )
+                                start = end
+                    return len(pending)
+                except sqlite3.IntegrityError as e:
+                    if self.atomic:
+                        raise
+                    # One bad row shouldn't sink the batch: redo it without the bad rows
+                    print(f"WriteBatcher: batch of {len(pending)} failed ({e}); retrying row by row")
+                return self._write_skipping_bad_rows(pending)
+            except sqlite3.Error:
+                self._pending = pending + self._pending
+                raise
+
+    def _write_skipping_bad_rows(self, pending):
+        """Write pending in one transaction, dropping the rows that violate a constraint."""
+        written = 0
+        with self._conn:
+            self._conn.execute('BEGIN')
+            for sql, params in pending:
+                self._conn.execute('SAVEPOINT batch_row')
+                try:
+                    self._conn.execute(sql, params)
+                    written += 1
+                except sqlite3.IntegrityError as e:
+                    self._conn.execute('ROLLBACK TO batch_row')
+                    print(f"WriteBatcher: dropped row ({e})")
+                self._conn.execute('RELEASE batch_row')
+        return written
+
+    def close(self):
+        """Flush and release the connection (safe to call twice)."""
+        if self._closed:
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            try:
+                self.flush()
+            finally:
+                self._closed = True
+                self._conn.close()
+                atexit.unregister(self._atexit)
+
+    def _run(self):
+        while not self._stop.wait(self.max_seconds):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"WriteBatcher background flush failed: {e}")
+
+
+def _flush_at_exit(ref):
+    def _handler():
+        batcher = ref()
+        if batcher is not None:
+            try:
+                batcher.close()
+            except Exception as e:
+                print(f"WriteBatcher: failed to flush {len(batcher)} rows at exit: {e}")
+    return _handler
+
+
 class DatabaseManager:
     def __init__(self, db_file=DB_FILE):
         self.db_file = db_file
+        self._batcher = None
 
     def get_connection(self):
+        # Reads and direct writes must see rows still queued in a batch
+        if self._batcher is not None:
+            self._batcher.flush()
         return sqlite3.connect(self.db_file)
 
+    @contextmanager
+    def batch(self, max_rows=200, max_seconds=5.0, background=False):
+        """Group save_test_run / save_live_trade / save_insight writes into transactions.
+
+        Usage:
+            with db.batch():
+                for res in results:
+                    db.save_test_run(res)
+        """
+        if self._batcher is not None:  # nested: reuse the outer batch
+            yield self._batcher
+            return
+        self._batcher = WriteBatcher(self.db_file, max_rows, max_seconds, background)
+        try:
+            yield self._batcher
+        finally:
+            batcher, self._batcher = self._batcher, None
+            batcher.close()
+
+    def _write(self, statements):
+        """Run [(sql, params), ...] in one transaction, or queue them in the active batch."""
+        if self._batcher is not None:
+            for sql, params in statements:
+                self._batcher.add(sql, params)
+            return
+        conn = self.get_connection()
+        try:
+            with conn:
+                for sql, params in statements:
+                    conn.execute(sql, params)
+        finally:
+            conn.close()
+
     def initialize_db(self):
         """Creates the necessary tables if they don't exist."""
         conn = self.get_connection()
@@ -149,7 +357,8 @@ class DatabaseManager:
                 parent_experiment_id TEXT,
                 created_at TEXT,
                 spread REAL DEFAULT 0.0003,
-                execution_delay INTEGER DEFAULT 0
+                execution_delay INTEGER DEFAULT 0,
+                params_hash TEXT
             )
         ''')
 
@@ -177,9 +386,6 @@ class DatabaseManager:
 
     def save_test_run(self, data):
         """Saves a test run dictionary (as produced by runner.py) to the DB."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         metrics = data['metrics']
         
         # Extract parameters safely
@@ -197,57 +403,45 @@ class DatabaseManager:
             year = data.get('year', '2023')
             end_date = f"{year}-12-31"
 
-            end_date = f"{year}-12-31"
-
         try:
-            cursor.execute('''
-                INSERT OR REPLACE INTO test_runs (
-                    test_id, strategy, symbol, timeframe, start_date, end_date,
-                    return_pct, max_drawdown, win_rate, total_trades, parameters, timestamp, iteration_index,
-                    spread, execution_delay
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                data['test_id'],
-                data['strategy'],
-                data['symbol'],
-                data['timeframe'],
-                start_date,
-                end_date,
-                metrics.get('return_pct', 0.0),
-                metrics.get('max_drawdown', 0.0),
-                metrics.get('win_rate', 0.0),
-                metrics.get('total_trades', 0),
-                params,
-                datetime.now().isoformat(),
-                data.get('iteration_index', 0),
-                data.get('spread', 0),
-                data.get('execution_delay', 0)
-            ))
-            
             # Insert into equity_curves
             # We store the equity_curve list (which now contains detailed {time, equity}) as a JSON string
             # Previously it was 'chart_data' (OHLC), now we want the actual equity curve
             equity_data = metrics.get('equity_curve', [])
-            
-            # If equity_curve is empty or old format (list of floats), fallback?
-            # The new backtester produces list of dicts.
-            
             chart_data = json.dumps(equity_data)
-            
-            # First delete existing curve if replacing
-            cursor.execute('DELETE FROM equity_curves WHERE test_id = ?', (data['test_id'],))
-            
-            cursor.execute('''
-                INSERT INTO equity_curves (test_id, data) VALUES (?, ?)
-            ''', (data['test_id'], chart_data))
-            
-            conn.commit()
+
+            self._write([
+                ('''
+                    INSERT OR REPLACE INTO test_runs (
+                        test_id, strategy, symbol, timeframe, start_date, end_date,
+                        return_pct, max_drawdown, win_rate, total_trades, parameters, timestamp, iteration_index,
+                        spread, execution_delay
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    data['test_id'],
+                    data['strategy'],
+                    data['symbol'],
+                    data['timeframe'],
+                    start_date,
+                    end_date,
+                    metrics.get('return_pct', 0.0),
+                    metrics.get('max_drawdown', 0.0),
+                    metrics.get('win_rate', 0.0),
+                    metrics.get('total_trades', 0),
+                    params,
+                    datetime.now().isoformat(),
+                    data.get('iteration_index', 0),
+                    data.get('spread', 0),
+                    data.get('execution_delay', 0)
+                )),
+                # First delete existing curve if replacing
+                ('DELETE FROM equity_curves WHERE test_id = ?', (data['test_id'],)),
+                ('INSERT INTO equity_curves (test_id, data) VALUES (?, ?)', (data['test_id'], chart_data)),
+            ])
             # print(f"Saved test {data['test_id']} to DB.")
             
         except Exception as e:
             print(f"Error saving to DB: {e}")
-        finally:
-            conn.close()
 
     def get_all_test_runs(self):
         """Retrieves all test runs (metrics only) for analysis."""
@@ -347,11 +541,8 @@ class DatabaseManager:
 
     def save_insight(self, insight):
         """Saves a single insight to the DB."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
+            self._write([('''
                 INSERT OR REPLACE INTO insights (
                     insight_id, type, description, confidence, scope, 
                     parameters, expiration, status, created_at, last_updated
@@ -367,12 +558,9 @@ class DatabaseManager:
                 insight.get('status', 'active'),
                 insight.get('created_at', datetime.now().isoformat()),
                 insight.get('last_updated', datetime.now().isoformat())
-            ))
-            conn.commit()
+            ))])
         except Exception as e:
             print(f"Error saving insight: {e}")
-        finally:
-            conn.close()
 
     def get_all_insights(self):
         """Retrieves all insights."""
@@ -401,10 +589,7 @@ class DatabaseManager:
         """
         Saves a live trade execution to the log.
         """
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        self._write([('''
             INSERT INTO live_trade_log (
                 session_id, timestamp, symbol, strategy, side, qty,
                 signal_price, fill_price, slippage, spread, pnl, iteration_index, order_id
@@ -423,10 +608,9 @@ class DatabaseManager:
             trade_data.get('pnl', 0.0),
             trade_data.get('iteration_index'),
             trade_data.get('order_id')
-        ))
-        
-        conn.commit()
-        conn.close()    # print(f"Logged trade for {trade_data['symbol']}")
+        ))])
+        # print(f"Logged trade for {trade_data['symbol']}")
+
     def get_live_trades(self):
         """Retrieves all live trade logs."""
         conn = self.get_connection()
@@ -445,20 +629,31 @@ class DatabaseManager:
             conn.close()
 
     def save_price_bars(self, symbol, df):
-        """Upserts OHLCV bars for a symbol. df must have DatetimeIndex and Open/High/Low/Close/Volume columns."""
+        """Inserts OHLCV bars for a symbol (existing timestamps are kept).
+
+        df must have a DatetimeIndex (naive = UTC) and Open/High/Low/Close/Volume
+        columns. Timestamps are converted in one vectorised pass and written with
+        a single executemany in one transaction. Returns the number of new rows.
+        """
+        if df is None or df.empty:
+            return 0
+        idx = pd.DatetimeIndex(df.index)
+        if idx.tz is None:
+            idx = idx.tz_localize('UTC')
+        unix_ts = ((idx - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype='int64')
+        values = df[PRICE_COLUMNS].to_numpy(dtype='float64')
+
         conn = self.get_connection()
-        cursor = conn.cursor()
-        rows = []
-        for ts, row in df.iterrows():
-            unix_ts = int(pd.Timestamp(ts).timestamp())
-            rows.append((symbol, unix_ts, row['Open'], row['High'], row['Low'], row['Close'], row['Volume']))
-        cursor.executemany('''
-            INSERT OR IGNORE INTO price_data (symbol, timestamp, open, high, low, close, volume)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', rows)
-        conn.commit()
-        conn.close()
-        return len(rows)
+        try:
+            before = conn.total_changes
+            with conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO price_data (symbol, timestamp, open, high, low, close, volume)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', ((symbol, t, o, h, l, c, v) for t, (o, h, l, c, v) in zip(unix_ts.tolist(), values.tolist())))
+            return conn.total_changes - before
+        finally:
+            conn.close()
 
     def get_price_bars(self, symbol, start_ts=None, end_ts=None):
         """Returns OHLCV bars for a symbol as a list of dicts."""
@@ -479,6 +674,46 @@ class DatabaseManager:
         conn.close()
         return rows
 
+    def get_price_arrays(self, symbol, start_ts=None, end_ts=None, max_bars=None):
+        """Returns OHLCV bars as NumPy columns: {'timestamp': int64, 'open'...'volume': float64}.
+
+        With max_bars, consecutive bars are merged into at most max_bars OHLC
+        buckets (first open, max high, min low, last close, summed volume,
+        bucket timestamp = first bar) — enough resolution for a chart.
+        """
+        query = 'SELECT timestamp, open, high, low, close, volume FROM price_data WHERE symbol = ?'
+        params = [symbol]
+        if start_ts:
+            query += ' AND timestamp >= ?'
+            params.append(start_ts)
+        if end_ts:
+            query += ' AND timestamp <= ?'
+            params.append(end_ts)
+        query += ' ORDER BY timestamp ASC'
+
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(query, params).fetchall()
+        finally:
+            conn.close()
+
+        arr = np.array(rows, dtype='float64').reshape(-1, 6)
+        arrays = {'timestamp': arr[:, 0].astype('int64')}
+        for i, col in enumerate(('open', 'high', 'low', 'close', 'volume'), start=1):
+            arrays[col] = np.ascontiguousarray(arr[:, i])
+
+        if max_bars and len(arr) > max_bars:
+            arrays = _downsample_ohlc(arrays, max_bars)
+        return arrays
+
+    def get_price_frame(self, symbol, start_ts=None, end_ts=None, max_bars=None):
+        """Returns OHLCV bars as a DataFrame (UTC DatetimeIndex, Open/High/Low/Close/Volume)."""
+        arrays = self.get_price_arrays(symbol, start_ts, end_ts, max_bars)
+        index = pd.DatetimeIndex(pd.to_datetime(arrays['timestamp'], unit='s', utc=True), name='Date')
+        return pd.DataFrame({
+            col.capitalize(): arrays[col] for col in ('open', 'high', 'low', 'close', 'volume')
+        }, index=index)
+
     def get_price_data_range(self, symbol):
         """Returns (min_ts, max_ts, count) for a symbol in price_data."""
         conn = self.get_connection()
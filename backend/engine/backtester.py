@@ -1,10 +1,35 @@
 
+from dataclasses import dataclass
+
 import pandas as pd
 from .strategy import Strategy
 from .paper_trader import PaperTrader
+from . import metrics
+
+
+@dataclass
+class BacktestProgress:
+    """Snapshot handed to abort predicates during a run.
+
+    max_drawdown uses the same closed-trade equity definition (percent)
+    as the final results, so a predicate on it agrees with post-run filters.
+    """
+    bar: int            # bars processed so far
+    total_bars: int
+    total_trades: int
+    max_drawdown: float
+    equity: float
+
 
 class Backtester:
-    def __init__(self, data, strategy_class, parameters=None, initial_capital=10000.0, spread=0.0, execution_delay=0, interval="1d"):
+    def __init__(self, data, strategy_class, parameters=None, initial_capital=10000.0, spread=0.0, execution_delay=0, interval="1d",
+                 abort_predicates=None, abort_check_every=50):
+        """
+        abort_predicates: callables (BacktestProgress) -> reason str or None,
+                          checked every abort_check_every bars. The first
+                          reason stops the run; results are computed on the
+                          bars processed and flagged aborted/abort_reason.
+        """
         self.data = data
         self.strategy_class = strategy_class
         self.parameters = parameters or {}
@@ -12,6 +37,9 @@ class Backtester:
         self.spread = spread
         self.execution_delay = execution_delay
         self.interval = interval
+        self.abort_predicates = list(abort_predicates or [])
+        self.abort_check_every = max(1, int(abort_check_every))
+        self.abort_reason = None
         # Reset Broker
         self.broker = PaperTrader(initial_capital=self.initial_capital, spread=self.spread)
         
@@ -38,6 +66,8 @@ class Backtester:
         
         # Convert to list for lookahead capability
         data_list = list(self.data.iterrows())
+        self.abort_reason = None
+        self._closed_dd = _ClosedTradeDrawdown(self.initial_capital)
         
         # Simulation loop
         for i in range(len(data_list)):
@@ -144,10 +174,34 @@ class Backtester:
                 "time": time_val,
                 "equity": round(current_equity, 2)
             })
+
+            # Early abort: stop combos that can no longer pass the filters
+            if self.abort_predicates and (i + 1) % self.abort_check_every == 0:
+                self.abort_reason = self._check_abort(i + 1, len(data_list), current_equity)
+                if self.abort_reason:
+                    break
             
         self._calculate_results()
+        self.results["aborted"] = self.abort_reason is not None
+        self.results["abort_reason"] = self.abort_reason
+        self.results["bars_processed"] = len(getattr(self, 'equity_history', []))
         return self.results
 
+    def _check_abort(self, bar, total_bars, equity):
+        history = getattr(self.broker, 'trade_history', None) or []
+        progress = BacktestProgress(
+            bar=bar,
+            total_bars=total_bars,
+            total_trades=len(history),
+            max_drawdown=self._closed_dd.update(history),
+            equity=equity,
+        )
+        for predicate in self.abort_predicates:
+            reason = predicate(progress)
+            if reason:
+                return reason
+        return None
+
     def _calculate_results(self):
         """
         Calculate performance metrics from PaperTrader.
@@ -200,26 +254,11 @@ class Backtester:
         avg_win = sum(winning_trades) / len(winning_trades) if winning_trades else 0.0
         avg_loss = sum(losing_trades) / len(losing_trades) if losing_trades else 0.0
         
-        profit_factor = abs(sum(winning_trades) / sum(losing_trades)) if losing_trades and sum(losing_trades) != 0 else 0.0
+        profit_factor = metrics.profit_factor(pnl_list)
         
         # Calculate Max Drawdown (Closed Trade Equity)
-        equity_curve = [self.initial_capital]
-        current_equity = self.initial_capital
-        peak_equity = self.initial_capital
-        max_drawdown = 0.0
-        
-        for pnl in pnl_list:
-            current_equity += pnl
-            equity_curve.append(current_equity)
-            
-            if current_equity > peak_equity:
-                peak_equity = current_equity
-            
-            drawdown = (peak_equity - current_equity) / peak_equity
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-                
-        max_drawdown_pct = max_drawdown * 100
+        closed_equity = metrics.closed_trade_equity(pnl_list, self.initial_capital)
+        max_drawdown_pct = metrics.max_drawdown(closed_equity) * 100
 
         self.results = {
             "initial_capital": self.initial_capital,
@@ -237,3 +276,24 @@ class Backtester:
             "debug_history": getattr(self.strategy, 'debug_history', []),
             "chart_data": chart_data
         }
+
+
+class _ClosedTradeDrawdown:
+    """Incremental version of the closed-trade max drawdown in _calculate_results."""
+
+    def __init__(self, initial_capital):
+        self.equity = initial_capital
+        self.peak = initial_capital
+        self.max_dd = 0.0
+        self.seen = 0
+
+    def update(self, trade_history):
+        for t in trade_history[self.seen:]:
+            self.equity += t['pnl']
+            if self.equity > self.peak:
+                self.peak = self.equity
+            dd = (self.peak - self.equity) / self.peak
+            if dd > self.max_dd:
+                self.max_dd = dd
+        self.seen = len(trade_history)
+        return self.max_dd * 100
@@ -0,0 +1,197 @@
+"""Persistent, gap-aware local store for historical bars.
+
+Every sweep, validation window and overnight pass used to re-download
+the same years of GLD/SLV/GDX/IAU bars from Alpaca. BarStore keeps them
+in a local SQLite file together with a coverage table recording which
+(symbol, timeframe, [start, end)) spans have already been fetched, so
+AlpacaDataLoader only asks the transport for the gaps.
+
+Coverage is tracked separately from the bars themselves because an
+empty stretch (weekend, holiday, halted market) is still "fetched" and
+must not trigger a refetch. Spans ending in the last SETTLE_MINUTES are
+not marked as covered, so a bar that hasn't been published yet is
+picked up on the next request.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from .bar_transport import OHLCV_COLS, empty_bars, normalize_bars
+
+BAR_STORE_FILE = "backend/bar_store.db"
+
+# Recent bars may still be forming / not yet published by the feed
+SETTLE_MINUTES = 30
+
+
+def to_utc_ts(value):
+    """Anything date-like -> tz-aware UTC pd.Timestamp (naive is treated as UTC)."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def epoch_seconds(index):
+    """Unix seconds for a tz-aware DatetimeIndex (independent of its ns/us resolution)."""
+    return ((index - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+
+
+class BarStore:
+    """SQLite bar cache with per-(symbol, timeframe) coverage spans."""
+
+    def __init__(self, db_file=BAR_STORE_FILE):
+        self.db_file = db_file
+        self._ensure_tables()
+
+    def _get_conn(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _ensure_tables(self):
+        conn = self._get_conn()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS bars (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                ts INTEGER NOT NULL,
+                open REAL NOT NULL,
+                high REAL NOT NULL,
+                low REAL NOT NULL,
+                close REAL NOT NULL,
+                volume REAL NOT NULL,
+                PRIMARY KEY (symbol, timeframe, ts)
+            ) WITHOUT ROWID
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                start_ts INTEGER NOT NULL,
+                end_ts INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_coverage_key ON coverage(symbol, timeframe, start_ts)')
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Coverage
+    # ------------------------------------------------------------------
+
+    def coverage(self, symbol, timeframe):
+        """Sorted, merged list of (start_ts, end_ts) unix-second spans already fetched."""
+        conn = self._get_conn()
+        rows = conn.execute('''
+            SELECT start_ts, end_ts FROM coverage
+            WHERE symbol = ? AND timeframe = ?
+            ORDER BY start_ts
+        ''', (symbol, timeframe)).fetchall()
+        conn.close()
+        return _merge_spans(rows)
+
+    def missing_spans(self, symbol, timeframe, start, end):
+        """Sub-ranges of [start, end) not yet covered, as (start, end) UTC Timestamps."""
+        lo, hi = int(to_utc_ts(start).timestamp()), int(to_utc_ts(end).timestamp())
+        gaps = []
+        cursor = lo
+        for s, e in self.coverage(symbol, timeframe):
+            if e <= cursor:
+                continue
+            if s >= hi:
+                break
+            if s > cursor:
+                gaps.append((cursor, s))
+            cursor = max(cursor, e)
+            if cursor >= hi:
+                break
+        if cursor < hi:
+            gaps.append((cursor, hi))
+        return [(pd.Timestamp(s, unit="s", tz="UTC"), pd.Timestamp(e, unit="s", tz="UTC")) for s, e in gaps]
+
+    # ------------------------------------------------------------------
+    # Read / write
+    # ------------------------------------------------------------------
+
+    def write(self, symbol, timeframe, df, start, end):
+        """Upsert bars and mark [start, end) as fetched (capped at now - SETTLE_MINUTES)."""
+        df = normalize_bars(df)
+        lo = int(to_utc_ts(start).timestamp())
+        settled = int(datetime.now(timezone.utc).timestamp()) - SETTLE_MINUTES * 60
+        hi = min(int(to_utc_ts(end).timestamp()), settled)
+
+        conn = self._get_conn()
+        try:
+            if not df.empty:
+                ts = epoch_seconds(df.index)
+                values = df[OHLCV_COLS].to_numpy(dtype="float64")
+                rows = [(symbol, timeframe, int(t), *map(float, v)) for t, v in zip(ts, values)]
+                conn.executemany('''
+                    INSERT OR REPLACE INTO bars (symbol, timeframe, ts, open, high, low, close, volume)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+            if hi > lo:
+                self._add_coverage(conn, symbol, timeframe, lo, hi)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def read(self, symbol, timeframe, start, end):
+        """Bars in [start, end) as an OHLCV DataFrame with a UTC DatetimeIndex."""
+        lo, hi = int(to_utc_ts(start).timestamp()), int(to_utc_ts(end).timestamp())
+        conn = self._get_conn()
+        rows = conn.execute('''
+            SELECT ts, open, high, low, close, volume FROM bars
+            WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts < ?
+            ORDER BY ts
+        ''', (symbol, timeframe, lo, hi)).fetchall()
+        conn.close()
+
+        if not rows:
+            return empty_bars()
+        arr = np.asarray(rows, dtype="float64")
+        ns = arr[:, 0].astype("int64") * 1_000_000_000
+        index = pd.DatetimeIndex(pd.to_datetime(ns.astype("datetime64[ns]"), utc=True), name="Date")
+        return pd.DataFrame(arr[:, 1:], index=index, columns=OHLCV_COLS)
+
+    def clear(self, symbol=None, timeframe=None):
+        """Drop cached bars and coverage (all, per symbol, or per symbol/timeframe)."""
+        where, args = "", ()
+        if symbol is not None and timeframe is not None:
+            where, args = " WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+        elif symbol is not None:
+            where, args = " WHERE symbol = ?", (symbol,)
+        conn = self._get_conn()
+        conn.execute("DELETE FROM bars" + where, args)
+        conn.execute("DELETE FROM coverage" + where, args)
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def _add_coverage(conn, symbol, timeframe, lo, hi):
+        """Insert [lo, hi) and collapse it with any touching/overlapping spans."""
+        rows = conn.execute('''
+            SELECT start_ts, end_ts FROM coverage
+            WHERE symbol = ? AND timeframe = ? AND start_ts <= ? AND end_ts >= ?
+        ''', (symbol, timeframe, hi, lo)).fetchall()
+        for s, e in rows:
+            lo, hi = min(lo, s), max(hi, e)
+        conn.execute('''
+            DELETE FROM coverage
+            WHERE symbol = ? AND timeframe = ? AND start_ts >= ? AND end_ts <= ?
+        ''', (symbol, timeframe, lo, hi))
+        conn.execute('''
+            INSERT INTO coverage (symbol, timeframe, start_ts, end_ts) VALUES (?, ?, ?, ?)
+        ''', (symbol, timeframe, lo, hi))
+
+
+def _merge_spans(spans):
+    merged = []
+    for s, e in sorted(spans):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
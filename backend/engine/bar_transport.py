@@ -0,0 +1,252 @@
+"""Bar transports for AlpacaDataLoader.
+
+A transport is anything with:
+
+    fetch_bars(symbol, timeframe, start, end) -> DataFrame
+
+returning [Open, High, Low, Close, Volume] indexed by a tz-aware UTC
+DatetimeIndex, for bars with start <= t < end (start/end are tz-aware
+pd.Timestamps). An empty DataFrame means "no bars in that range"; a
+transport that can't return the whole range (API error, truncated
+response) must raise instead, or the bar store would record the range
+as fetched.
+
+- AlpacaTransport: the real SDK (stocks/crypto) + REST (forex) client.
+- FixtureTransport: serves recorded frames from memory or a fixture
+  directory, for offline tests and benchmarks.
+- RecordingTransport: wraps another transport and appends everything it
+  returns to a fixture directory, so a live session can be replayed offline.
+"""
+
+import os
+
+import pandas as pd
+import requests
+
+OHLCV_COLS = ["Open", "High", "Low", "Close", "Volume"]
+
+FOREX_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'AUD', 'CAD', 'CHF', 'NZD']
+CRYPTO_SYMBOLS = ['BTC/USD', 'ETH/USD', 'LTC/USD', 'BCH/USD', 'SOL/USD']
+
+# Rows per forex rates page (the API maximum)
+FOREX_PAGE_LIMIT = 10000
+
+
+def empty_bars():
+    """Empty OHLCV frame with a tz-aware UTC index."""
+    return pd.DataFrame(columns=OHLCV_COLS, index=pd.DatetimeIndex([], tz="UTC", name="Date"), dtype="float64")
+
+
+def normalize_bars(df):
+    """Coerce a bar frame to the transport contract (UTC index, float OHLCV, sorted, unique)."""
+    if df is None or df.empty:
+        return empty_bars()
+    df = df[OHLCV_COLS].astype("float64")
+    idx = pd.DatetimeIndex(df.index)
+    idx = idx.tz_localize("UTC") if idx.tz is None else idx.tz_convert("UTC")
+    df.index = idx.rename("Date")
+    df = df.sort_index()
+    return df[~df.index.duplicated(keep="last")]
+
+
+def classify_symbol(symbol):
+    """Return 'forex', 'crypto' or 'stock' for an Alpaca symbol."""
+    parts = symbol.split('/')
+    if len(parts) == 2 and parts[0] in FOREX_CURRENCIES and parts[1] in FOREX_CURRENCIES:
+        return 'forex'
+    if symbol in CRYPTO_SYMBOLS or ('/' in symbol and 'USD' in symbol):
+        return 'crypto'
+    return 'stock'
+
+
+class AlpacaTransport:
+    """Alpaca market data client (alpaca-py SDK for stocks/crypto, REST for forex)."""
+
+    def __init__(self, api_key, secret_key):
+        from alpaca.data.historical import StockHistoricalDataClient, CryptoHistoricalDataClient
+
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.stock_client = StockHistoricalDataClient(api_key, secret_key)
+        self.crypto_client = CryptoHistoricalDataClient(api_key, secret_key)
+
+    def fetch_bars(self, symbol, timeframe, start, end):
+        from alpaca.data.requests import StockBarsRequest, CryptoBarsRequest
+        from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
+        from alpaca.data.enums import DataFeed
+
+        asset_class = classify_symbol(symbol)
+        if asset_class == 'forex':
+            return self._fetch_forex(symbol, timeframe, start, end)
+
+        # Map timeframe string to Alpaca TimeFrame
+        tf_map = {
+            '1m': TimeFrame.Minute,
+            '5m': TimeFrame(5, TimeFrameUnit.Minute),
+            '15m': TimeFrame(15, TimeFrameUnit.Minute),
+            '30m': TimeFrame(30, TimeFrameUnit.Minute),
+            '1h': TimeFrame.Hour,
+            '4h': TimeFrame(4, TimeFrameUnit.Hour),
+            '1d': TimeFrame.Day
+        }
+        alpaca_tf = tf_map.get(timeframe, TimeFrame.Hour)
+
+        if asset_class == 'crypto':
+            request_params = CryptoBarsRequest(
+                symbol_or_symbols=[symbol],
+                timeframe=alpaca_tf,
+                start=start.to_pydatetime(),
+                end=end.to_pydatetime()
+            )
+            df = self.crypto_client.get_crypto_bars(request_params).df
+        else:
+            request_params = StockBarsRequest(
+                symbol_or_symbols=[symbol],
+                timeframe=alpaca_tf,
+                start=start.to_pydatetime(),
+                end=end.to_pydatetime(),
+                feed=DataFeed.IEX  # Use IEX for free tier compatibility
+            )
+            df = self.stock_client.get_stock_bars(request_params).df
+
+        if df is None or df.empty:
+            return empty_bars()
+
+        # Reset index to get 'timestamp' as a column if it's in index
+        if 'timestamp' not in df.columns:
+            df = df.reset_index()
+
+        # Filter for the specific symbol
+        if 'symbol' in df.columns:
+            df = df[df['symbol'] == symbol]
+
+        df = df.rename(columns={
+            'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close',
+            'volume': 'Volume', 'timestamp': 'Date',
+        })
+        df['Date'] = pd.to_datetime(df['Date'], utc=True)
+        df = df.set_index('Date')
+        for col in OHLCV_COLS:
+            if col not in df.columns:
+                df[col] = 0.0
+        return normalize_bars(df)
+
+    def _fetch_forex(self, symbol, timeframe, start, end):
+        # Direct API call for Forex
+        base_url = "https://data.alpaca.markets/v1beta1/forex/rates"
+        headers = {
+            "APCA-API-KEY-ID": self.api_key,
+            "APCA-API-SECRET-KEY": self.secret_key
+        }
+        tf_api_map = {
+            '1m': '1Min',
+            '15m': '15Min',
+            '1h': '1H',
+            '1d': '1D'
+        }
+        params = {
+            "currency_pairs": symbol,  # e.g. GBP/USD
+            "timeframe": tf_api_map.get(timeframe, '1H'),
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "limit": FOREX_PAGE_LIMIT,
+        }
+
+        # Follow next_page_token to the end: a truncated answer would be
+        # cached by the bar store as full coverage of [start, end)
+        print(f"Fetching Forex Data: {symbol} {timeframe} from {base_url}")
+        rows = []
+        while True:
+            response = requests.get(base_url, headers=headers, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Forex API Error: {response.status_code} {response.text}")
+
+            # Structure: {'rates': {'GBP/USD': [{'t': ..., 'o': ..., 'h': ..., 'l': ..., 'c': ..., 'v': ...}]},
+            #             'next_page_token': ...}
+            data = response.json()
+            rates = data.get('rates')
+            if not isinstance(rates, dict):
+                raise RuntimeError(f"Forex API Error: no rates in response for {symbol}")
+            # A pair missing from 'rates' has no bars in this page (weekend, holiday)
+            rows.extend(rates.get(symbol) or [])
+
+            token = data.get('next_page_token')
+            if not token:
+                break
+            params["page_token"] = token
+
+        if not rows:
+            return empty_bars()
+
+        df = pd.DataFrame(rows).rename(columns={
+            't': 'Date', 'o': 'Open', 'h': 'High', 'l': 'Low', 'c': 'Close', 'v': 'Volume'
+        })
+        if 'Volume' not in df.columns:
+            df['Volume'] = 0
+        df['Date'] = pd.to_datetime(df['Date'], utc=True)
+        df = df.set_index('Date')
+        df[OHLCV_COLS] = df[OHLCV_COLS].apply(pd.to_numeric)
+        return normalize_bars(df)
+
+
+class FixtureTransport:
+    """Serve recorded bars instead of calling Alpaca.
+
+    Frames come from `frames` ({(symbol, timeframe): DataFrame}) and/or
+    `fixture_dir`, which holds files written by save_fixture()/RecordingTransport.
+    Every call is logged in self.calls so tests can assert what was fetched.
+    """
+
+    def __init__(self, frames=None, fixture_dir=None):
+        self.fixture_dir = fixture_dir
+        self.frames = {k: normalize_bars(v) for k, v in (frames or {}).items()}
+        self.calls = []
+
+    def fetch_bars(self, symbol, timeframe, start, end):
+        self.calls.append((symbol, timeframe, start, end))
+        df = self._frame(symbol, timeframe)
+        if df.empty:
+            return df
+        return df[(df.index >= start) & (df.index < end)]
+
+    def _frame(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self.frames and self.fixture_dir:
+            path = fixture_path(self.fixture_dir, symbol, timeframe)
+            self.frames[key] = load_fixture(path) if os.path.exists(path) else empty_bars()
+        return self.frames.get(key, empty_bars())
+
+
+class RecordingTransport:
+    """Pass-through transport that records every response to a fixture directory."""
+
+    def __init__(self, inner, fixture_dir):
+        self.inner = inner
+        self.fixture_dir = fixture_dir
+
+    def fetch_bars(self, symbol, timeframe, start, end):
+        df = self.inner.fetch_bars(symbol, timeframe, start, end)
+        if df is not None and not df.empty:
+            save_fixture(df, self.fixture_dir, symbol, timeframe)
+        return df
+
+
+def fixture_path(fixture_dir, symbol, timeframe):
+    safe_symbol = symbol.replace("/", "_")
+    return os.path.join(fixture_dir, f"{safe_symbol}_{timeframe}.csv.gz")
+
+
+def load_fixture(path):
+    df = pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index, utc=True)
+    return normalize_bars(df)
+
+
+def save_fixture(df, fixture_dir, symbol, timeframe):
+    """Merge bars into the fixture file for (symbol, timeframe)."""
+    os.makedirs(fixture_dir, exist_ok=True)
+    path = fixture_path(fixture_dir, symbol, timeframe)
+    if os.path.exists(path):
+        df = pd.concat([load_fixture(path), normalize_bars(df)])
+    normalize_bars(df).to_csv(path)
+    return path
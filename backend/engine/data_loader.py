@@ -2,6 +2,8 @@ import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import os
+import numpy as np
+from .economic_calendar import EconomicCalendarStore, CALENDAR_CSV, DEFAULT_BLACKOUT_KEYWORDS
 
 class DataLoader:
     def __init__(self, data_dir="backend/data"):
@@ -122,70 +124,21 @@ class DataLoader:
 
     def fetch_economic_events(self, start_date: str, end_date: str, currency: str = "USD") -> pd.DataFrame:
         """
-        Fetch economic events from local CSV file.
+        Fetch high-impact economic events with parsed actual/forecast values.
+        Backed by the compiled EconomicCalendarStore (CSV parsed once, then cached).
         """
-        csv_path = 'backend/data_csv/economic_calendar.csv'
-        if not os.path.exists(csv_path):
-            print(f"Economic calendar CSV not found at {csv_path}")
+        store = EconomicCalendarStore.load(CALENDAR_CSV)
+        if store is None:
+            print(f"Economic calendar CSV not found at {CALENDAR_CSV}")
             return pd.DataFrame()
 
         try:
-            # Load from CSV
-            df = pd.read_csv(csv_path)
-            
-            # Parse DateTime with timezone handling
-            # The CSV has offsets like +03:30. We'll convert to UTC and then remove timezone for simple backtesting alignment
-            df['DateTime'] = pd.to_datetime(df['DateTime'], utc=True).dt.tz_localize(None)
-            df.rename(columns={'DateTime': 'date', 'Currency': 'currency', 'Impact': 'impact', 'Event': 'event', 'Actual': 'actual', 'Forecast': 'forecast', 'Previous': 'previous'}, inplace=True)
-            
-            # Filter by date range
-            mask = (df['date'] >= pd.to_datetime(start_date)) & (df['date'] <= pd.to_datetime(end_date))
-            df = df.loc[mask].copy()
-            
-            # Filter by Currency (allow list or single)
-            if currency:
-                currencies = [c.strip() for c in currency.split(',')]
-                df = df[df['currency'].isin(currencies)]
-            
-            # Filter by High Impact
-            df = df[df['impact'].str.contains("High", case=False, na=False)]
-            
-            # Clean and Parse Values (Actual, Forecast)
-            def clean_value(val):
-                if pd.isna(val) or val == '':
-                    return None
-                val = str(val).strip()
-                multiplier = 1.0
-                if val.endswith('%'):
-                    val = val[:-1]
-                elif val.endswith('K'):
-                    multiplier = 1000.0
-                    val = val[:-1]
-                elif val.endswith('M'):
-                    multiplier = 1000000.0
-                    val = val[:-1]
-                elif val.endswith('B'):
-                    multiplier = 1000000000.0
-                    val = val[:-1]
-                elif val.endswith('T'):
-                    multiplier = 1000000000000.0
-                    val = val[:-1]
-                
-                try:
-                    return float(val.replace(',', '')) * multiplier
-                except:
-                    return None
+            mask = store.mask(start_date, end_date, currency=currency, impact="High",
+                              require_values=True)
+            return store.to_frame(mask)
 
-            df['actual_val'] = df['actual'].apply(clean_value)
-            df['forecast_val'] = df['forecast'].apply(clean_value)
-            
-            # Drop rows where we can't compare
-            df = df.dropna(subset=['actual_val', 'forecast_val'])
-            
-            return df
-            
         except Exception as e:
-            print(f"Error loading economic calendar CSV: {e}")
+            print(f"Error loading economic calendar: {e}")
             import traceback
             traceback.print_exc()
             return pd.DataFrame()
@@ -208,46 +161,17 @@ class DataLoader:
             Set of pd.Timestamp (timezone-naive UTC)
         """
         if event_keywords is None:
-            event_keywords = [
-                'Non-Farm Employment',
-                'Nonfarm Payrolls',
-                'FOMC',
-                'Federal Funds Rate',
-                'CPI m/m',
-                'CPI y/y',
-                'Core CPI',
-                'Unemployment Rate',
-            ]
+            event_keywords = DEFAULT_BLACKOUT_KEYWORDS
 
-        csv_path = 'backend/data_csv/economic_calendar.csv'
-        if not os.path.exists(csv_path):
-            print(f"Economic calendar CSV not found at {csv_path}")
+        store = EconomicCalendarStore.load(CALENDAR_CSV)
+        if store is None:
+            print(f"Economic calendar CSV not found at {CALENDAR_CSV}")
             return set()
 
         try:
-            df = pd.read_csv(csv_path)
-            df['DateTime'] = pd.to_datetime(df['DateTime'], utc=True).dt.tz_localize(None)
-
-            # Filter by date range
-            mask = (df['DateTime'] >= pd.to_datetime(start_date)) & (df['DateTime'] <= pd.to_datetime(end_date))
-            df = df.loc[mask]
-
-            # Filter by currency
-            if currency:
-                currencies = [c.strip() for c in currency.split(',')]
-                df = df[df['Currency'].isin(currencies)]
-
-            # Filter by high impact
-            df = df[df['Impact'].str.contains("High", case=False, na=False)]
-
-            # Filter by event keywords
-            if event_keywords:
-                pattern = '|'.join(event_keywords)
-                df = df[df['Event'].str.contains(pattern, case=False, na=False)]
-
-            event_times = set(df['DateTime'].values)
-            # Convert numpy datetime64 to pd.Timestamp for consistent comparison
-            event_times = {pd.Timestamp(t) for t in event_times}
+            times = store.event_times(start_date, end_date, currency=currency,
+                                      impact="High", keywords=event_keywords)
+            event_times = {pd.Timestamp(t) for t in np.unique(times)}
 
             print(f"Loaded {len(event_times)} high-impact event times for blackout ({start_date} to {end_date})")
             return event_times
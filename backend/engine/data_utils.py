@@ -22,7 +22,7 @@ PANDAS_ALIAS = {
 }
 
 
-def load_backtest_data(symbol: str, timeframe: str, start: str, end: str) -> pd.DataFrame:
+def load_backtest_data(symbol: str, timeframe: str, start: str, end: str, loader=None) -> pd.DataFrame:
     """Fetch OHLCV data from Alpaca, resampling if needed.
 
     Handles:
@@ -32,8 +32,10 @@ def load_backtest_data(symbol: str, timeframe: str, start: str, end: str) -> pd.
 
     Returns a DataFrame with columns [Open, High, Low, Close, Volume]
     indexed by datetime, ready to pass to Backtester.
+
+    Pass `loader` to reuse a loader (e.g. one with an offline transport).
     """
-    loader = AlpacaDataLoader()
+    loader = loader or AlpacaDataLoader()
 
     fetch_tf = RESAMPLE_MAP.get(timeframe, timeframe)
     data = loader.fetch_data(symbol, fetch_tf, start, end)
@@ -0,0 +1,267 @@
+"""Compiled economic calendar store.
+
+The raw calendar CSV (backend/data_csv/economic_calendar.csv) is slow to
+query: timezone offsets need a full pd.to_datetime(utc=True) pass, the
+actual/forecast strings need per-row cleaning and event names are
+regex-scanned on every call. DataLoader hits it on every strategy
+construction and bot startup.
+
+EconomicCalendarStore parses the CSV once into flat NumPy columns:
+- time:      int64 ns since epoch (UTC, sorted)
+- currency / impact / event: int32 codes into small category tables
+- actual_val / forecast_val / previous_val: float64 (NaN if unparseable)
+
+The compiled columns are saved next to the CSV as a .npz file and reused
+until the CSV changes (size/mtime). Range, currency, impact and keyword
+filters are boolean masks over the columns; keyword matching runs over
+the few hundred distinct event names, not every row.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+CALENDAR_CSV = "backend/data_csv/economic_calendar.csv"
+
+# Gold-relevant USD releases used for entry blackouts
+DEFAULT_BLACKOUT_KEYWORDS = [
+    "Non-Farm Employment",
+    "Nonfarm Payrolls",
+    "FOMC",
+    "Federal Funds Rate",
+    "CPI m/m",
+    "CPI y/y",
+    "Core CPI",
+    "Unemployment Rate",
+]
+
+# Suffix multipliers for calendar values ("250K", "1.2B", "3.1%")
+_VALUE_SUFFIX = {"%": 1.0, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+_CATEGORY_COLS = ("currency", "impact", "event")
+_TEXT_COLS = ("actual", "forecast", "previous")
+
+# Process-wide cache: csv path -> loaded store
+_STORES = {}
+
+
+def parse_values(values):
+    """Vectorised version of the old per-row clean_value().
+
+    Strips one trailing %/K/M/B/T (scaling K/M/B/T), removes thousands
+    separators and returns float64 with NaN for blanks/unparseable values.
+    """
+    s = pd.Series(values, dtype="object").astype("string").str.strip()
+    suffix = s.str[-1:]
+    mult = suffix.map(_VALUE_SUFFIX).astype("float64")
+    has_suffix = mult.notna()
+    body = s.where(~has_suffix, s.str[:-1]).str.replace(",", "", regex=False)
+    nums = pd.to_numeric(body, errors="coerce").astype("float64")
+    return (nums * mult.fillna(1.0)).to_numpy(dtype="float64")
+
+
+class EconomicCalendarStore:
+    """Columnar, query-ready view of the economic calendar CSV."""
+
+    def __init__(self, columns, categories):
+        self.time = columns["time"]
+        self.currency = columns["currency"]
+        self.impact = columns["impact"]
+        self.event = columns["event"]
+        self.actual_val = columns["actual_val"]
+        self.forecast_val = columns["forecast_val"]
+        self.previous_val = columns["previous_val"]
+        self.actual = columns["actual"]
+        self.forecast = columns["forecast"]
+        self.previous = columns["previous"]
+        self.categories = categories  # col -> np.ndarray of labels
+
+        # Lower-cased labels for case-insensitive matching
+        self._lower = {c: np.char.lower(categories[c].astype(str)) for c in _CATEGORY_COLS}
+
+    def __len__(self):
+        return len(self.time)
+
+    # ------------------------------------------------------------------
+    # Build / load
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, csv_path=CALENDAR_CSV, store_path=None, refresh=False):
+        """Return the compiled store for csv_path, compiling if stale.
+
+        Cached per process, so repeated strategy constructions share one copy.
+        Returns None if the CSV does not exist and no compiled store is present.
+        """
+        store_path = store_path or cls.default_store_path(csv_path)
+        key = (os.path.abspath(csv_path), os.path.abspath(store_path))
+
+        source_sig = cls._source_signature(csv_path)
+        cached = _STORES.get(key)
+        if cached is not None and not refresh and cached[0] == source_sig:
+            return cached[1]
+
+        store = None
+        if not refresh and os.path.exists(store_path):
+            store = cls._read_npz(store_path, source_sig)
+        if store is None:
+            if source_sig is None:
+                return None
+            store = cls.compile(csv_path, store_path)
+
+        _STORES[key] = (source_sig, store)
+        return store
+
+    @classmethod
+    def compile(cls, csv_path=CALENDAR_CSV, store_path=None):
+        """Parse the CSV once and write the compiled .npz next to it."""
+        df = pd.read_csv(csv_path)
+        times = pd.to_datetime(df["DateTime"], utc=True).dt.tz_localize(None)
+
+        order = np.argsort(times.to_numpy(dtype="datetime64[ns]").astype("int64"), kind="stable")
+        df = df.iloc[order].reset_index(drop=True)
+        times = times.iloc[order].reset_index(drop=True)
+
+        columns = {"time": times.to_numpy(dtype="datetime64[ns]").astype("int64")}
+        categories = {}
+        for col, src in zip(_CATEGORY_COLS, ("Currency", "Impact", "Event")):
+            codes, labels = pd.factorize(df[src].fillna("").astype(str), sort=True)
+            columns[col] = codes.astype("int32")
+            categories[col] = np.asarray(labels, dtype=str)
+
+        for col, src in zip(_TEXT_COLS, ("Actual", "Forecast", "Previous")):
+            raw = df[src] if src in df.columns else pd.Series([None] * len(df))
+            columns[f"{col}_val"] = parse_values(raw)
+            columns[col] = raw.fillna("").astype(str).to_numpy(dtype=str)
+
+        store = cls(columns, categories)
+
+        store_path = store_path or cls.default_store_path(csv_path)
+        cls._write_npz(store, store_path, cls._source_signature(csv_path))
+        return store
+
+    @staticmethod
+    def default_store_path(csv_path):
+        root, _ = os.path.splitext(csv_path)
+        return f"{root}.compiled.npz"
+
+    @staticmethod
+    def _source_signature(csv_path):
+        """(size, mtime_ns) of the CSV, or None if it doesn't exist."""
+        try:
+            st = os.stat(csv_path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _write_npz(store, store_path, source_sig):
+        arrays = {
+            "time": store.time,
+            "currency": store.currency,
+            "impact": store.impact,
+            "event": store.event,
+            "actual_val": store.actual_val,
+            "forecast_val": store.forecast_val,
+            "previous_val": store.previous_val,
+            "actual": store.actual,
+            "forecast": store.forecast,
+            "previous": store.previous,
+            "source_sig": np.asarray(source_sig or (-1, -1), dtype="int64"),
+        }
+        for col in _CATEGORY_COLS:
+            arrays[f"cat_{col}"] = store.categories[col]
+        tmp_path = f"{store_path}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, store_path)
+        except OSError as e:
+            print(f"Could not write compiled calendar to {store_path}: {e}")
+
+    @classmethod
+    def _read_npz(cls, store_path, source_sig):
+        """Load a compiled store; None if it is stale relative to the CSV."""
+        try:
+            with np.load(store_path, allow_pickle=False) as z:
+                stored_sig = tuple(int(x) for x in z["source_sig"])
+                if source_sig is not None and stored_sig != tuple(source_sig):
+                    return None
+                columns = {k: z[k] for k in z.files if not k.startswith("cat_") and k != "source_sig"}
+                categories = {c: z[f"cat_{c}"] for c in _CATEGORY_COLS}
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Ignoring unreadable compiled calendar {store_path}: {e}")
+            return None
+        return cls(columns, categories)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def mask(self, start=None, end=None, currency=None, impact=None,
+             keywords=None, require_values=False):
+        """Boolean row mask for the given filters.
+
+        Args:
+            start, end: inclusive bounds (anything pd.Timestamp accepts, naive UTC)
+            currency: "USD", "USD,EUR" or a list of codes
+            impact: substring matched case-insensitively (e.g. "High")
+            keywords: list of substrings matched case-insensitively against event names
+            require_values: only rows with parseable actual AND forecast
+        """
+        n = len(self.time)
+        lo, hi = 0, n
+        if start is not None:
+            lo = int(np.searchsorted(self.time, pd.Timestamp(start).value, side="left"))
+        if end is not None:
+            hi = int(np.searchsorted(self.time, pd.Timestamp(end).value, side="right"))
+
+        m = np.zeros(n, dtype=bool)
+        m[lo:hi] = True
+
+        if currency:
+            if isinstance(currency, str):
+                currency = [c.strip() for c in currency.split(",")]
+            codes = np.flatnonzero(np.isin(self.categories["currency"], list(currency)))
+            m &= np.isin(self.currency, codes)
+
+        if impact:
+            m &= np.isin(self.impact, self._match_codes("impact", [impact]))
+
+        if keywords:
+            m &= np.isin(self.event, self._match_codes("event", keywords))
+
+        if require_values:
+            m &= ~np.isnan(self.actual_val) & ~np.isnan(self.forecast_val)
+
+        return m
+
+    def event_times(self, start=None, end=None, currency="USD", impact="High",
+                    keywords=None):
+        """int64 ns timestamps (naive UTC) of matching events, sorted."""
+        m = self.mask(start, end, currency=currency, impact=impact, keywords=keywords)
+        return self.time[m]
+
+    def to_frame(self, mask=None):
+        """Materialise rows as the DataFrame shape DataLoader has always returned."""
+        idx = np.flatnonzero(mask) if mask is not None else np.arange(len(self.time))
+        return pd.DataFrame({
+            "date": pd.to_datetime(self.time[idx]),
+            "currency": self.categories["currency"][self.currency[idx]],
+            "impact": self.categories["impact"][self.impact[idx]],
+            "event": self.categories["event"][self.event[idx]],
+            "actual": self.actual[idx],
+            "forecast": self.forecast[idx],
+            "previous": self.previous[idx],
+            "actual_val": self.actual_val[idx],
+            "forecast_val": self.forecast_val[idx],
+            "previous_val": self.previous_val[idx],
+        })
+
+    def _match_codes(self, col, needles):
+        """Category codes whose label contains any needle (case-insensitive)."""
+        labels = self._lower[col]
+        hit = np.zeros(len(labels), dtype=bool)
+        for needle in needles:
+            hit |= np.char.find(labels, str(needle).lower()) >= 0
+        return np.flatnonzero(hit)
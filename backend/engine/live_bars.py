@@ -0,0 +1,138 @@
+"""Rolling bar buffer for the live trading loop.
+
+run_live_trading used to re-download 7 days of bars every 60 seconds and
+rebuild the whole frame just to find out whether one new bar had closed.
+LiveBarBuffer keeps the most recent bars in a fixed-capacity ring of
+NumPy arrays and, on each poll, only asks the loader for bars from the
+last buffered timestamp onwards (that bar is re-requested so a bar that
+was still forming on the previous poll gets its final values).
+
+The strategy sees window(): the buffered bars in time order, resampled
+when the bot trades a timeframe the feed doesn't serve directly (5m
+built from 1m).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .bar_transport import OHLCV_COLS, normalize_bars
+
+# Bars handed to the strategy per cycle (indicators need 50+)
+LIVE_BUFFER_BARS = 1000
+
+# Lookback used when the buffer is empty (warmup failed / first poll)
+COLD_START_DAYS = 7
+
+_OHLC_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+class LiveBarBuffer:
+    """Fixed-capacity ring of the latest bars for one bot."""
+
+    def __init__(self, loader, symbol, fetch_timeframe, capacity=LIVE_BUFFER_BARS,
+                 resample_rule=None):
+        """
+        loader:          anything with fetch_data(symbol, timeframe, start, end)
+        fetch_timeframe: timeframe requested from the loader (e.g. '1m')
+        capacity:        raw bars kept; older bars fall off the front
+        resample_rule:   pandas rule applied in window() (e.g. '5min'), or None
+        """
+        self.loader = loader
+        self.symbol = symbol
+        self.fetch_timeframe = fetch_timeframe
+        self.capacity = int(capacity)
+        self.resample_rule = resample_rule
+
+        self._ts = np.zeros(self.capacity, dtype='int64')  # ns since epoch, UTC
+        self._values = np.zeros((self.capacity, len(OHLCV_COLS)), dtype='float64')
+        self._head = 0   # slot of the oldest bar
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def last_time(self):
+        """Timestamp of the newest raw bar, or None if empty."""
+        if self._count == 0:
+            return None
+        return pd.Timestamp(int(self._ts[self._slot(self._count - 1)]), unit='ns', tz='UTC')
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def seed(self, df):
+        """Load warmup history (keeps only the newest `capacity` bars)."""
+        self._head = 0
+        self._count = 0
+        return self.append(df)
+
+    def poll(self, now=None):
+        """Fetch bars from the last buffered bar onwards and append them.
+
+        Returns the number of bars received (including the re-sent last bar).
+        Loader exceptions propagate so the caller can log and retry.
+        """
+        now = pd.Timestamp(now) if now is not None else pd.Timestamp.now(tz='UTC')
+        if now.tzinfo is None:
+            now = now.tz_localize('UTC')
+        start = self.last_time
+        if start is None:
+            start = now - pd.Timedelta(days=COLD_START_DAYS)
+        end = now + pd.Timedelta(days=1)  # Future to get today
+
+        df = self.loader.fetch_data(self.symbol, self.fetch_timeframe,
+                                    start.to_pydatetime(), end.to_pydatetime())
+        return self.append(df)
+
+    def append(self, df):
+        """Append bars newer than the buffer; a bar at last_time overwrites it."""
+        if df is None or df.empty:
+            return 0
+        df = normalize_bars(df)
+        ts = df.index.to_numpy(dtype='datetime64[ns]').astype('int64')
+        values = df[OHLCV_COLS].to_numpy(dtype='float64')
+
+        if self._count:
+            last_slot = self._slot(self._count - 1)
+            last_ts = self._ts[last_slot]
+            same = ts == last_ts
+            if same.any():
+                self._values[last_slot] = values[same][-1]
+            newer = ts > last_ts
+            ts, values = ts[newer], values[newer]
+
+        n = len(ts)
+        if n == 0:
+            return len(df)
+        if n >= self.capacity:
+            ts, values = ts[-self.capacity:], values[-self.capacity:]
+            self._ts[:] = ts
+            self._values[:] = values
+            self._head, self._count = 0, self.capacity
+        else:
+            slots = self._slot(self._count + np.arange(n))
+            self._ts[slots] = ts
+            self._values[slots] = values
+            overflow = max(0, self._count + n - self.capacity)
+            self._head = (self._head + overflow) % self.capacity
+            self._count = min(self.capacity, self._count + n)
+
+        return len(df)
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def window(self):
+        """Buffered bars in time order (resampled if configured), as OHLCV DataFrame."""
+        order = self._slot(np.arange(self._count))
+        index = pd.DatetimeIndex(pd.to_datetime(self._ts[order], utc=True), name='Date')
+        df = pd.DataFrame(self._values[order], index=index, columns=OHLCV_COLS)
+        if self.resample_rule and not df.empty:
+            df = df.resample(self.resample_rule).agg(_OHLC_AGG).dropna()
+        return df
+
+    def _slot(self, pos):
+        return (self._head + pos) % self.capacity
@@ -0,0 +1,229 @@
+"""Vectorized performance metrics.
+
+Everything here works on NumPy arrays: an equity series, optional
+timestamps (seconds since the epoch) and optional closed-trade PnL.
+performance() computes the whole set in one pass over those arrays; the
+single-metric functions are what it is built from and what the callers
+that need one number use:
+
+    - scoring.calc_sharpe (Sharpe from a Backtester equity curve)
+    - Backtester._calculate_results (closed-trade drawdown, profit factor)
+    - runner.worker_task (per-year return / drawdown split)
+
+equity_arrays() turns a Backtester equity_curve (list of {"time",
+"equity"} dicts, times as unix seconds or date strings) into those arrays.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_PERIODS_PER_YEAR = 252  # daily bars, when timestamps don't tell
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+
+
+def equity_arrays(equity_curve):
+    """(equity, times) arrays from a Backtester equity curve.
+
+    times are int64 seconds since the epoch (date strings are read as UTC
+    midnight), or None if the curve has no usable timestamps.
+    """
+    if not equity_curve:
+        return np.empty(0), None
+    equity = np.fromiter((p["equity"] for p in equity_curve), dtype=float,
+                         count=len(equity_curve))
+    first = equity_curve[0].get("time")
+    try:
+        if isinstance(first, str):
+            stamps = pd.to_datetime([p["time"] for p in equity_curve])
+            times = stamps.values.astype("datetime64[s]").astype(np.int64)
+        elif isinstance(first, (int, float, np.integer, np.floating)):
+            times = np.fromiter((p["time"] for p in equity_curve), dtype=np.int64,
+                                count=len(equity_curve))
+        else:
+            times = None
+    except (ValueError, TypeError, OverflowError):
+        times = None
+    return equity, times
+
+
+def period_returns(equity):
+    """Simple returns between consecutive points (steps from zero equity skipped)."""
+    equity = np.asarray(equity, dtype=float)
+    prev, curr = equity[:-1], equity[1:]
+    valid = prev != 0
+    return (curr[valid] - prev[valid]) / prev[valid]
+
+
+def periods_per_year(times, n_points=None):
+    """Points per year implied by the first and last timestamp."""
+    if times is None or len(times) < 2:
+        return DEFAULT_PERIODS_PER_YEAR
+    total_seconds = float(times[-1] - times[0])
+    if total_seconds <= 0:
+        return DEFAULT_PERIODS_PER_YEAR
+    n_periods = (n_points if n_points is not None else len(times)) - 1
+    return max(1, SECONDS_PER_YEAR / (total_seconds / n_periods))
+
+
+def sharpe(returns, ppy=DEFAULT_PERIODS_PER_YEAR, risk_free_rate=0.0):
+    """Annualised Sharpe ratio of period returns (0.0 without variance)."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    if not std > 0:
+        return 0.0
+    excess = returns.mean() - risk_free_rate / ppy
+    return float(excess / std * math.sqrt(ppy))
+
+
+def sortino(returns, ppy=DEFAULT_PERIODS_PER_YEAR, risk_free_rate=0.0):
+    """Annualised Sortino ratio (downside deviation below zero)."""
+    returns = np.asarray(returns, dtype=float)
+    if len(returns) < 2:
+        return 0.0
+    downside = math.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    if downside == 0:
+        return 0.0
+    excess = returns.mean() - risk_free_rate / ppy
+    return float(excess / downside * math.sqrt(ppy))
+
+
+def drawdown(equity, times=None):
+    """Max drawdown (fraction of the running peak) and its duration.
+
+    Returns:
+        (max_drawdown, duration) — duration is the longest time spent
+        below a previous peak, in points, or in seconds if times are given
+        (a drawdown still open at the end counts up to the last point)
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    # Index of the latest peak at or before each point
+    steps = np.arange(len(equity))
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, steps, 0))
+    if times is not None:
+        times = np.asarray(times)
+        duration = int((times - times[last_peak]).max())
+    else:
+        duration = int((steps - last_peak).max())
+    return float(dd.max()), duration
+
+
+def max_drawdown(equity):
+    """Max drawdown of an equity series, as a fraction of the running peak."""
+    return drawdown(equity)[0]
+
+
+def closed_trade_equity(pnl, initial_capital):
+    """Equity after each closed trade, starting at initial_capital."""
+    pnl = np.asarray(pnl, dtype=float)
+    return initial_capital + np.concatenate(([0.0], np.cumsum(pnl)))
+
+
+def profit_factor(pnl):
+    """Gross profit / gross loss of trade PnL (0.0 if there are no losses)."""
+    pnl = np.asarray(pnl, dtype=float)
+    losses = pnl[pnl <= 0]
+    gross_loss = losses.sum()
+    if len(losses) == 0 or gross_loss == 0:
+        return 0.0
+    return float(abs(pnl[pnl > 0].sum() / gross_loss))
+
+
+def exposure(equity):
+    """Share of periods in which equity moved — a proxy for time in the market.
+
+    The equity curve is marked to market every bar, so it only stays flat
+    while no position is open.
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return 0.0
+    return float(np.count_nonzero(np.diff(equity)) / (len(equity) - 1))
+
+
+def yearly(equity, times):
+    """Per-calendar-year return and max drawdown.
+
+    Each year is treated as a fresh series: return from its first to its
+    last point, drawdown against that year's own running peak.
+
+    Returns:
+        dict year -> {return_pct, max_drawdown (both %), start, end (index
+        range into equity, end exclusive)}
+    """
+    equity = np.asarray(equity, dtype=float)
+    if times is None or len(equity) == 0:
+        return {}
+    years = np.asarray(times, dtype="datetime64[s]").astype("datetime64[Y]").astype(int) + 1970
+    # Points are in time order, so each year is one contiguous run
+    change = np.flatnonzero(np.diff(years)) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [len(years)]))
+    out = {}
+    for lo, hi in zip(starts, ends):
+        segment = equity[lo:hi]
+        first = segment[0]
+        ret = (segment[-1] - first) / first * 100 if first != 0 else 0.0
+        out[int(years[lo])] = {
+            "return_pct": float(ret),
+            "max_drawdown": max_drawdown(segment) * 100,
+            "start": int(lo),
+            "end": int(hi),
+        }
+    return out
+
+
+def performance(equity, times=None, pnl=None, risk_free_rate=0.0):
+    """All metrics for one equity series.
+
+    Args:
+        equity: equity at each point (mark-to-market)
+        times: seconds since the epoch for each point (annualisation,
+            drawdown duration and the yearly split need them)
+        pnl: closed-trade PnL (profit factor, trade counts)
+
+    Returns:
+        dict with return_pct, annualised_return, sharpe, sortino, calmar,
+        max_drawdown (%), max_drawdown_duration, exposure, profit_factor,
+        total_trades, win_rate and yearly
+    """
+    equity = np.asarray(equity, dtype=float)
+    if len(equity) < 2:
+        return {}
+    returns = period_returns(equity)
+    ppy = periods_per_year(times, len(equity))
+    dd, duration = drawdown(equity, times)
+
+    total_return = equity[-1] / equity[0] - 1 if equity[0] != 0 else 0.0
+    years = (len(equity) - 1) / ppy
+    if years > 0 and total_return > -1:
+        annualised = (1 + total_return) ** (1 / years) - 1
+    else:
+        annualised = total_return
+
+    out = {
+        "return_pct": total_return * 100,
+        "annualised_return": annualised * 100,
+        "sharpe": sharpe(returns, ppy, risk_free_rate),
+        "sortino": sortino(returns, ppy, risk_free_rate),
+        "calmar": annualised / dd if dd > 0 else 0.0,
+        "max_drawdown": dd * 100,
+        "max_drawdown_duration": duration,
+        "exposure": exposure(equity),
+        "yearly": yearly(equity, times),
+    }
+    if pnl is not None:
+        pnl = np.asarray(pnl, dtype=float)
+        out["profit_factor"] = profit_factor(pnl)
+        out["total_trades"] = len(pnl)
+        out["win_rate"] = float((pnl > 0).mean()) if len(pnl) else 0.0
+    return out
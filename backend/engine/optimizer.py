@@ -1,47 +1,102 @@
+import heapq
 import itertools
-import pandas as pd
+import json
+import math
 from .backtester import Backtester
 
+# Results kept by optimize() unless top_k says otherwise
+TOP_K = 100
+
+
 class Optimizer:
-    def __init__(self, data, strategy_class, events=None):
+    """Grid search over a strategy's parameters.
+
+    Combinations are generated lazily and only the best top_k results (by
+    the objective) are kept, in a heap, so memory doesn't grow with the
+    grid. Every result can also be streamed to a JSON-lines file.
+    """
+
+    def __init__(self, data, strategy_class, events=None, initial_capital=10000.0,
+                 spread=0.0, interval="1d"):
         self.data = data
         self.strategy_class = strategy_class
         self.events = events
+        self.initial_capital = initial_capital
+        self.spread = spread
+        self.interval = interval
+
+    @staticmethod
+    def count(param_ranges: dict):
+        """Number of combinations in param_ranges."""
+        return math.prod(len(list(v)) for v in param_ranges.values())
+
+    def run_one(self, params):
+        """Backtest one combination. Returns the simplified result dict."""
+        run_params = dict(params)
+        if self.events is not None:
+            # Backtester doesn't take events; strategies read them from here
+            run_params["_event_data"] = self.events
+        backtester = Backtester(self.data, self.strategy_class, parameters=run_params,
+                                initial_capital=self.initial_capital, spread=self.spread,
+                                interval=self.interval)
+        run_result = backtester.run()
+        return {
+            "parameters": params,
+            "return_pct": run_result["return_pct"],
+            "total_trades": run_result["total_trades"],
+            "final_equity": run_result["final_equity"],
+            "max_drawdown_pct": run_result.get("max_drawdown", 0.0),
+            "win_rate": run_result.get("win_rate", 0.0),
+            "profit_factor": run_result.get("profit_factor", 0.0),
+        }
+
+    def iter_results(self, param_ranges: dict):
+        """Yield the result of every combination, generating them lazily."""
+        keys = list(param_ranges.keys())
+        values = [list(v) for v in param_ranges.values()]
+        for combo in itertools.product(*values):
+            yield self.run_one(dict(zip(keys, combo)))
 
-    def optimize(self, param_ranges: dict):
+    def optimize(self, param_ranges: dict, top_k=TOP_K, objective="return_pct",
+                 spill_path=None):
         """
         Run grid search optimization.
         param_ranges: dict of {param_name: range(start, stop, step)} or list of values
+        top_k: number of best results to keep (None = keep all)
+        objective: result key or callable(result) -> float; higher is better
+        spill_path: also append every result to this JSON-lines file
+
+        Returns the kept results, best first (ties in combination order).
         """
-        # Generate all combinations
-        keys = param_ranges.keys()
-        values = param_ranges.values()
-        combinations = list(itertools.product(*values))
-        
-        results = []
-        
-        print(f"Starting optimization with {len(combinations)} combinations...")
-        
-        for i, combo in enumerate(combinations):
-            params = dict(zip(keys, combo))
-            
-            # Run Backtest
-            backtester = Backtester(self.data, self.strategy_class, events=self.events, parameters=params)
-            run_result = backtester.run()
-            
-            # Store simplified result
-            results.append({
-                "parameters": params,
-                "return_pct": run_result["return_pct"],
-                "total_trades": run_result["total_trades"],
-                "final_equity": run_result["final_equity"],
-                "max_drawdown_pct": run_result.get("max_drawdown_pct", 0.0) # Ensure this exists in backtester later if not
-            })
-            
-            if (i + 1) % 10 == 0:
-                print(f"Processed {i + 1}/{len(combinations)}...")
-                
-        # Sort by Return % (Descending)
-        sorted_results = sorted(results, key=lambda x: x["return_pct"], reverse=True)
-        
-        return sorted_results
+        param_ranges = {k: list(v) for k, v in param_ranges.items()}
+        score = objective if callable(objective) else (lambda r: r[objective])
+        total = self.count(param_ranges)
+        progress_every = max(10, total // 100)
+
+        print(f"Starting optimization with {total} combinations...")
+
+        # Min-heap of (score, -seq, result): the root is the worst kept result,
+        # and among equal scores the later combination
+        heap = []
+        spill = open(spill_path, "a") if spill_path else None
+        try:
+            for i, result in enumerate(self.iter_results(param_ranges)):
+                if spill is not None:
+                    spill.write(json.dumps(result, default=str) + "\n")
+
+                value = score(result)
+                if value is None or value != value:  # None / NaN rank last
+                    value = -math.inf
+                item = (value, -i, result)
+                if top_k is None or len(heap) < top_k:
+                    heapq.heappush(heap, item)
+                elif item[:2] > heap[0][:2]:
+                    heapq.heapreplace(heap, item)
+
+                if (i + 1) % progress_every == 0:
+                    print(f"Processed {i + 1}/{total}...")
+        finally:
+            if spill is not None:
+                spill.close()
+
+        return [result for _, _, result in sorted(heap, key=lambda x: x[:2], reverse=True)]
@@ -0,0 +1,162 @@
+"""Shared-memory OHLCV frames for multiprocessing workers.
+
+Pool workers used to each load and parse their own copy of the bars.
+With SharedDataPlane the parent loads every (symbol, timeframe) once and
+publishes it into a multiprocessing.shared_memory block:
+
+    [ int64 timestamps (n) | float64 column 0 (n) | float64 column 1 (n) | ... ]
+
+The picklable handle (block name, length, column names, tz) is sent to
+the workers instead of the data. attach_frame() maps the block and wraps
+it in a DataFrame whose columns are zero-copy views, so N workers cost
+one copy of the data instead of N.
+
+The parent owns the blocks: close() (or leaving the `with` block)
+unlinks them once the workers are done; release() drops a single frame
+early. Long-lived workers should detach_frame() a handle once they are
+done with it, or its mapping stays open for the life of the process.
+"""
+
+import sys
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class SharedFrameHandle:
+    """Everything a worker needs to re-attach a published frame."""
+    shm_name: str
+    length: int
+    columns: tuple
+    tz: str = "UTC"
+    index_name: str = "Date"
+
+
+# Blocks attached in this process (kept open while frames reference them)
+_ATTACHED = {}
+
+
+class SharedDataPlane:
+    """Parent-side registry of published frames, keyed by e.g. (symbol, timeframe)."""
+
+    def __init__(self):
+        self.handles = {}
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, key):
+        return key in self.handles
+
+    def publish(self, key, df):
+        """Copy df (DatetimeIndex + numeric columns) into shared memory once.
+
+        Returns the handle; publishing an existing key returns its handle.
+        An empty/None frame is recorded as None so workers know not to reload it.
+        """
+        if key in self.handles:
+            return self.handles[key]
+        if df is None or df.empty:
+            self.handles[key] = None
+            return None
+
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        ts = index.to_numpy(dtype="datetime64[ns]").astype("int64")
+        values = df.to_numpy(dtype="float64")
+        n, ncols = values.shape
+
+        shm = shared_memory.SharedMemory(create=True, size=max(8, 8 * n * (ncols + 1)))
+        self._blocks[key] = shm
+        ts_view, col_view = _views(shm, n, ncols)
+        ts_view[:] = ts
+        col_view[:] = values.T
+
+        handle = SharedFrameHandle(
+            shm_name=shm.name,
+            length=n,
+            columns=tuple(df.columns),
+            tz=tz,
+            index_name=index.name,
+        )
+        self.handles[key] = handle
+        return handle
+
+    def release(self, key):
+        """Unlink one published frame (workers still attached keep their mapping)."""
+        self.handles.pop(key, None)
+        shm = self._blocks.pop(key, None)
+        if shm is not None:
+            _unlink(shm)
+
+    def close(self):
+        """Release and unlink every published block."""
+        for shm in self._blocks.values():
+            _unlink(shm)
+        self._blocks = {}
+        self.handles = {}
+
+
+def _unlink(shm):
+    try:
+        shm.close()
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+def attach_frame(handle):
+    """Worker-side: DataFrame over the shared block (columns are read-only views).
+
+    Adding columns (indicators) is fine; they live in the worker's own memory.
+    """
+    shm = _ATTACHED.get(handle.shm_name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=handle.shm_name)
+        _ATTACHED[handle.shm_name] = shm
+
+    ts_view, col_view = _views(shm, handle.length, len(handle.columns))
+    col_view.flags.writeable = False
+
+    index = pd.DatetimeIndex(ts_view.view("datetime64[ns]"), name=handle.index_name)
+    if handle.tz is not None:
+        index = index.tz_localize("UTC").tz_convert(handle.tz)
+    return pd.DataFrame(
+        {col: col_view[i] for i, col in enumerate(handle.columns)},
+        index=index,
+        copy=False,
+    )
+
+
+def detach_frame(handle):
+    """Worker-side: unmap a block attached by attach_frame.
+
+    Only once nothing references its frames any more (closing the map
+    under a live view would crash on the next read); returns False and
+    keeps the block while something still does.
+    """
+    shm = _ATTACHED.get(handle.shm_name)
+    if shm is None:
+        return True
+    # Views keep the mmap alive through their base; without any, the only
+    # references are shm._mmap, shm.buf and getrefcount's own argument
+    if sys.getrefcount(shm._mmap) > 3:
+        return False
+    del _ATTACHED[handle.shm_name]
+    shm.close()
+    return True
+
+
+def _views(shm, n, ncols):
+    ts_view = np.ndarray((n,), dtype="int64", buffer=shm.buf, offset=0)
+    col_view = np.ndarray((ncols, n), dtype="float64", buffer=shm.buf, offset=8 * n)
+    return ts_view, col_view
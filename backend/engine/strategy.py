@@ -2,6 +2,18 @@ from abc import ABC, abstractmethod
 import pandas as pd
 
 class Strategy(ABC):
+    # Parameter dependencies for sweeps: param -> {parent: [values where param is read]}.
+    # A param whose parents (or their PARAM_DEFAULTS when absent) fall outside those
+    # values has no effect, so the sweep engine drops it and runs the combo once.
+    PARAM_DEPENDENCIES = {}
+    PARAM_DEFAULTS = {}
+
+    # Params that change the indicator columns computed in __init__ (the rest only
+    # change trading rules). None = not declared: the sweep engine then computes
+    # indicators per combo as before. Strategies that declare it skip their own
+    # indicator pass when parameters['_indicators_ready'] is set.
+    INDICATOR_PARAMS = None
+
     def __init__(self, data: pd.DataFrame, events: pd.DataFrame = None, parameters: dict = {}, initial_cash: float = 10000.0, broker=None):
         self.data = data
         self.events = events
@@ -18,6 +30,17 @@ class Strategy(ABC):
         self.trades = [] 
         self.equity_curve = []
 
+    @classmethod
+    def precompute_indicators(cls, data, parameters):
+        """Copy of data with this strategy's indicator columns for parameters.
+
+        Combos that agree on INDICATOR_PARAMS can all run on the same copy
+        with parameters['_indicators_ready'] = True.
+        """
+        enriched = data.copy()
+        cls(enriched, None, dict(parameters), 10000.0, None)
+        return enriched
+
     @abstractmethod
     def on_data(self, index, row):
         """
@@ -1,7 +1,9 @@
 """Generate all valid strategy combinations from building blocks.
 
 Produces parameter dicts that can be passed to ComposableStrategy
-and run through the sweep engine or backtester.
+and run through the sweep engine or backtester. CombinationSpace numbers
+the combinations so each one can be built from its index alone, and
+splits them into deterministic shards for parallel or multi-machine runs.
 """
 
 import itertools
@@ -69,12 +71,112 @@ def _is_compatible(entry, exit_fn, filter_fn):
     return True
 
 
+def _compatible_triples(entries, exits, filters, check_compat=True):
+    """(entry, exit, filter) index triples that pass the compatibility check.
+
+    Compatibility doesn't depend on the sizer, so this is the only part of
+    the space that has to be enumerated; sizers multiply it.
+    """
+    return [
+        (e, x, f)
+        for e, x, f in itertools.product(range(len(entries)), range(len(exits)), range(len(filters)))
+        if not check_compat or _is_compatible(entries[e], exits[x], filters[f])
+    ]
+
+
+def _make_params(entry, exit_fn, filter_fn, sizer, symbol):
+    label = f"{entry.name} | {exit_fn.name} | {filter_fn.name} | {sizer.name}"
+
+    params = {
+        "symbol": symbol,
+        "entry_fn": entry,
+        "exit_fn": exit_fn,
+        "filter_fn": filter_fn,
+        "sizer_fn": sizer,
+        # Label for experiment tracking
+        "_entry_name": entry.name,
+        "_exit_name": exit_fn.name,
+        "_filter_name": filter_fn.name,
+        "_sizer_name": sizer.name,
+        "_label": label,
+    }
+    return params, label
+
+
+def params_from_names(names, symbol="GLD"):
+    """(params_dict, label_string) from stored block names ({entry, exit, filter, sizer}).
+
+    Returns None if a name isn't one of the current building blocks.
+    """
+    try:
+        entry = next(b for b in ENTRIES if b.name == names["entry"])
+        exit_fn = next(b for b in EXITS if b.name == names["exit"])
+        filter_fn = next(b for b in FILTERS if b.name == names["filter"])
+        sizer = next(b for b in SIZERS if b.name == names["sizer"])
+    except (KeyError, StopIteration):
+        return None
+    return _make_params(entry, exit_fn, filter_fn, sizer, symbol)
+
+
+class CombinationSpace:
+    """Indexable view of every valid (entry, exit, filter, sizer) combination.
+
+    Combo i is the i-th valid combination in itertools.product order
+    (entries outermost, sizers innermost), so the same blocks always give
+    the same numbering. Nothing is materialised beyond the compatible
+    (entry, exit, filter) triples: combos are built on access.
+
+    Shard k of n holds the combos with index % n == k, which spreads every
+    entry/exit type evenly over the shards.
+    """
+
+    def __init__(self, entries=None, exits=None, filters=None, sizers=None,
+                 symbol="GLD", timeframe="1h", check_compat=True):
+        self.entries = entries or ENTRIES
+        self.exits = exits or EXITS
+        self.filters = filters or FILTERS
+        self.sizers = sizers or SIZERS
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self._triples = _compatible_triples(self.entries, self.exits, self.filters, check_compat)
+
+    def __len__(self):
+        return len(self._triples) * len(self.sizers)
+
+    def __getitem__(self, index):
+        """(params_dict, label_string) of combo `index`."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"combination index {index} out of range ({len(self)})")
+        triple, s = divmod(index, len(self.sizers))
+        e, x, f = self._triples[triple]
+        return _make_params(self.entries[e], self.exits[x], self.filters[f],
+                            self.sizers[s], self.symbol)
+
+    def indices(self, shard=0, n_shards=1, limit=None):
+        """Combo indices of shard `shard` of `n_shards` (optionally the first `limit`)."""
+        if not 0 <= shard < n_shards:
+            raise ValueError(f"shard {shard} out of range for {n_shards} shards")
+        indices = range(shard, len(self), n_shards)
+        return indices if limit is None else indices[:limit]
+
+    def iter(self, shard=0, n_shards=1, limit=None):
+        """Lazily yield (index, params_dict, label_string) for a shard."""
+        for i in self.indices(shard, n_shards, limit):
+            params, label = self[i]
+            yield i, params, label
+
+
 def generate_combinations(
     entries=None, exits=None, filters=None, sizers=None,
     symbol="GLD", timeframe="1h", check_compat=True
 ):
     """Generate all valid parameter dicts for ComposableStrategy.
 
+    Builds the full list; use CombinationSpace to address or shard the
+    combinations without materialising them.
+
     Args:
         entries: List of entry callables (default: all)
         exits: List of exit callables (default: all)
@@ -87,43 +189,13 @@ def generate_combinations(
     Returns:
         List of (params_dict, label_string) tuples
     """
-    entries = entries or ENTRIES
-    exits = exits or EXITS
-    filters = filters or FILTERS
-    sizers = sizers or SIZERS
-
-    combos = []
-
-    for entry, exit_fn, filter_fn, sizer in itertools.product(
-        entries, exits, filters, sizers
-    ):
-        if check_compat and not _is_compatible(entry, exit_fn, filter_fn):
-            continue
-
-        label = f"{entry.name} | {exit_fn.name} | {filter_fn.name} | {sizer.name}"
-
-        params = {
-            "symbol": symbol,
-            "entry_fn": entry,
-            "exit_fn": exit_fn,
-            "filter_fn": filter_fn,
-            "sizer_fn": sizer,
-            # Label for experiment tracking
-            "_entry_name": entry.name,
-            "_exit_name": exit_fn.name,
-            "_filter_name": filter_fn.name,
-            "_sizer_name": sizer.name,
-            "_label": label,
-        }
-
-        combos.append((params, label))
-
-    return combos
+    space = CombinationSpace(entries, exits, filters, sizers, symbol, timeframe, check_compat)
+    return [(params, label) for _, params, label in space.iter()]
 
 
-def count_combinations(check_compat=True):
+def count_combinations(check_compat=True, entries=None, exits=None, filters=None, sizers=None):
     """Count total combinations without generating them."""
-    return len(generate_combinations(check_compat=check_compat))
+    return len(CombinationSpace(entries, exits, filters, sizers, check_compat=check_compat))
 
 
 def describe():
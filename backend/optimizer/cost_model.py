@@ -0,0 +1,157 @@
+"""Runtime cost model for overnight planning.
+
+Learns how long work takes from past runs, stored in the research DB:
+
+    sweep:     CPU seconds per (bar x combo), per strategy and timeframe
+    validate:  seconds per candidate, per strategy
+
+SweepEngine records every batch of backtests it runs (when given a
+CostModel) and run_overnight records each validation. Predictions fall
+back from (strategy, timeframe) to strategy to the whole kind, and
+finally to DEFAULT_RATES when nothing has been recorded yet, so the very
+first night still gets a (rough) plan.
+
+Bar counts per (symbol, timeframe) come from the same records: each
+stores the bars and the days they spanned, and bars() scales the latest
+bars-per-day to the span asked for, so a short test sweep and a full
+2020-2025 one aren't costed alike. Unseen targets (and records from
+before spans were stored) are estimated from BARS_PER_YEAR.
+"""
+
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from backend.optimizer.experiment_tracker import DB_FILE
+
+
+# Used until a run of the same kind has been recorded
+DEFAULT_RATES = {
+    "sweep": 5e-5,      # CPU seconds per bar per combo
+    "validate": 120.0,  # seconds per candidate
+}
+
+# Most recent records used per estimate (older runs may predate speedups)
+HISTORY = 50
+
+# Regular-session bars per year by timeframe (6.5h x 252 days)
+BARS_PER_YEAR = {
+    "1m": 98_280,
+    "5m": 19_656,
+    "15m": 6_552,
+    "1h": 1_764,
+    "4h": 504,
+    "1d": 252,
+}
+
+
+class CostModel:
+    """Records task timings and predicts runtimes from them."""
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self._ensure_table()
+
+    def _get_conn(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_table(self):
+        conn = self._get_conn()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS run_costs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                symbol TEXT,
+                timeframe TEXT,
+                bars INTEGER,
+                units REAL NOT NULL,
+                seconds REAL NOT NULL,
+                workers INTEGER NOT NULL DEFAULT 1,
+                days REAL
+            )
+        ''')
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(run_costs)")}
+        if "days" not in columns:
+            conn.execute("ALTER TABLE run_costs ADD COLUMN days REAL")
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_run_costs_kind ON run_costs(kind, strategy, timeframe)')
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Record
+    # ------------------------------------------------------------------
+
+    def record(self, kind, strategy, units, seconds, symbol=None, timeframe=None,
+               bars=None, workers=1, days=None):
+        """Store one timing. units: bars x combos for sweeps, candidates for validation.
+
+        days is the span (first to last bar) the `bars` covered.
+        """
+        if units <= 0 or seconds <= 0:
+            return
+        conn = self._get_conn()
+        with conn:
+            conn.execute('''
+                INSERT INTO run_costs (created_at, kind, strategy, symbol, timeframe,
+                                       bars, units, seconds, workers, days)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (datetime.now().isoformat(), kind, strategy, symbol, timeframe,
+                  bars, float(units), float(seconds), int(workers), days))
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Predict
+    # ------------------------------------------------------------------
+
+    def rate(self, kind, strategy=None, timeframe=None):
+        """CPU seconds per unit, from the most specific history available."""
+        conn = self._get_conn()
+        try:
+            for where, args in [
+                ("kind = ? AND strategy = ? AND timeframe = ?", (kind, strategy, timeframe)),
+                ("kind = ? AND strategy = ?", (kind, strategy)),
+                ("kind = ?", (kind,)),
+            ]:
+                if None in args:
+                    continue
+                rows = conn.execute(f'''
+                    SELECT units, seconds * workers AS cpu FROM run_costs
+                    WHERE {where} ORDER BY id DESC LIMIT ?
+                ''', (*args, HISTORY)).fetchall()
+                if rows:
+                    return sum(r["cpu"] for r in rows) / sum(r["units"] for r in rows)
+        finally:
+            conn.close()
+        return DEFAULT_RATES[kind]
+
+    def bars(self, symbol, timeframe, start, end):
+        """Bars a (symbol, timeframe) load of start..end returns.
+
+        The latest recorded bars per day on the target, scaled to the
+        span; estimated from BARS_PER_YEAR if none was recorded.
+        """
+        days = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds() / 86400, 0)
+        conn = self._get_conn()
+        row = conn.execute('''
+            SELECT bars, days FROM run_costs
+            WHERE kind = 'sweep' AND symbol = ? AND timeframe = ? AND bars > 0 AND days > 0
+            ORDER BY id DESC LIMIT 1
+        ''', (symbol, timeframe)).fetchone()
+        conn.close()
+        if row:
+            return int(round(row["bars"] / row["days"] * days))
+        return int(BARS_PER_YEAR.get(timeframe, BARS_PER_YEAR["1h"]) * days / 365.25)
+
+    def predict_sweep(self, strategy, symbol, timeframe, backtests, start, end, workers=1):
+        """Wall seconds for `backtests` full-period runs of strategy on a target."""
+        cpu = self.rate("sweep", strategy, timeframe) * self.bars(symbol, timeframe, start, end) * backtests
+        return cpu / max(1, workers)
+
+    def predict_validation(self, candidates, strategy=None, workers=1):
+        """Wall seconds to validate `candidates` candidates on `workers` processes."""
+        return self.rate("validate", strategy) * candidates / max(1, workers)
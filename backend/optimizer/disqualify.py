@@ -1,8 +1,12 @@
 """Hard disqualification filters for backtest results.
 
-Fast checks that reject candidates before expensive validation.
+Fast checks that reject candidates before expensive validation, plus
+the same rules as early-abort predicates for Backtester(abort_predicates=...).
 """
 
+# Abort reasons that prove the full run would fail too (safe to record as rejected)
+EXACT_ABORTS = ("drawdown_too_high",)
+
 DISQUALIFICATION_RULES = {
     "min_trades": 30,
     "min_trades_per_year": 6,
@@ -50,3 +54,59 @@ def passes_disqualification(result, years=None, rules=None):
         return False, f"win_rate_too_high ({wr:.2f} > {r['max_win_rate']})"
 
     return True, None
+
+
+# ---------------------------------------------------------------------------
+# Early-abort predicates (checked by Backtester during the run)
+# ---------------------------------------------------------------------------
+
+def max_drawdown_abort(limit):
+    """Abort once closed-trade drawdown passes `limit` %.
+
+    Exact: drawdown never recovers its running max, so the final result
+    would fail the max_drawdown rule anyway.
+    """
+    def check(progress):
+        if progress.max_drawdown > limit:
+            return f"drawdown_too_high ({progress.max_drawdown:.1f}% > {limit}%)"
+        return None
+    return check
+
+
+def min_trades_abort(min_trades, min_progress=0.5, slack=2.0):
+    """Abort when the trade rate so far can't plausibly reach `min_trades`.
+
+    Heuristic: after `min_progress` of the bars, project the remaining
+    trades at `slack` times the rate so far. A strategy whose trades pick
+    up late (regime change) can beat the projection, so this is opt-in
+    (abort_predicates(heuristic=True)) and its aborts are not exact.
+    """
+    def check(progress):
+        done = progress.bar / progress.total_bars if progress.total_bars else 1.0
+        if done < min_progress:
+            return None
+        rate = progress.total_trades / progress.bar
+        projected = progress.total_trades + rate * (progress.total_bars - progress.bar) * slack
+        if projected < min_trades:
+            return f"too_few_trades (projected {projected:.0f} < {min_trades} at {done:.0%})"
+        return None
+    return check
+
+
+def abort_predicates(rules=None, heuristic=False):
+    """Backtester abort predicates for the drawdown rule.
+
+    With heuristic, also the (inexact) trade-count projection.
+    """
+    r = rules or DISQUALIFICATION_RULES
+    predicates = []
+    if r.get("max_drawdown") is not None:
+        predicates.append(max_drawdown_abort(r["max_drawdown"]))
+    if heuristic and r.get("min_trades"):
+        predicates.append(min_trades_abort(r["min_trades"]))
+    return predicates
+
+
+def is_exact_abort(reason):
+    """True if an abort reason proves the complete run would be disqualified too."""
+    return bool(reason) and reason.startswith(EXACT_ABORTS)
@@ -3,18 +3,39 @@
 Tests each enhancement independently against the GLD 15m Sharpe 1.66 baseline,
 then tests the best combinations.
 
+Every variant is the baseline plus a few overrides that never touch the
+strategy's INDICATOR_PARAMS, so they all run on one enriched frame (built
+once per process, see sweep.run_combo). With --workers N the variants run
+as one wave on a process pool, the bars shared through SharedDataPlane.
+The baseline result is cached in BASELINE_CACHE_FILE, keyed by its params,
+the exact bars and the strategy module's source, so re-running with a new
+idea only backtests the variants (and editing the strategy re-runs it).
+The run ends with a variant-vs-baseline delta table.
+
+The event-blackout variants need the high-impact event times; they are
+loaded once for the run (as runner.py does for --event-blackout) and
+passed to the variants with event_blackout_hours set as _event_times.
+
 Usage:
     python -m backend.optimizer.enhancement_sweep
+    python -m backend.optimizer.enhancement_sweep --workers 8
 """
 
-import sys
+import argparse
+import hashlib
+import inspect
+import json
 import os
-import io
-from contextlib import contextmanager
-from backend.engine.backtester import Backtester
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from backend.engine.data_loader import DataLoader
 from backend.engine.data_utils import load_backtest_data
+from backend.engine.shared_data import SharedDataPlane, attach_frame
 from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
-from backend.optimizer.scoring import calc_sharpe
+from backend.optimizer.sweep import run_combo, silence_worker_stdout, suppress_stdout
 
 # GLD 15m validated baseline params
 BASELINE = {
@@ -29,44 +50,197 @@ BASELINE = {
     'dynamic_adx': False,
 }
 
+BASELINE_CACHE_FILE = "backend/enhancement_baseline.json"
 
-@contextmanager
-def suppress_stdout():
-    """Suppress print output during backtests."""
-    old_stdout = sys.stdout
-    sys.stdout = io.StringIO()
-    try:
-        yield
-    finally:
-        sys.stdout = old_stdout
+# (category, [(label, overrides), ...]) — each variant is BASELINE + overrides
+ENHANCEMENTS = [
+    ("ENHANCEMENT 1: DAY-OF-WEEK FILTER", [
+        ("Skip Monday", {'skip_days': [0]}),
+        ("Skip Friday", {'skip_days': [4]}),
+        ("Skip Mon+Fri", {'skip_days': [0, 4]}),
+    ]),
+    ("ENHANCEMENT 2: TRAILING STOP", [
+        ("Trail 2x ATR after 3 bars", {'trailing_stop': True, 'trail_after_bars': 3, 'trail_atr': 2.0}),
+        ("Trail 2x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0}),
+        ("Trail 2x ATR after 10 bars", {'trailing_stop': True, 'trail_after_bars': 10, 'trail_atr': 2.0}),
+        ("Trail 1.5x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 1.5}),
+        ("Trail 3x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 3.0}),
+        ("Trail 2x ATR after 20 bars", {'trailing_stop': True, 'trail_after_bars': 20, 'trail_atr': 2.0}),
+    ]),
+    ("ENHANCEMENT 3: MINIMUM HOLD BARS", [
+        ("Min hold 3 bars", {'min_hold_bars': 3}),
+        ("Min hold 5 bars", {'min_hold_bars': 5}),
+        ("Min hold 10 bars", {'min_hold_bars': 10}),
+        ("Min hold 20 bars", {'min_hold_bars': 20}),
+    ]),
+    ("ENHANCEMENT 4: TRADING HOURS (UTC)", [
+        ("US session 14-21", {'trading_hours': [14, 21]}),
+        ("Skip open 15-21", {'trading_hours': [15, 21]}),
+    ]),
+    ("ENHANCEMENT 5: EVENT BLACKOUT", [
+        ("Blackout 2h around events", {'event_blackout_hours': 2}),
+        ("Blackout 6h around events", {'event_blackout_hours': 6}),
+    ]),
+    ("COMBINATIONS (best from each category)", [
+        ("Skip Mon + Trail 2x/5bar", {
+            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0}),
+        ("Skip Mon + Min hold 5", {
+            'skip_days': [0], 'min_hold_bars': 5}),
+        ("Trail 2x/5bar + Min hold 5", {
+            'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0, 'min_hold_bars': 5}),
+        ("All three: Skip Mon + Trail 2x/5bar + Hold 5", {
+            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0, 'min_hold_bars': 5}),
+        ("Skip Mon + Trail 2x/10bar + Hold 10", {
+            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 10, 'trail_atr': 2.0, 'min_hold_bars': 10}),
+    ]),
+]
 
+METRICS = ('sharpe', 'return_pct', 'total_trades', 'win_rate', 'max_drawdown', 'profit_factor')
 
-def run_backtest(data, params):
-    """Run single backtest with suppressed output, return results + Sharpe."""
+
+def _summary(results):
+    return {key: results[key] for key in METRICS}
+
+
+def run_backtest(data, params, timeframe='15m', indicator_cache=None):
+    """Run single backtest with suppressed output, return results + Sharpe.
+
+    Pass the same indicator_cache dict for runs on the same data to reuse
+    the enriched frame.
+    """
     with suppress_stdout():
-        bt = Backtester(
-            data=data,
-            strategy_class=StochRSIMeanReversionStrategy,
-            parameters=params,
-            initial_capital=10000.0,
-            spread=0.0003,
-            execution_delay=0,
-            interval='15m',
-        )
-        results = bt.run()
-
-    # Calculate Sharpe from equity curve
-    equity_curve = results.get('equity_curve', [])
-    sharpe = calc_sharpe(equity_curve) if equity_curve else 0.0
-
-    return {
-        'return_pct': results['return_pct'],
-        'sharpe': sharpe,
-        'total_trades': results['total_trades'],
-        'win_rate': results['win_rate'],
-        'max_drawdown': results['max_drawdown'],
-        'profit_factor': results['profit_factor'],
+        results = run_combo(data, StochRSIMeanReversionStrategy, params, timeframe,
+                            indicator_cache=indicator_cache)
+    return _summary(results)
+
+
+# ---------------------------------------------------------------------------
+# Baseline cache
+# ---------------------------------------------------------------------------
+
+def _code_fingerprint(strategy_class=StochRSIMeanReversionStrategy):
+    """Hash of the source of the module defining strategy_class."""
+    source = inspect.getsource(inspect.getmodule(strategy_class))
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def _baseline_key(data, params, timeframe):
+    """Changes whenever the params, the bars (span, length, last close) or the code do."""
+    fingerprint = {
+        "strategy": StochRSIMeanReversionStrategy.__name__,
+        "code": _code_fingerprint(),
+        "params": params,
+        "timeframe": timeframe,
+        "bars": [len(data), str(data.index[0]), str(data.index[-1]),
+                 float(data['Close'].iloc[-1])],
     }
+    return hashlib.sha256(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def baseline_result(data, params=BASELINE, timeframe='15m', cache_file=BASELINE_CACHE_FILE,
+                    indicator_cache=None):
+    """Baseline summary, from cache_file when the same params/bars/code ran before.
+
+    Returns:
+        (summary, cached)
+    """
+    key = _baseline_key(data, params, timeframe)
+    cache = {}
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with open(cache_file) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            cache = {}
+    if key in cache:
+        return cache[key], True
+
+    summary = run_backtest(data, params, timeframe, indicator_cache)
+    if cache_file:
+        cache[key] = summary
+        with open(cache_file, "w") as f:
+            json.dump(cache, f, indent=2)
+    return summary, False
+
+
+# ---------------------------------------------------------------------------
+# Variant runner
+# ---------------------------------------------------------------------------
+
+_WORKER = {}
+
+
+def _init_worker(handle, timeframe):
+    _WORKER.update(data=attach_frame(handle), timeframe=timeframe, indicator_cache={})
+    silence_worker_stdout()
+
+
+def _run_variant(params):
+    """Worker: (summary, error) for one variant."""
+    try:
+        return run_backtest(_WORKER["data"], params, _WORKER["timeframe"],
+                            _WORKER["indicator_cache"]), None
+    except Exception as e:
+        return None, str(e)
+
+
+def run_variants(data, variants, baseline=BASELINE, timeframe='15m', workers=1,
+                 indicator_cache=None, event_times=None):
+    """Backtest baseline + overrides for every variant.
+
+    Args:
+        variants: list of (label, overrides)
+        workers: processes (1 = run here, reusing indicator_cache)
+        event_times: event timestamps (get_event_blackout_times) for the
+            variants that set event_blackout_hours; without them those
+            variants can't black anything out
+
+    Returns:
+        list of (label, summary, error) in variant order — summary is
+        None when error is set
+    """
+    jobs = [{**baseline, **overrides} for _, overrides in variants]
+    for params in jobs:
+        if params.get('event_blackout_hours') and event_times is not None:
+            params['_event_times'] = event_times
+    workers = min(workers, len(jobs))
+    if workers > 1:
+        with SharedDataPlane() as plane, ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker,
+            initargs=(plane.publish("bars", data), timeframe),
+        ) as pool:
+            outcomes = list(pool.map(_run_variant, jobs))
+    else:
+        indicator_cache = {} if indicator_cache is None else indicator_cache
+        outcomes = []
+        for params in jobs:
+            try:
+                outcomes.append((run_backtest(data, params, timeframe, indicator_cache), None))
+            except Exception as e:
+                outcomes.append((None, str(e)))
+    return [(label, summary, error)
+            for (label, _), (summary, error) in zip(variants, outcomes)]
+
+
+def delta_table(baseline, rows):
+    """DataFrame of each variant's metrics and its change vs the baseline.
+
+    Args:
+        baseline: baseline summary
+        rows: (category, label, summary) with summary None for failed runs
+    """
+    records = []
+    for category, label, summary in rows:
+        if summary is None:
+            continue
+        record = {"category": category, "variant": label}
+        for key in METRICS:
+            record[key] = summary[key]
+            record[f"d_{key}"] = summary[key] - baseline[key]
+        records.append(record)
+    if not records:
+        return pd.DataFrame()
+    return pd.DataFrame(records).sort_values("d_sharpe", ascending=False, ignore_index=True)
 
 
 def print_result(label, r, baseline_sharpe=None):
@@ -82,85 +256,81 @@ def print_result(label, r, baseline_sharpe=None):
 
 
 def main():
-    print("Loading GLD 15m data...")
-    data = load_backtest_data('GLD', '15m', '2020-01-01', '2025-06-01')
+    parser = argparse.ArgumentParser(description="A/B sweep of enhancements vs baseline")
+    parser.add_argument("--symbol", type=str, default="GLD")
+    parser.add_argument("--timeframe", type=str, default="15m")
+    parser.add_argument("--start", type=str, default="2020-01-01")
+    parser.add_argument("--end", type=str, default="2025-06-01")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes to run the variants on (default: 1)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-run the baseline even if it is cached")
+    args = parser.parse_args()
+
+    baseline_params = {**BASELINE, 'symbol': args.symbol}
+
+    print(f"Loading {args.symbol} {args.timeframe} data...")
+    data = load_backtest_data(args.symbol, args.timeframe, args.start, args.end)
     print(f"  Bars: {len(data)}")
+    if data.empty:
+        print(f"ERROR: No data for {args.symbol} {args.timeframe}")
+        return
 
     # --- Baseline ---
+    indicator_cache = {}
     print("\nRunning baseline...")
-    baseline = run_backtest(data, BASELINE)
+    baseline, cached = baseline_result(
+        data, baseline_params, args.timeframe,
+        cache_file=None if args.no_cache else BASELINE_CACHE_FILE,
+        indicator_cache=indicator_cache,
+    )
     bs = baseline['sharpe']
     print(f"\n{'='*110}")
-    print(f"BASELINE")
+    print(f"BASELINE{' (cached)' if cached else ''}")
     print(f"{'='*110}")
-    print_result("GLD 15m StochRSI (validated)", baseline)
+    print_result(f"{args.symbol} {args.timeframe} StochRSI (validated)", baseline)
 
-    # --- Enhancement 1: Monday Filter ---
-    print(f"\n{'='*110}")
-    print("ENHANCEMENT 1: DAY-OF-WEEK FILTER")
-    print(f"{'='*110}")
-    day_variants = [
-        ("Skip Monday", {'skip_days': [0]}),
-        ("Skip Friday", {'skip_days': [4]}),
-        ("Skip Mon+Fri", {'skip_days': [0, 4]}),
-    ]
-    for label, overrides in day_variants:
-        params = {**BASELINE, **overrides}
-        r = run_backtest(data, params)
-        print_result(label, r, bs)
-
-    # --- Enhancement 2: Trailing Stop ---
-    print(f"\n{'='*110}")
-    print("ENHANCEMENT 2: TRAILING STOP")
-    print(f"{'='*110}")
-    trail_variants = [
-        ("Trail 2x ATR after 3 bars", {'trailing_stop': True, 'trail_after_bars': 3, 'trail_atr': 2.0}),
-        ("Trail 2x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0}),
-        ("Trail 2x ATR after 10 bars", {'trailing_stop': True, 'trail_after_bars': 10, 'trail_atr': 2.0}),
-        ("Trail 1.5x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 1.5}),
-        ("Trail 3x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 3.0}),
-        ("Trail 2x ATR after 20 bars", {'trailing_stop': True, 'trail_after_bars': 20, 'trail_atr': 2.0}),
-    ]
-    for label, overrides in trail_variants:
-        params = {**BASELINE, **overrides}
-        r = run_backtest(data, params)
-        print_result(label, r, bs)
+    # --- All variants in one wave ---
+    variants = [(label, overrides) for _, group in ENHANCEMENTS for label, overrides in group]
+    categories = [category for category, group in ENHANCEMENTS for _ in group]
+    event_times = None
+    if any(overrides.get('event_blackout_hours') for _, overrides in variants):
+        event_times = DataLoader().get_event_blackout_times(args.start, args.end, currency='USD')
+        if not event_times:
+            print("  WARNING: no event times loaded — the blackout variants will match the baseline")
+    t0 = time.time()
+    print(f"\nRunning {len(variants)} variants on {max(1, min(args.workers, len(variants)))} "
+          f"worker(s)...")
+    outcomes = run_variants(data, variants, baseline_params, args.timeframe,
+                            workers=args.workers, indicator_cache=indicator_cache,
+                            event_times=event_times)
+    print(f"  Done in {time.time() - t0:.1f}s")
 
-    # --- Enhancement 3: Minimum Hold Period ---
-    print(f"\n{'='*110}")
-    print("ENHANCEMENT 3: MINIMUM HOLD BARS")
-    print(f"{'='*110}")
-    hold_variants = [
-        ("Min hold 3 bars", {'min_hold_bars': 3}),
-        ("Min hold 5 bars", {'min_hold_bars': 5}),
-        ("Min hold 10 bars", {'min_hold_bars': 10}),
-        ("Min hold 20 bars", {'min_hold_bars': 20}),
-    ]
-    for label, overrides in hold_variants:
-        params = {**BASELINE, **overrides}
-        r = run_backtest(data, params)
-        print_result(label, r, bs)
+    current = None
+    for category, (label, summary, error) in zip(categories, outcomes):
+        if category != current:
+            current = category
+            print(f"\n{'='*110}")
+            print(category)
+            print(f"{'='*110}")
+        if error is not None:
+            print(f"  {label:<45s} ERROR: {error}")
+            continue
+        print_result(label, summary, bs)
+    rows = [(category, label, summary)
+            for category, (label, summary, _) in zip(categories, outcomes)]
 
-    # --- Combinations of winners ---
+    table = delta_table(baseline, rows)
     print(f"\n{'='*110}")
-    print("COMBINATIONS (best from each category)")
+    print("VARIANT vs BASELINE (sorted by Sharpe delta)")
     print(f"{'='*110}")
-    combo_variants = [
-        ("Skip Mon + Trail 2x/5bar", {
-            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0}),
-        ("Skip Mon + Min hold 5", {
-            'skip_days': [0], 'min_hold_bars': 5}),
-        ("Trail 2x/5bar + Min hold 5", {
-            'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0, 'min_hold_bars': 5}),
-        ("All three: Skip Mon + Trail 2x/5bar + Hold 5", {
-            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0, 'min_hold_bars': 5}),
-        ("Skip Mon + Trail 2x/10bar + Hold 10", {
-            'skip_days': [0], 'trailing_stop': True, 'trail_after_bars': 10, 'trail_atr': 2.0, 'min_hold_bars': 10}),
-    ]
-    for label, overrides in combo_variants:
-        params = {**BASELINE, **overrides}
-        r = run_backtest(data, params)
-        print_result(label, r, bs)
+    if table.empty:
+        print("  No variant finished")
+    else:
+        columns = ["variant", "sharpe", "d_sharpe", "d_return_pct", "d_total_trades",
+                   "d_win_rate", "d_max_drawdown", "d_profit_factor"]
+        with pd.option_context("display.width", 200, "display.max_columns", 20):
+            print(table[columns].round(3).to_string(index=False))
 
     print(f"\n{'='*110}")
     print("DONE — Compare Sharpe deltas to baseline. Positive = improvement.")
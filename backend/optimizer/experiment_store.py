@@ -0,0 +1,424 @@
+"""Columnar copy of the experiments table, for analysis at scale.
+
+The experiments table keeps parameters as JSON text, so any question like
+"Sharpe vs rsi_period x oversold" means pulling rows into Python and
+re-parsing every parameters blob. ExperimentStore keeps the same results
+as Parquet files partitioned by strategy/symbol/timeframe:
+
+    backend/experiment_store/
+        strategy=RSIMeanReversion/symbol=SPY/timeframe=1h/part-....parquet
+
+with each parameter flattened into its own typed column (p_<name>), so a
+slice of hundreds of thousands of experiments is a vectorized scan of the
+partitions and columns it needs. A parameter keeps the type of its first
+part file in the partition where later values fit it; where they don't
+(e.g. numbers, then strings), scans read that column as strings.
+
+Rows are appended as ExperimentTracker.save() runs (pass a store to the
+tracker — run_sweep / run_overnight / work_queue work --parquet) and are
+written every max_rows rows, on flush() and at exit. Each flush writes new
+part files (named per process, so several workers can append to the same
+partition); compact() merges them. export_from_db()
+builds a store from an existing research.db.
+
+The store is append-only: validation results written later by
+update_validation() stay in SQLite. The id column is the experiments row
+id only for rows from export_from_db(); rows appended by the tracker are
+written before SQLite assigns one (often in a batch), so their id is
+null — match them to the table by params_hash.
+
+Needs pyarrow (optional: pip install pyarrow). Without it the store
+prints a warning once and ignores writes.
+
+Usage:
+    python -m backend.optimizer.experiment_store export
+    python -m backend.optimizer.experiment_store surface RSIMeanReversion rsi_period oversold
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import numbers
+import os
+import sqlite3
+import time
+import weakref
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency
+    pa = None
+
+from backend.optimizer.experiment_tracker import DB_FILE
+
+STORE_DIR = "backend/experiment_store"
+
+PARTITIONS = ("strategy", "symbol", "timeframe")
+
+# Prefix of flattened parameter columns (keeps e.g. a "sharpe" param apart
+# from the sharpe metric)
+PARAM_PREFIX = "p_"
+
+# Stored columns besides the partitions and parameters (id is null for rows
+# appended by ExperimentTracker.save, see the module docstring)
+FIELDS = {
+    "id": "int64",
+    "experiment_id": "string",
+    "strategy_source": "string",
+    "return_pct": "float64",
+    "annualised_return": "float64",
+    "max_drawdown": "float64",
+    "total_trades": "int64",
+    "trades_per_year": "float64",
+    "win_rate": "float64",
+    "profit_factor": "float64",
+    "sharpe": "float64",
+    "score": "float64",
+    "validation_status": "string",
+    "params_hash": "string",
+    "created_at": "string",
+}
+
+# Parameters that only repeat the partition (or are internal)
+_SKIP_PARAMS = {"symbol"}
+
+
+def available():
+    """True if pyarrow is installed."""
+    return pa is not None
+
+
+def flatten_params(params):
+    """{p_<name>: value} with values reduced to bool, float or str."""
+    flat = {}
+    for name, value in (params or {}).items():
+        if name in _SKIP_PARAMS or name.startswith("_"):
+            continue
+        if value is None or isinstance(value, (bool, str)):
+            flat[PARAM_PREFIX + name] = value
+        elif isinstance(value, numbers.Real):
+            flat[PARAM_PREFIX + name] = float(value)
+        else:
+            flat[PARAM_PREFIX + name] = json.dumps(value, sort_keys=True)
+    return flat
+
+
+def _param_type(values, existing=None):
+    """Arrow type for one parameter column of a batch.
+
+    existing is the column's type in the partition's earlier part files;
+    it is kept whenever the batch's values fit it.
+    """
+    present = [v for v in values if v is not None]
+    if not present:
+        return existing or pa.null()
+    if all(isinstance(v, bool) for v in present):
+        typ = pa.bool_()
+    elif all(isinstance(v, float) for v in present):
+        typ = pa.float64()
+    else:
+        typ = pa.string()
+    return existing if existing in (typ, pa.string()) else typ
+
+
+def _to_table(rows, types=None):
+    """Arrow table for a list of flattened rows of one partition.
+
+    types: {column: arrow type} of the partition's existing part files
+    """
+    types = types or {}
+    arrays, names = [], []
+    for name in PARTITIONS:
+        arrays.append(pa.array([r[name] for r in rows], type=pa.string()))
+        names.append(name)
+    for name, typ in FIELDS.items():
+        arrays.append(pa.array([r.get(name) for r in rows], type=pa.type_for_alias(typ)))
+        names.append(name)
+    param_names = sorted({k for r in rows for k in r if k.startswith(PARAM_PREFIX)})
+    for name in param_names:
+        values = [r.get(name) for r in rows]
+        typ = _param_type(values, types.get(name))
+        if typ == pa.string():
+            values = [v if v is None or isinstance(v, str) else json.dumps(v) for v in values]
+        arrays.append(pa.array(values, type=typ))
+        names.append(name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _flush_at_exit(ref):
+    def _handler():
+        store = ref()
+        if store is not None:
+            try:
+                store.flush()
+            except Exception as e:
+                print(f"ExperimentStore: failed to flush {len(store)} rows at exit: {e}")
+    return _handler
+
+
+class ExperimentStore:
+    """Parquet experiments, partitioned by strategy/symbol/timeframe."""
+
+    _warned = False
+
+    def __init__(self, root=STORE_DIR, max_rows=5000):
+        """
+        Args:
+            root: directory of the partitioned dataset
+            max_rows: buffered rows that trigger a flush
+        """
+        self.root = root
+        self.max_rows = max_rows
+        self._pending = {}  # (strategy, symbol, timeframe) -> [row, ...]
+        self._count = 0
+        self._seq = 0
+        if not available() and not ExperimentStore._warned:
+            ExperimentStore._warned = True
+            print("ExperimentStore: pyarrow is not installed, Parquet rows are not written "
+                  "(pip install pyarrow)")
+        self._atexit = _flush_at_exit(weakref.ref(self))
+        atexit.register(self._atexit)
+
+    def __len__(self):
+        return self._count
+
+    # ------------------------------------------------------------------
+    # Write
+    # ------------------------------------------------------------------
+
+    def add(self, row):
+        """Buffer one experiment (a dict of experiments columns, parameters as a dict)."""
+        if not available():
+            return
+        flat = {k: row.get(k) for k in PARTITIONS}
+        for name, typ in FIELDS.items():
+            value = row.get(name)
+            if value is not None and typ != "string":
+                value = int(value) if typ == "int64" else float(value)
+            flat[name] = value
+        flat.update(flatten_params(row.get("parameters")))
+        key = tuple(str(flat[k]) for k in PARTITIONS)
+        self._pending.setdefault(key, []).append(flat)
+        self._count += 1
+        if self._count >= self.max_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered rows, one new part file per partition. Returns rows written."""
+        pending, self._pending, self._count = self._pending, {}, 0
+        written = 0
+        for key, rows in pending.items():
+            directory = self._partition_dir(*key)
+            os.makedirs(directory, exist_ok=True)
+            self._seq += 1
+            path = os.path.join(
+                directory, f"part-{time.time_ns()}-{os.getpid()}-{self._seq}.parquet")
+            # Write under a temporary name so readers never see half a file
+            pq.write_table(_to_table(rows, self._column_types(directory)), path + ".tmp")
+            os.replace(path + ".tmp", path)
+            written += len(rows)
+        return written
+
+    def compact(self, strategy=None, symbol=None, timeframe=None):
+        """Merge each matching partition's part files into one. Returns files merged."""
+        if not available():
+            return 0
+        merged = 0
+        by_dir = {}
+        for path in self._files(strategy, symbol, timeframe):
+            by_dir.setdefault(os.path.dirname(path), []).append(path)
+        for directory, paths in by_dir.items():
+            if len(paths) < 2:
+                continue
+            table = self._dataset(paths).to_table()
+            self._seq += 1
+            path = os.path.join(
+                directory, f"part-{time.time_ns()}-{os.getpid()}-{self._seq}.parquet")
+            pq.write_table(table, path + ".tmp")
+            os.replace(path + ".tmp", path)
+            for old in paths:
+                os.remove(old)
+            merged += len(paths)
+        return merged
+
+    # ------------------------------------------------------------------
+    # Read
+    # ------------------------------------------------------------------
+
+    def scan(self, strategy=None, symbol=None, timeframe=None, columns=None, where=None):
+        """Load matching experiments as a DataFrame.
+
+        Only the partitions named by strategy/symbol/timeframe (None = all)
+        and the requested columns are read.
+
+        Args:
+            columns: column names to return (default: all); parameter
+                columns are p_<name>, missing ones are skipped
+            where: pyarrow.dataset expression to filter rows with, e.g.
+                ds.field("total_trades") >= 30
+
+        Returns:
+            DataFrame (empty if nothing matches or pyarrow is missing)
+        """
+        if not available():
+            return pd.DataFrame()
+        files = self._files(strategy, symbol, timeframe)
+        if not files:
+            return pd.DataFrame()
+        dataset = self._dataset(files)
+        if columns is not None:
+            columns = [c for c in columns if c in dataset.schema.names]
+        return dataset.to_table(columns=columns, filter=where).to_pandas()
+
+    def surface(self, strategy, x, y, metric="sharpe", agg="mean", min_trades=0,
+                symbol=None, timeframe=None):
+        """Metric aggregated over a grid of two parameters (x rows, y columns).
+
+        e.g. surface("RSIMeanReversion", "rsi_period", "oversold") for mean
+        Sharpe by rsi_period x oversold across every symbol and timeframe.
+        """
+        px, py = PARAM_PREFIX + x, PARAM_PREFIX + y
+        where = ds.field("total_trades") >= min_trades if available() and min_trades else None
+        df = self.scan(strategy, symbol, timeframe, columns=[px, py, metric], where=where)
+        if df.empty or px not in df or py not in df:
+            return pd.DataFrame()
+        table = df.pivot_table(index=px, columns=py, values=metric, aggfunc=agg)
+        table.index.name, table.columns.name = x, y
+        return table
+
+    def _partition_dir(self, strategy, symbol, timeframe):
+        # Partition values are URI-encoded (symbols like BTC/USD)
+        return os.path.join(self.root, *(f"{name}={quote(str(value), safe='')}"
+                                         for name, value in zip(PARTITIONS,
+                                                                (strategy, symbol, timeframe))))
+
+    def _files(self, strategy=None, symbol=None, timeframe=None):
+        parts = [f"{name}={glob.escape(quote(str(value), safe=''))}" if value is not None
+                 else f"{name}=*"
+                 for name, value in zip(PARTITIONS, (strategy, symbol, timeframe))]
+        return sorted(glob.glob(os.path.join(glob.escape(self.root), *parts, "*.parquet")))
+
+    @staticmethod
+    def _column_types(directory):
+        """{column: arrow type} of the newest part file in a partition directory."""
+        # Part file names start with their write time
+        files = sorted(glob.glob(os.path.join(glob.escape(directory), "*.parquet")))
+        if not files:
+            return {}
+        return {field.name: field.type for field in pq.read_schema(files[-1])
+                if not pa.types.is_null(field.type)}
+
+    @staticmethod
+    def _dataset(files):
+        # Partitions hold different parameters: read them under one schema,
+        # with nulls where a file lacks a column. A column typed differently
+        # in different files (older stores, numbers then strings) is read as
+        # strings rather than failing the whole scan.
+        types = {}
+        for path in files:
+            for field in pq.read_schema(path):
+                seen = types.get(field.name)
+                if seen is None or pa.types.is_null(seen):
+                    types[field.name] = field.type
+                elif not pa.types.is_null(field.type) and field.type != seen:
+                    types[field.name] = pa.string()
+        return ds.dataset(files, schema=pa.schema(list(types.items())), format="parquet")
+
+    @staticmethod
+    def partition_values(path):
+        """{strategy, symbol, timeframe} of a part file path."""
+        values = {}
+        for segment in os.path.normpath(path).split(os.sep):
+            name, sep, value = segment.partition("=")
+            if sep and name in PARTITIONS:
+                values[name] = unquote(value)
+        return values
+
+
+def export_from_db(db_file=DB_FILE, store=None, chunk_rows=50000):
+    """Write every experiments row of db_file to a store. Returns rows exported.
+
+    Refuses to write into a store that already has files (rows would be
+    duplicated); export into a fresh directory instead.
+    """
+    if store is None:
+        store = ExperimentStore()
+    if not available():
+        return 0
+    if store._files():
+        print(f"ExperimentStore: {store.root} is not empty, not exporting")
+        return 0
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    columns = ", ".join(["id", "parameters", *PARTITIONS,
+                         *(name for name in FIELDS if name != "id")])
+    exported = 0
+    try:
+        cursor = conn.execute(f"SELECT {columns} FROM experiments ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            for r in rows:
+                row = dict(r)
+                try:
+                    row["parameters"] = json.loads(r["parameters"]) if r["parameters"] else {}
+                except (TypeError, ValueError):
+                    row["parameters"] = {}
+                store.add(row)
+            exported += len(rows)
+            store.flush()
+    finally:
+        conn.close()
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar (Parquet) experiment store")
+    parser.add_argument("--root", type=str, default=STORE_DIR, help="Store directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="Build the store from research.db")
+    export.add_argument("--db", type=str, default=DB_FILE, help="SQLite database")
+
+    compact = sub.add_parser("compact", help="Merge part files within each partition")
+    compact.add_argument("--strategy", type=str)
+
+    surface = sub.add_parser("surface", help="Metric over a grid of two parameters")
+    surface.add_argument("strategy")
+    surface.add_argument("x", help="Parameter for the rows")
+    surface.add_argument("y", help="Parameter for the columns")
+    surface.add_argument("--metric", type=str, default="sharpe")
+    surface.add_argument("--agg", type=str, default="mean")
+    surface.add_argument("--min-trades", type=int, default=30)
+    surface.add_argument("--symbol", type=str)
+    surface.add_argument("--timeframe", type=str)
+
+    args = parser.parse_args()
+    store = ExperimentStore(args.root)
+
+    if args.command == "export":
+        t0 = time.time()
+        n = export_from_db(args.db, store)
+        print(f"Exported {n} experiments to {args.root} in {time.time() - t0:.1f}s")
+    elif args.command == "compact":
+        print(f"Merged {store.compact(strategy=args.strategy)} part files")
+    else:
+        table = store.surface(args.strategy, args.x, args.y, metric=args.metric,
+                              agg=args.agg, min_trades=args.min_trades,
+                              symbol=args.symbol, timeframe=args.timeframe)
+        if table.empty:
+            print("No matching experiments")
+        else:
+            with pd.option_context("display.width", 200, "display.max_columns", 50):
+                print(table.round(3))
+
+
+if __name__ == "__main__":
+    main()
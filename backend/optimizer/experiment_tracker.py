@@ -1,8 +1,11 @@
 import sqlite3
 import json
 import hashlib
+from contextlib import contextmanager
 from datetime import datetime
 
+from backend.database import WriteBatcher
+
 DB_FILE = "backend/research.db"
 
 
@@ -13,15 +16,54 @@ class ExperimentTracker:
     All experiment data uses spread=0.0003, delay=0 (validated against live).
     """
 
-    def __init__(self, db_file=DB_FILE):
+    def __init__(self, db_file=DB_FILE, store=None):
+        """
+        Args:
+            store: ExperimentStore that also gets every saved row (Parquet)
+        """
         self.db_file = db_file
+        self.store = store
+        self._batcher = None
         self._ensure_table()
 
     def _get_conn(self):
+        # Queries must see rows still queued in an active batch
+        if self._batcher is not None:
+            self._batcher.flush()
         conn = sqlite3.connect(self.db_file)
         conn.row_factory = sqlite3.Row
         return conn
 
+    @contextmanager
+    def batch(self, max_rows=200, max_seconds=5.0, atomic=False):
+        """Group save()/update_validation() writes into transactions.
+
+        Rows are flushed every max_rows / max_seconds, before any query on
+        this tracker, and when the block exits (including on error). With
+        atomic=True a failing flush writes none of its rows and raises
+        (see WriteBatcher).
+        """
+        if self._batcher is not None:  # nested: reuse the outer batch
+            yield self._batcher
+            return
+        self._batcher = WriteBatcher(self.db_file, max_rows, max_seconds, atomic=atomic)
+        try:
+            yield self._batcher
+        finally:
+            batcher, self._batcher = self._batcher, None
+            batcher.close()
+
+    def _write(self, sql, params):
+        if self._batcher is not None:
+            self._batcher.add(sql, params)
+            return
+        conn = self._get_conn()
+        try:
+            with conn:
+                conn.execute(sql, params)
+        finally:
+            conn.close()
+
     def _ensure_table(self):
         conn = self._get_conn()
         conn.execute('''
@@ -50,24 +92,51 @@ class ExperimentTracker:
                 parent_experiment_id TEXT,
                 created_at TEXT,
                 spread REAL DEFAULT 0.0003,
-                execution_delay INTEGER DEFAULT 0
+                execution_delay INTEGER DEFAULT 0,
+                params_hash TEXT
             )
         ''')
+        self._migrate_params_hash(conn)
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_experiments_params_hash
+            ON experiments(strategy, symbol, timeframe, params_hash)
+        ''')
         conn.commit()
         conn.close()
 
+    def _migrate_params_hash(self, conn):
+        """Add params_hash to older tables and backfill rows that lack it."""
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(experiments)")}
+        if "params_hash" not in columns:
+            conn.execute("ALTER TABLE experiments ADD COLUMN params_hash TEXT")
+
+        rows = conn.execute(
+            "SELECT id, parameters FROM experiments WHERE params_hash IS NULL"
+        ).fetchall()
+        if not rows:
+            return
+        updates = []
+        for r in rows:
+            try:
+                params = json.loads(r["parameters"]) if r["parameters"] else {}
+            except (TypeError, ValueError):
+                params = {}
+            updates.append((self.params_hash(params), r["id"]))
+        conn.executemany("UPDATE experiments SET params_hash = ? WHERE id = ?", updates)
+        print(f"ExperimentTracker: backfilled params_hash for {len(updates)} experiments")
+
     # ------------------------------------------------------------------
     # Write
     # ------------------------------------------------------------------
 
     def save(self, experiment_id, strategy, symbol, timeframe, params,
              results, strategy_source="existing", score=None,
-             parent_experiment_id=None, train_period=None, test_period=None):
+             parent_experiment_id=None, train_period=None, test_period=None,
+             validation_status="pending", validation_details=None):
         """Save a single backtest result to the experiments table."""
-        conn = self._get_conn()
-
         total_trades = results.get("total_trades", 0)
         return_pct = results.get("return_pct", 0.0)
+        params_json = json.dumps(params)
 
         # Estimate annualised return and trades/year from equity curve
         equity_curve = results.get("equity_curve", [])
@@ -79,32 +148,50 @@ class ExperimentTracker:
             annualised = return_pct
             trades_per_year = total_trades
 
-        conn.execute('''
+        created_at = datetime.now().isoformat()
+        params_hash = self.params_hash(json.loads(params_json))
+        self._write('''
             INSERT INTO experiments (
                 experiment_id, strategy, strategy_source, symbol, timeframe,
                 parameters, return_pct, annualised_return, max_drawdown,
                 total_trades, trades_per_year, win_rate, profit_factor,
                 sharpe, score, train_period, test_period,
-                parent_experiment_id, created_at, spread, execution_delay
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                parent_experiment_id, created_at, spread, execution_delay,
+                params_hash, validation_status, validation_details
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             experiment_id, strategy, strategy_source, symbol, timeframe,
-            json.dumps(params), return_pct, annualised,
+            params_json, return_pct, annualised,
             results.get("max_drawdown", 0.0), total_trades, trades_per_year,
             results.get("win_rate", 0.0), results.get("profit_factor", 0.0),
             results.get("sharpe", 0.0), score,
             train_period, test_period,
-            parent_experiment_id, datetime.now().isoformat(),
-            0.0003, 0
+            parent_experiment_id, created_at,
+            0.0003, 0,
+            # Hash what will be read back, so has_been_tested matches exactly
+            params_hash,
+            validation_status,
+            json.dumps(validation_details) if validation_details else None,
         ))
-        conn.commit()
-        conn.close()
+        if self.store is not None:
+            self.store.add({
+                "experiment_id": experiment_id, "strategy": strategy,
+                "strategy_source": strategy_source, "symbol": symbol,
+                "timeframe": timeframe, "parameters": params,
+                "return_pct": return_pct, "annualised_return": annualised,
+                "max_drawdown": results.get("max_drawdown", 0.0),
+                "total_trades": total_trades, "trades_per_year": trades_per_year,
+                "win_rate": results.get("win_rate", 0.0),
+                "profit_factor": results.get("profit_factor", 0.0),
+                "sharpe": results.get("sharpe", 0.0), "score": score,
+                "validation_status": validation_status,
+                "params_hash": params_hash, "created_at": created_at,
+            })
 
     def update_validation(self, row_id, validation_status, test_return_pct=None,
                           validation_details=None):
         """Update validation results for an existing experiment row."""
-        conn = self._get_conn()
-        conn.execute('''
+        self._write('''
             UPDATE experiments
             SET validation_status = ?,
                 test_return_pct = ?,
@@ -116,8 +203,6 @@ class ExperimentTracker:
             json.dumps(validation_details) if validation_details else None,
             row_id
         ))
-        conn.commit()
-        conn.close()
 
     # ------------------------------------------------------------------
     # Read / Query
@@ -176,6 +261,17 @@ class ExperimentTracker:
         conn.close()
         return [self._row_to_dict(r) for r in rows]
 
+    def get_experiments_for(self, strategy, symbol, timeframe):
+        """Params and score of everything tried for a strategy/symbol/timeframe."""
+        conn = self._get_conn()
+        rows = conn.execute('''
+            SELECT parameters, score FROM experiments
+            WHERE strategy = ? AND symbol = ? AND timeframe = ?
+            ORDER BY id
+        ''', (strategy, symbol, timeframe)).fetchall()
+        conn.close()
+        return [self._row_to_dict(r) for r in rows]
+
     def get_untested_combinations(self, strategies, symbols, timeframes):
         """Identify strategy/symbol/timeframe combos not yet tested."""
         conn = self._get_conn()
@@ -197,29 +293,46 @@ class ExperimentTracker:
 
     def has_been_tested(self, strategy, symbol, timeframe, params):
         """Check if an exact strategy/symbol/timeframe/params combo exists."""
-        params_hash = self._params_hash(params)
         conn = self._get_conn()
         row = conn.execute('''
-            SELECT COUNT(*) as cnt FROM experiments
-            WHERE strategy = ? AND symbol = ? AND timeframe = ?
-        ''', (strategy, symbol, timeframe)).fetchone()
+            SELECT 1 FROM experiments
+            WHERE strategy = ? AND symbol = ? AND timeframe = ? AND params_hash = ?
+            LIMIT 1
+        ''', (strategy, symbol, timeframe, self.params_hash(params))).fetchone()
         conn.close()
+        return row is not None
 
-        if row["cnt"] == 0:
-            return False
+    def tested_hashes(self, strategy, symbol, timeframe):
+        """Set of params hashes already tested for a strategy/symbol/timeframe.
 
-        # Check param-level match
+        Load once per sweep, then check combos with
+        `ExperimentTracker.params_hash(params) in hashes`.
+        """
         conn = self._get_conn()
         rows = conn.execute('''
-            SELECT parameters FROM experiments
+            SELECT DISTINCT params_hash FROM experiments
             WHERE strategy = ? AND symbol = ? AND timeframe = ?
         ''', (strategy, symbol, timeframe)).fetchall()
         conn.close()
+        return {r["params_hash"] for r in rows}
 
-        for r in rows:
-            if self._params_hash(json.loads(r["parameters"])) == params_hash:
-                return True
-        return False
+    def get_experiment(self, row_id):
+        """One experiments row by id (None if missing)."""
+        conn = self._get_conn()
+        row = conn.execute('SELECT * FROM experiments WHERE id = ?', (row_id,)).fetchone()
+        conn.close()
+        return self._row_to_dict(row) if row else None
+
+    def results_by_hash(self, strategy, symbol, timeframe):
+        """params_hash -> latest experiments row for a strategy/symbol/timeframe."""
+        conn = self._get_conn()
+        rows = conn.execute('''
+            SELECT * FROM experiments
+            WHERE strategy = ? AND symbol = ? AND timeframe = ?
+            ORDER BY id
+        ''', (strategy, symbol, timeframe)).fetchall()
+        conn.close()
+        return {r["params_hash"]: self._row_to_dict(r) for r in rows}
 
     def count(self):
         """Total number of experiments."""
@@ -339,7 +452,7 @@ class ExperimentTracker:
         return d
 
     @staticmethod
-    def _params_hash(params):
+    def params_hash(params):
         """Deterministic hash of a params dict for dedup."""
         return hashlib.md5(
             json.dumps(params, sort_keys=True).encode()
@@ -0,0 +1,264 @@
+"""Successive-halving / Hyperband search — multi-fidelity parameter sweeps.
+
+A grid sweep backtests every combo over the full 2020-2025 period, so most
+of the overnight budget goes to regions that are obviously bad after a few
+months of data. Successive halving instead:
+
+    rung 0: every combo on the most recent 1/eta^k of the bars
+    rung 1: the best 1/eta of those on the most recent 1/eta^(k-1)
+    ...
+    final:  the survivors on the full period
+
+Only final-rung results are saved to the experiments table, so everything
+there is still a full-period backtest comparable with grid sweeps. Combos
+already tested are skipped up front, exactly as in SweepEngine.run_sweep.
+
+Hyperband runs several halving brackets over disjoint slices of the grid,
+from aggressive (starts at the smallest slice) to none at all (straight to
+the full period), which hedges against strategies that need long history
+before they trade.
+
+Partial rungs are ranked by Sharpe with the 10-trade minimum scaled to the
+slice length; the abort rules are only applied on the full period since
+their trade minimums assume it.
+"""
+
+import math
+import random
+import time
+
+from backend.engine.data_utils import load_backtest_data
+
+
+# Fraction of bars evaluated at each step up in fidelity
+DEFAULT_ETA = 3
+
+# Smallest slice of the data used in the first rung
+DEFAULT_MIN_FRACTION = 1 / 9
+
+# Slices never go below this many bars (indicators need warmup)
+MIN_RUNG_BARS = 500
+
+# Minimum trades on the full period (mirrors scoring.score_result)
+MIN_TRADES = 10
+
+
+# ---------------------------------------------------------------------------
+# Fidelity schedule
+# ---------------------------------------------------------------------------
+
+def fidelity_schedule(eta=DEFAULT_ETA, min_fraction=DEFAULT_MIN_FRACTION):
+    """Data fractions per rung, smallest first, e.g. [1/9, 1/3, 1.0]."""
+    rungs = [1.0]
+    while rungs[0] / eta >= min_fraction * (1 - 1e-9):
+        rungs.insert(0, rungs[0] / eta)
+    return rungs
+
+
+def recent_slice(data, fraction, min_bars=MIN_RUNG_BARS):
+    """The most recent `fraction` of the bars (at least min_bars)."""
+    n = max(min_bars, int(round(len(data) * fraction)))
+    return data if n >= len(data) else data.iloc[-n:]
+
+
+def rung_score(result, fraction):
+    """Rank key on a partial slice: Sharpe, with the trade minimum scaled down."""
+    if result.get("total_trades", 0) < max(1, math.ceil(MIN_TRADES * fraction)):
+        return -999.0
+    return result["sharpe"]
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+def successive_halving(engine, strategy_class, data, todo, timeframe,
+                       schedule, eta=DEFAULT_ETA, abort_rules=None,
+                       should_stop=None, verbose=True):
+    """Run one halving bracket over (index, params) pairs.
+
+    Args:
+        engine: SweepEngine (runs the combos, honours engine.workers)
+        strategy_class: Strategy class reference
+        data: full-period bars
+        todo: list of (index, params) to search
+        timeframe: e.g. "15m"
+        schedule: data fractions per rung, ending with 1.0
+        eta: keep the best 1/eta of each rung
+        abort_rules: disqualification rules, applied on the final rung only
+        should_stop: callable checked before every rung after the first
+            (rung 0, the cheapest, always runs so there is a ranking);
+            when it returns True the remaining partial rungs are skipped
+            and the leaders so far go straight to the final rung (cut to
+            the size they would have reached)
+        verbose: print progress
+
+    Returns:
+        list of (index, params, result, error) from the final rung
+    """
+    survivors = list(todo)
+    for rung, fraction in enumerate(schedule[:-1]):
+        if not survivors:
+            return []
+        remaining = len(schedule) - 1 - rung
+        if rung > 0 and should_stop is not None and should_stop():
+            keep = max(1, len(survivors) // eta ** remaining)
+            if verbose:
+                print(f"  Out of time: sending the top {keep} straight to the full period")
+            survivors = survivors[:keep]
+            break
+
+        sliced = recent_slice(data, fraction)
+        t0 = time.time()
+        scored = []
+        for i, params, result, error in engine.evaluate(sliced, strategy_class, timeframe,
+                                                        survivors):
+            scored.append((rung_score(result, fraction) if error is None else -999.0,
+                           i, params))
+
+        # Ties go to earlier combos, like a grid sweep
+        scored.sort(key=lambda s: (-s[0], s[1]))
+        keep = max(1, math.ceil(len(scored) / eta))
+        survivors = [(i, params) for _, i, params in scored[:keep]]
+        if verbose:
+            print(f"  Rung {rung}: {len(scored)} combos on {len(sliced)} bars "
+                  f"({fraction:.0%}) in {time.time() - t0:.1f}s -> keep {keep}, "
+                  f"best {scored[0][0]:.4f}")
+
+    if verbose:
+        print(f"  Final rung: {len(survivors)} combos on {len(data)} bars")
+    return list(engine.evaluate(data, strategy_class, timeframe, survivors, abort_rules))
+
+
+def hyperband_brackets(todo, n_brackets, eta=DEFAULT_ETA, seed=0):
+    """Split (index, params) pairs across brackets, most aggressive first.
+
+    Bracket s (s = n_brackets-1 .. 0) gets a share proportional to
+    eta^s / (s+1) (Hyperband's n_i), so aggressive brackets see most of
+    the grid. Combos are shuffled with a fixed seed so each bracket is a
+    spread-out sample rather than one corner of the grid.
+    """
+    shuffled = list(todo)
+    random.Random(seed).shuffle(shuffled)
+
+    weights = [eta ** s / (s + 1) for s in range(n_brackets - 1, -1, -1)]
+    total = sum(weights)
+    brackets, start = [], 0
+    for k, w in enumerate(weights):
+        end = len(shuffled) if k == n_brackets - 1 else start + round(len(shuffled) * w / total)
+        brackets.append(sorted(shuffled[start:end], key=lambda t: t[0]))
+        start = end
+    return brackets
+
+
+def predicted_backtests(n_combos, mode="halving", eta=DEFAULT_ETA,
+                        min_fraction=DEFAULT_MIN_FRACTION):
+    """Full-period-equivalent backtests a search of n_combos will run.
+
+    mode is "grid", "halving" or "hyperband"; used for runtime planning
+    (slices are costed by their fraction of the bars).
+    """
+    if mode == "grid" or n_combos == 0:
+        return float(n_combos)
+    schedule = fidelity_schedule(eta, min_fraction)
+
+    def bracket_cost(n, rungs):
+        cost = 0.0
+        for fraction in rungs:
+            cost += n * fraction
+            n = max(1, math.ceil(n / eta))
+        return cost
+
+    if mode != "hyperband":
+        return bracket_cost(n_combos, schedule)
+    brackets = hyperband_brackets([(i, None) for i in range(n_combos)], len(schedule), eta)
+    return sum(bracket_cost(len(b), schedule[s:]) for s, b in enumerate(brackets) if b)
+
+
+def run_halving_sweep(engine, strategy_class, param_grid, symbol, timeframe,
+                      start, end, experiment_id=None, strategy_source="existing",
+                      skip_tested=True, verbose=True, data=None, abort_rules=None,
+                      eta=DEFAULT_ETA, min_fraction=DEFAULT_MIN_FRACTION,
+                      hyperband=False, should_stop=None):
+    """Multi-fidelity counterpart of SweepEngine.run_sweep.
+
+    Args are those of run_sweep, plus:
+        eta: keep the best 1/eta per rung (and grow the slice eta-fold)
+        min_fraction: data fraction of the first rung
+        hyperband: split the grid across halving brackets of decreasing
+            aggressiveness instead of one bracket
+        should_stop: callable checked between rungs (e.g. budget.is_expired);
+            every bracket still runs its first rung
+
+    Returns:
+        list of full-period result dicts (the final rung), sorted by score
+    """
+    strategy_name = strategy_class.__name__
+    mode = "hyperband" if hyperband else "halving"
+    if experiment_id is None:
+        experiment_id = f"{mode}_{strategy_name}_{symbol}_{timeframe}"
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"Sweep ({mode}, eta={eta}): {strategy_name} on {symbol} {timeframe}")
+        print(f"Period: {start} to {end}")
+        print(f"{'='*60}")
+        print("Loading data...")
+
+    if data is None:
+        data = load_backtest_data(symbol, timeframe, start, end)
+    if data.empty:
+        print(f"ERROR: No data for {symbol} {timeframe}")
+        return []
+
+    combos = engine._expand_grid(param_grid)
+    # Inert-param duplicates are dropped: only survivors are reported anyway
+    todo, skipped, duplicates = engine.pending_combos(combos, strategy_class, symbol,
+                                                      timeframe, skip_tested)
+    schedule = fidelity_schedule(eta, min_fraction)
+    if verbose:
+        print(f"Data loaded: {len(data)} bars")
+        print(f"Parameter combinations: {len(combos)} ({skipped} already tested, "
+              f"{len(duplicates)} inert-param duplicates)")
+        print(f"Rungs: {', '.join(f'{f:.0%}' for f in schedule)}")
+
+    if hyperband:
+        brackets = [(bracket, schedule[s:]) for s, bracket in
+                    enumerate(hyperband_brackets(todo, len(schedule), eta))]
+    else:
+        brackets = [(todo, schedule)]
+
+    sweep_results = []
+    errors = 0
+    t0 = time.time()
+    with engine.tracker.batch():
+        for n, (bracket, rungs) in enumerate(brackets):
+            if verbose and hyperband:
+                print(f"\n  Bracket {n}: {len(bracket)} combos, {len(rungs)} rungs")
+            final = successive_halving(engine, strategy_class, data, bracket, timeframe,
+                                       rungs, eta, abort_rules, should_stop, verbose)
+            for i, params, result, error in final:
+                if error is not None:
+                    errors += 1
+                    if verbose:
+                        print(f"  ERROR combo {i+1}: {error}")
+                    continue
+                engine.save_result(result, params, strategy_name, symbol, timeframe,
+                                   experiment_id, strategy_source)
+                sweep_results.append(result)
+
+    sweep_results.sort(key=lambda r: r["score"], reverse=True)
+    engine.results.extend(sweep_results)
+
+    if verbose:
+        print(f"\nComplete: {len(sweep_results)} full-period results from "
+              f"{len(todo)} combos ({skipped} skipped, {errors} errors) "
+              f"in {time.time() - t0:.1f}s")
+        if sweep_results:
+            best = sweep_results[0]
+            print(f"Best: score={best['score']:.4f}, "
+                  f"return={best['return_pct']:.2f}%, "
+                  f"sharpe={best['sharpe']:.4f}, "
+                  f"trades={best['total_trades']}")
+
+    return sweep_results
@@ -1,12 +1,13 @@
 """Full validation pipeline.
 
-Chains: disqualification → holdout → walk-forward → multi-asset.
+Chains: disqualification → Monte Carlo → holdout → walk-forward → multi-asset.
 Updates the experiments table with validation results.
 """
 
 import json
 
 from backend.optimizer.disqualify import passes_disqualification
+from backend.optimizer.monte_carlo import robustness
 from backend.optimizer.validation import validate_holdout, walk_forward, multi_asset_check
 from backend.optimizer.experiment_tracker import ExperimentTracker
 
@@ -25,15 +26,31 @@ STRATEGY_CLASS_MAP = {
     "SwingBreakoutStrategy": SwingBreakoutStrategy,
 }
 
+# Full validation period (disqualification and multi-asset checks)
+FULL_START = "2020-01-01"
+FULL_END = "2025-12-31"
 
-def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
+
+def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True, workers=1,
+                       bars=None, indicator_cache=None):
     """Full validation pipeline for a single candidate.
 
     Steps:
         1. Disqualification (hard filters)
-        2. Train/test holdout (2020-2023 train, 2024-2025 test)
-        3. Walk-forward (rolling 2-year train, 1-year test)
-        4. Multi-asset consistency (related assets)
+        2. Monte Carlo (resampled trade order: drawdown and ruin risk)
+        3. Train/test holdout (2020-2023 train, 2024-2025 test)
+        4. Walk-forward (rolling 2-year train, 1-year test)
+        5. Multi-asset consistency (related assets)
+
+    The 2020-2025 bars are loaded once; holdout and walk-forward periods
+    are sliced from them. workers > 1 runs walk-forward windows in parallel.
+    Each step returns as soon as the candidate is rejected.
+
+    Args:
+        bars: callable symbol -> 2020-2025 bars on this timeframe, for the
+            candidate and its related assets (default: load them)
+        indicator_cache: run_combo cache shared by candidates of the same
+            strategy on the same bars (reuses full-period indicators)
 
     Returns:
         dict with status, details, and all sub-results
@@ -51,6 +68,7 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
     from backend.engine.data_utils import load_backtest_data
     from backend.engine.backtester import Backtester
     from backend.optimizer.scoring import calc_sharpe
+    from backend.optimizer.sweep import indicator_key, run_combo
     import sys, os
     from contextlib import contextmanager
 
@@ -65,14 +83,22 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
             sys.stdout = old
 
     full_params = {**params, "symbol": symbol}
-    full_data = load_backtest_data(symbol, timeframe, "2020-01-01", "2025-12-31")
+    if bars is not None:
+        full_data = bars(symbol)
+    else:
+        full_data = load_backtest_data(symbol, timeframe, FULL_START, FULL_END)
     if full_data.empty:
         return {"status": "REJECTED", "reason": "no_data"}
 
     with _suppress():
-        bt = Backtester(full_data, strategy_class, full_params,
-                        10000.0, 0.0003, execution_delay=0, interval=timeframe)
-        full_result = bt.run()
+        if indicator_cache is not None and indicator_key(strategy_class, full_params) is not None:
+            # Runs on a cached enriched copy (same costs as below)
+            full_result = run_combo(full_data, strategy_class, full_params, timeframe,
+                                    indicator_cache=indicator_cache)
+        else:
+            bt = Backtester(full_data.copy(), strategy_class, full_params,
+                            10000.0, 0.0003, execution_delay=0, interval=timeframe)
+            full_result = bt.run()
 
     passes, reason = passes_disqualification(full_result, years=5)
     if not passes:
@@ -85,11 +111,28 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
               f"{full_result['return_pct']:.2f}% return, "
               f"{full_result['max_drawdown']:.1f}% dd")
 
-    # Step 2: Train/test holdout
+    # Step 2: Monte Carlo on the full-period trades (no extra backtests)
+    if verbose:
+        print("  Step 2: Monte Carlo resampling...")
+
+    mc = robustness(full_result, years=5)
+
+    if verbose and "drawdown_p95" in mc:
+        for method in ("bootstrap", "block", "shuffle"):
+            print(f"    {method}: dd p95 {mc[method]['max_drawdown']['p95']:.1f}%, "
+                  f"Sharpe p5 {mc[method]['sharpe']['p5']:.3f}, "
+                  f"ruin {mc[method]['ruin_probability']:.1%}")
+
+    if not mc["passes"]:
+        if verbose:
+            print(f"  REJECTED: {mc['reason']}")
+        return {"status": "REJECTED", "reason": mc["reason"], "monte_carlo": mc}
+
+    # Step 3: Train/test holdout
     if verbose:
-        print("  Step 2: Holdout test (train 2020-2023, test 2024-2025)...")
+        print("  Step 3: Holdout test (train 2020-2023, test 2024-2025)...")
 
-    holdout = validate_holdout(strategy_class, params, symbol, timeframe)
+    holdout = validate_holdout(strategy_class, params, symbol, timeframe, data=full_data)
     if "error" in holdout:
         return {"status": "REJECTED", "reason": f"holdout_error: {holdout['error']}"}
 
@@ -104,14 +147,16 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
         return {
             "status": "REJECTED",
             "reason": "negative_out_of_sample",
+            "monte_carlo": mc,
             "holdout": holdout,
         }
 
-    # Step 3: Walk-forward
+    # Step 4: Walk-forward
     if verbose:
-        print("  Step 3: Walk-forward validation...")
+        print("  Step 4: Walk-forward validation...")
 
-    wf = walk_forward(strategy_class, params, symbol, timeframe)
+    wf = walk_forward(strategy_class, params, symbol, timeframe,
+                      data=full_data, workers=workers)
 
     if verbose:
         for w in wf["windows"]:
@@ -127,15 +172,18 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
         return {
             "status": "REJECTED",
             "reason": "walk_forward_failure",
+            "monte_carlo": mc,
             "holdout": holdout,
             "walk_forward": wf,
         }
 
-    # Step 4: Multi-asset consistency
+    # Step 5: Multi-asset consistency
     if verbose:
-        print("  Step 4: Multi-asset consistency...")
+        print("  Step 5: Multi-asset consistency...")
 
-    ma = multi_asset_check(strategy_class, params, symbol, timeframe)
+    # The candidate's own asset is the full-period run from step 1
+    ma = multi_asset_check(strategy_class, params, symbol, timeframe, FULL_START, FULL_END,
+                           bars=bars, known={symbol: full_result})
 
     if verbose:
         for sym, res in ma["results"].items():
@@ -167,26 +215,84 @@ def validate_candidate(strategy_class, params, symbol, timeframe, verbose=True):
             "total_trades": full_result["total_trades"],
             "max_drawdown": full_result["max_drawdown"],
         },
+        "monte_carlo": mc,
         "holdout": holdout,
         "walk_forward": wf,
         "multi_asset": ma,
     }
 
 
-def validate_top_candidates(tracker=None, n=20, verbose=True):
+def save_validation(tracker, row_id, validation):
+    """Write a validate_candidate result to the experiment's row."""
+    test_return = None
+    if "holdout" in validation and "test_return" in validation["holdout"]:
+        test_return = validation["holdout"]["test_return"]
+
+    details = {}
+    if "drawdown_p95" in validation.get("monte_carlo", {}):
+        details["mc_drawdown_p95"] = validation["monte_carlo"]["drawdown_p95"]
+        details["mc_ruin_probability"] = validation["monte_carlo"]["ruin_probability"]
+    if "holdout" in validation:
+        details["holdout_degradation"] = validation["holdout"].get("degradation")
+    if "walk_forward" in validation:
+        details["walk_forward_pass_rate"] = validation["walk_forward"].get("pass_rate")
+        details["avg_test_return"] = validation["walk_forward"].get("avg_test_return")
+    if "multi_asset" in validation:
+        details["multi_asset_positive_rate"] = validation["multi_asset"].get("positive_rate")
+    if "reason" in validation:
+        details["rejection_reason"] = validation["reason"]
+
+    tracker.update_validation(
+        row_id=row_id,
+        validation_status=validation["status"].lower(),
+        test_return_pct=test_return,
+        validation_details=details,
+    )
+
+
+def _passes_sensitivity(experiment, tracker, workers, verbose):
+    """Run the neighbourhood check on a candidate; reject it if it's a spike."""
+    from backend.optimizer.sensitivity import analyze, passes_sensitivity
+
+    result = analyze(experiment, tracker=tracker, workers=workers)
+    passes, reason = passes_sensitivity(result)
+    if verbose:
+        stability = f"{result['stability']:.2f}" if result else "n/a"
+        print(f"\nSensitivity {experiment['strategy']} on {experiment['symbol']}: "
+              f"stability {stability}{'' if passes else ' — ' + reason}")
+    if not passes:
+        tracker.update_validation(
+            row_id=experiment["id"],
+            validation_status="rejected",
+            validation_details={
+                "rejection_reason": reason,
+                "sensitivity_stability": result["stability"] if result else None,
+            },
+        )
+    return passes
+
+
+def validate_top_candidates(tracker=None, n=20, verbose=True, workers=1, sensitivity=False):
     """Pull top N experiments and run full validation on each.
 
-    Updates the experiments table with validation results.
+    Updates the experiments table with validation results. With
+    workers > 1 candidates are validated in parallel processes (see
+    validation_pool); per-candidate step output is only printed when
+    running sequentially. With sensitivity, candidates whose ±1-step
+    parameter neighbourhood collapses (see sensitivity.analyze) are
+    rejected as parameter spikes before the slower validation steps.
 
     Returns:
         list of (experiment_row, validation_result) tuples
     """
+    from backend.optimizer.validation_pool import validate_candidates
+
     tracker = tracker or ExperimentTracker()
 
     # Get top candidates that haven't been validated yet
     top = tracker.get_top_candidates(n=n, min_trades=30)
 
-    results = []
+    todo = []
 
     for experiment in top:
         # Skip already validated
@@ -197,45 +303,32 @@ def validate_top_candidates(tracker=None, n=20, verbose=True):
             continue
 
         strategy_name = experiment["strategy"]
-        strategy_class = STRATEGY_CLASS_MAP.get(strategy_name)
-        if not strategy_class:
+        if strategy_name not in STRATEGY_CLASS_MAP:
             if verbose:
                 print(f"\nSkipping (unknown strategy class): {strategy_name}")
             continue
 
-        params = experiment["parameters"]
-        symbol = experiment["symbol"]
-        timeframe = experiment["timeframe"]
-
-        validation = validate_candidate(
-            strategy_class, params, symbol, timeframe, verbose=verbose
-        )
-
-        # Update experiments table
-        test_return = None
-        if "holdout" in validation and "test_return" in validation["holdout"]:
-            test_return = validation["holdout"]["test_return"]
-
-        details = {}
-        if "holdout" in validation:
-            details["holdout_degradation"] = validation["holdout"].get("degradation")
-        if "walk_forward" in validation:
-            details["walk_forward_pass_rate"] = validation["walk_forward"].get("pass_rate")
-            details["avg_test_return"] = validation["walk_forward"].get("avg_test_return")
-        if "multi_asset" in validation:
-            details["multi_asset_positive_rate"] = validation["multi_asset"].get("positive_rate")
-        if "reason" in validation:
-            details["rejection_reason"] = validation["reason"]
+        if sensitivity and not _passes_sensitivity(experiment, tracker, workers, verbose):
+            continue
 
-        tracker.update_validation(
-            row_id=experiment["id"],
-            validation_status=validation["status"].lower(),
-            test_return_pct=test_return,
-            validation_details=details,
-        )
+        todo.append(experiment)
 
-        results.append((experiment, validation))
+    # Statuses are written back by validate_candidates, in batches
+    done = {}
+    for k, validation, error, _ in validate_candidates(todo, workers=workers, tracker=tracker,
+                                                      verbose=verbose and workers <= 1):
+        experiment = todo[k]
+        if error is not None:
+            if verbose:
+                print(f"\nERROR validating {experiment['strategy']} on "
+                      f"{experiment['symbol']}: {error}")
+            continue
+        if verbose and workers > 1:
+            print(f"  {experiment['strategy']} {experiment['symbol']} "
+                  f"{experiment['timeframe']}: {validation['status']}")
+        done[k] = (experiment, validation)
 
+    results = [done[k] for k in sorted(done)]
     # Summary
     if verbose:
         print(f"\n{'='*60}")
@@ -4,6 +4,7 @@ Usage:
     python -m backend.optimizer.run_composable --symbol GLD --timeframe 1h
     python -m backend.optimizer.run_composable --symbol GLD --timeframe 1h --quick
     python -m backend.optimizer.run_composable --describe
+    python -m backend.optimizer.run_composable --symbol GLD --timeframe 1h --shard 0/4
 """
 
 import argparse
@@ -14,7 +15,7 @@ import uuid
 from contextlib import contextmanager
 
 from backend.optimizer.combination_generator import (
-    generate_combinations,
+    CombinationSpace,
     describe,
 )
 from backend.optimizer.composable_strategy import ComposableStrategy
@@ -46,8 +47,14 @@ def run_composable_sweep(
     start="2020-01-01",
     end="2025-12-31",
     quick=False,
+    shard=0,
+    n_shards=1,
 ):
-    """Run all composable combinations on a single symbol/timeframe."""
+    """Run all composable combinations on a single symbol/timeframe.
+
+    With n_shards > 1 only shard `shard` of the combinations is run, so
+    n processes (or machines) given shards 0..n-1 cover the space once.
+    """
     tracker = ExperimentTracker()
 
     print(f"Loading data: {symbol} {timeframe} ({start} to {end})...")
@@ -58,14 +65,16 @@ def run_composable_sweep(
 
     print(f"Loaded {len(data)} bars")
 
-    # Generate combinations
-    combos = generate_combinations(symbol=symbol, timeframe=timeframe)
-    total = len(combos)
-    print(f"Generated {total} compatible combinations")
+    # Combinations are built one at a time from their index
+    space = CombinationSpace(symbol=symbol, timeframe=timeframe)
+    indices = space.indices(shard, n_shards, limit=10 if quick else None)
+    total = len(indices)
+    if n_shards > 1:
+        print(f"{len(space)} compatible combinations, shard {shard}/{n_shards}: {total}")
+    else:
+        print(f"Generated {len(space)} compatible combinations")
 
     if quick:
-        combos = combos[:10]
-        total = len(combos)
         print(f"Quick mode: testing first {total} only")
 
     # Track results
@@ -75,83 +84,85 @@ def run_composable_sweep(
     best_label = ""
 
     start_time = time.time()
-
-    for idx, (params, label) in enumerate(combos):
-        # Check if already tested (use label as dedup key)
-        hash_params = {
-            "entry": params["_entry_name"],
-            "exit": params["_exit_name"],
-            "filter": params["_filter_name"],
-            "sizer": params["_sizer_name"],
-        }
-        if tracker.has_been_tested("ComposableStrategy", symbol, timeframe, hash_params):
-            continue
-
-        try:
-            with suppress_stdout():
-                bt = Backtester(
-                    data=data.copy(),
-                    strategy_class=ComposableStrategy,
-                    parameters=params,
-                    initial_capital=INITIAL_CAPITAL,
-                    spread=SPREAD,
-                    execution_delay=EXECUTION_DELAY,
-                    interval=timeframe,
+    tested = tracker.tested_hashes("ComposableStrategy", symbol, timeframe)
+
+    with tracker.batch():
+        for idx, (_, params, label) in enumerate(space.iter(shard, n_shards, total)):
+            # Check if already tested (use label as dedup key)
+            hash_params = {
+                "entry": params["_entry_name"],
+                "exit": params["_exit_name"],
+                "filter": params["_filter_name"],
+                "sizer": params["_sizer_name"],
+            }
+            if ExperimentTracker.params_hash(hash_params) in tested:
+                continue
+
+            try:
+                with suppress_stdout():
+                    bt = Backtester(
+                        data=data.copy(),
+                        strategy_class=ComposableStrategy,
+                        parameters=params,
+                        initial_capital=INITIAL_CAPITAL,
+                        spread=SPREAD,
+                        execution_delay=EXECUTION_DELAY,
+                        interval=timeframe,
+                    )
+                    result = bt.run()
+
+                equity_curve = result.get("equity_curve", [])
+                sharpe = calc_sharpe(equity_curve)
+                score = score_result(result, equity_curve)
+
+                # Save to experiments DB
+                experiment_id = str(uuid.uuid4())[:8]
+                tracker.save(
+                    experiment_id=experiment_id,
+                    strategy="ComposableStrategy",
+                    strategy_source="composable",
+                    symbol=symbol,
+                    timeframe=timeframe,
+                    params=hash_params,
+                    results={
+                        "return_pct": result["return_pct"],
+                        "max_drawdown": result["max_drawdown"],
+                        "total_trades": result["total_trades"],
+                        "win_rate": result["win_rate"],
+                        "profit_factor": result["profit_factor"],
+                        "sharpe": sharpe,
+                        "equity_curve": equity_curve,
+                    },
+                    score=score,
+                    train_period=f"{start} to {end}",
                 )
-                result = bt.run()
-
-            equity_curve = result.get("equity_curve", [])
-            sharpe = calc_sharpe(equity_curve)
-            score = score_result(result, equity_curve)
-
-            # Save to experiments DB
-            experiment_id = str(uuid.uuid4())[:8]
-            tracker.save(
-                experiment_id=experiment_id,
-                strategy="ComposableStrategy",
-                strategy_source="composable",
-                symbol=symbol,
-                timeframe=timeframe,
-                params=hash_params,
-                results={
-                    "return_pct": result["return_pct"],
-                    "max_drawdown": result["max_drawdown"],
-                    "total_trades": result["total_trades"],
-                    "win_rate": result["win_rate"],
-                    "profit_factor": result["profit_factor"],
-                    "sharpe": sharpe,
-                    "equity_curve": equity_curve,
-                },
-                score=score,
-                train_period=f"{start} to {end}",
-            )
-
-            if sharpe > best_sharpe:
-                best_sharpe = sharpe
-                best_label = label
-
-            if result.get("return_pct", 0) > 0:
-                passed += 1
-            else:
-                failed += 1
 
-        except Exception as e:
-            failed += 1
-            if idx < 5:
-                print(f"  Error on combo {idx}: {e}")
-
-        # Progress
-        done = idx + 1
-        if done % 25 == 0 or done == total:
-            elapsed = time.time() - start_time
-            rate = done / elapsed if elapsed > 0 else 0
-            remaining = (total - done) / rate if rate > 0 else 0
-            print(
-                f"  [{done}/{total}] "
-                f"{passed} positive, {failed} negative | "
-                f"Best Sharpe: {best_sharpe:.3f} | "
-                f"ETA: {remaining/60:.1f}m"
-            )
+                if sharpe > best_sharpe:
+                    best_sharpe = sharpe
+                    best_label = label
+
+                if result.get("return_pct", 0) > 0:
+                    passed += 1
+                else:
+                    failed += 1
+
+            except Exception as e:
+                failed += 1
+                if idx < 5:
+                    print(f"  Error on combo {idx}: {e}")
+
+            # Progress
+            done = idx + 1
+            if done % 25 == 0 or done == total:
+                elapsed = time.time() - start_time
+                rate = done / elapsed if elapsed > 0 else 0
+                remaining = (total - done) / rate if rate > 0 else 0
+                print(
+                    f"  [{done}/{total}] "
+                    f"{passed} positive, {failed} negative | "
+                    f"Best Sharpe: {best_sharpe:.3f} | "
+                    f"ETA: {remaining/60:.1f}m"
+                )
 
     elapsed = time.time() - start_time
     print(f"\nDone in {elapsed/60:.1f} minutes")
@@ -169,6 +180,8 @@ def main():
     parser.add_argument("--end", type=str, default="2025-12-31")
     parser.add_argument("--quick", action="store_true", help="Test first 10 combos only")
     parser.add_argument("--describe", action="store_true", help="Show available blocks")
+    parser.add_argument("--shard", type=str, default="0/1",
+                        help="Run shard K of N of the combinations, as K/N (default: 0/1)")
     args = parser.parse_args()
 
     if args.describe:
@@ -181,6 +194,8 @@ def main():
         start=args.start,
         end=args.end,
         quick=args.quick,
+        shard=int(args.shard.split("/")[0]),
+        n_shards=int(args.shard.split("/")[1]),
     )
 
 
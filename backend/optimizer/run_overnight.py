@@ -8,22 +8,30 @@ Usage:
     python -m backend.optimizer.run_overnight --quick
     python -m backend.optimizer.run_overnight --max-hours 10
     python -m backend.optimizer.run_overnight --skip-composable
+    python -m backend.optimizer.run_overnight --medium --workers 16
+    python -m backend.optimizer.run_overnight --medium --search halving
+    python -m backend.optimizer.run_overnight --resume   # continue an interrupted night
 """
 
 import argparse
 import json
+import os
 import sqlite3
 import time
 from datetime import datetime
 
 from backend.optimizer.sweep import SweepEngine
+from backend.optimizer.halving import predicted_backtests, run_halving_sweep
+from backend.optimizer.cost_model import CostModel
 from backend.optimizer.run_sweep import PARAM_GRIDS, STRATEGY_MAP
-from backend.optimizer.pipeline import validate_candidate, STRATEGY_CLASS_MAP
+from backend.optimizer.pipeline import STRATEGY_CLASS_MAP
 from backend.optimizer.run_composable import run_composable_sweep
 from backend.optimizer.validate_composable import rebuild_params
-from backend.optimizer.composable_strategy import ComposableStrategy
+from backend.optimizer.validation_pool import validate_candidates
 from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.experiment_store import STORE_DIR, ExperimentStore
 from backend.optimizer.validation import get_related_symbols
+from backend.optimizer.disqualify import DISQUALIFICATION_RULES
 
 
 # ---------------------------------------------------------------------------
@@ -63,6 +71,58 @@ class TimeBudget:
         return f"{int(r // 3600)}h {int((r % 3600) // 60)}m"
 
 
+def _fmt_seconds(seconds):
+    return f"{int(seconds // 3600)}h {int((seconds % 3600) // 60)}m"
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint (resume an interrupted night)
+# ---------------------------------------------------------------------------
+
+CHECKPOINT_FILE = "backend/overnight_checkpoint.json"
+
+
+class Checkpoint:
+    """Completed passes and work items, persisted after every item.
+
+    A fresh run starts a new checkpoint; --resume loads the previous one
+    and skips whatever it records as done.
+    """
+
+    def __init__(self, path=CHECKPOINT_FILE, resume=False):
+        self.path = path
+        self.state = {"started": datetime.now().isoformat(), "passes": [], "items": []}
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                self.state = json.load(f)
+        self._items = set(self.state["items"])
+        self._save()
+
+    def is_done(self, key):
+        return key in self._items
+
+    def mark_done(self, key):
+        if key not in self._items:
+            self._items.add(key)
+            self.state["items"].append(key)
+            self._save()
+
+    def pass_done(self, name):
+        return name in self.state["passes"]
+
+    def mark_pass(self, name):
+        if name not in self.state["passes"]:
+            self.state["passes"].append(name)
+            self._save()
+
+    def _save(self):
+        # Write-then-rename so a kill mid-write never leaves a torn file
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.path)
+
+
 # ---------------------------------------------------------------------------
 # Sweep targets (priority-ordered)
 # ---------------------------------------------------------------------------
@@ -126,7 +186,9 @@ QUICK_GRIDS = {
 }
 
 # Medium mode: covers edge cases without exhaustive search
-# StochRSI: 3*3*3*3*3*2*2 = 972 combos (vs 3,456 full, 32 quick)
+# StochRSI: 3*3*3*3*3*2*2 = 972 combos (vs 3,456 full, 32 quick); 486 distinct
+#   backtests, since adx_threshold is inert unless skip_adx_filter=False and
+#   dynamic_adx=False (the sweep engine runs each canonical combo once)
 # Donchian: 4*2*2*2 = 32 combos
 # MACD: 2*2*2*2*2*2 = 64 combos
 MEDIUM_GRIDS = {
@@ -190,14 +252,176 @@ SCAN_GRIDS = {
 START_DATE = "2020-01-01"
 END_DATE = "2025-12-31"
 
+# Search modes for Pass 1 ("auto" picks one per target)
+SEARCH_MODES = ["auto", "grid", "halving", "hyperband"]
+
+# Grids smaller than this are cheap enough to sweep exhaustively
+HALVING_MIN_COMBOS = 100
+
+# Hyperband hedges better than plain halving but costs ~1 extra full-period
+# round per bracket: only worth it with this much budget left per target
+HYPERBAND_MIN_MINUTES_PER_TARGET = 60
+
+
+def pick_search_mode(search, n_combos, budget, targets_left):
+    """Search mode for one sweep target.
+
+    Explicit modes are returned as-is. "auto" sweeps small grids
+    exhaustively, and large ones with Hyperband when the budget left per
+    remaining target allows it, otherwise with successive halving.
+    """
+    if search != "auto":
+        return search
+    if n_combos < HALVING_MIN_COMBOS:
+        return "grid"
+    per_target = budget.remaining() / max(1, targets_left) / 60
+    return "hyperband" if per_target >= HYPERBAND_MIN_MINUTES_PER_TARGET else "halving"
+
+
+# ---------------------------------------------------------------------------
+# Budget planning
+# ---------------------------------------------------------------------------
+
+# Only plan this share of the remaining time (predictions are estimates)
+PLAN_SAFETY = 0.9
+
+# Time held back for Pass 3: this many validations, at most MAX_VALIDATION_SHARE
+VALIDATION_RESERVE_CANDIDATES = 40
+MAX_VALIDATION_SHARE = 0.4
+
+# Grids are not shrunk below this many combos (the sweep is deferred instead)
+MIN_SHRUNK_COMBOS = 8
+
+
+def shrink_grid(grid):
+    """Halve the longest value list (every other value, ends kept; 2 -> first).
+
+    Returns a new grid, or None when every list has a single value.
+    """
+    name = max(grid, key=lambda k: len(grid[k]))
+    values = list(grid[name])
+    if len(values) <= 1:
+        return None
+    if len(values) == 2:
+        thinned = values[:1]
+    elif (len(values) - 1) % 2 == 0:
+        thinned = values[::2]
+    else:
+        thinned = values[::2] + [values[-1]]
+    return {**grid, name: thinned}
+
+
+def plan_sweeps(engine, targets, strategies, grids, search, budget,
+                cost_model=None, reserve_seconds=0.0, skip=(), verbose=True):
+    """Order and size Pass 1 sweeps to fit the remaining budget.
+
+    Each (target, strategy) sweep is costed as untested combos x bars x
+    the learned seconds per bar, for the search mode it will use. Sweeps
+    are then taken cheapest-per-unit-of-priority first (priority falls
+    with position in `targets`); one that doesn't fit in what's left has
+    its grid thinned until it does, and is deferred if it never does.
+    Without a cost model the sweeps keep their priority order.
+
+    Pass 1 calls this again after every sweep (with the keys already
+    done in `skip`), so deferred sweeps and the rest of shrunk grids get
+    the time that sweeps finishing under their prediction leave over.
+
+    Returns:
+        list of work items (dicts) in run order
+    """
+    items = []
+    for rank, (symbol, tf) in enumerate(targets):
+        for strat_name in strategies:
+            strategy_class = STRATEGY_MAP.get(strat_name)
+            grid = grids.get(strat_name)
+            key = f"sweep:{symbol}:{tf}:{strat_name}"
+            if not strategy_class or not grid or key in skip:
+                continue
+            item = {
+                "key": key,
+                "symbol": symbol, "timeframe": tf, "strategy": strat_name,
+                "strategy_class": strategy_class, "grid": grid,
+                "weight": len(targets) - rank, "targets_left": len(targets) - rank,
+                "shrunk": False,
+            }
+            _cost_item(engine, item, search, budget, cost_model)
+            items.append(item)
+
+    if cost_model is None:
+        return items
+
+    # Fully tested sweeps cost nothing but a data load: drop them
+    items = [it for it in items if it["todo"] > 0]
+    items.sort(key=lambda it: it["weight"] / max(it["seconds"], 1e-9), reverse=True)
+
+    available = max(0.0, budget.remaining() * PLAN_SAFETY - reserve_seconds)
+    plan, deferred = [], []
+    for item in items:
+        while item["seconds"] > available:
+            smaller = shrink_grid(item["grid"])
+            if smaller is None or len(SweepEngine._expand_grid(smaller)) < MIN_SHRUNK_COMBOS:
+                break
+            item.update(grid=smaller, shrunk=True)
+            _cost_item(engine, item, search, budget, cost_model)
+        if item["seconds"] > available or item["todo"] == 0:
+            deferred.append(item)
+            continue
+        plan.append(item)
+        available -= item["seconds"]
+
+    if not verbose:
+        return plan
+    predicted = sum(it["seconds"] for it in plan)
+    print(f"\nPlan: {len(plan)} sweeps, predicted {_fmt_seconds(predicted)} "
+          f"({sum(it['shrunk'] for it in plan)} grids shrunk, {len(deferred)} deferred)")
+    for it in plan:
+        print(f"  {it['symbol']:>4} {it['timeframe']:>3} {it['strategy']:<22} "
+              f"{it['mode']:<9} {it['todo']:>5} combos  ~{it['seconds'] / 60:.1f}m"
+              f"{'  (shrunk)' if it['shrunk'] else ''}")
+    for it in deferred:
+        print(f"  deferred: {it['symbol']} {it['timeframe']} {it['strategy']} "
+              f"(~{it['seconds'] / 60:.1f}m)")
+    return plan
+
+
+def _cost_item(engine, item, search, budget, cost_model):
+    """Fill in a work item's untested combo count, search mode and predicted seconds."""
+    combos = SweepEngine._expand_grid(item["grid"])
+    todo, _, _ = engine.pending_combos(combos, item["strategy_class"], item["symbol"],
+                                       item["timeframe"])
+    item["todo"] = len(todo)
+    item["mode"] = pick_search_mode(search, len(todo), budget, item["targets_left"])
+    item["seconds"] = 0.0
+    if cost_model is not None:
+        item["seconds"] = cost_model.predict_sweep(
+            item["strategy_class"].__name__, item["symbol"], item["timeframe"],
+            predicted_backtests(len(todo), item["mode"]), START_DATE, END_DATE,
+            engine.workers,
+        )
+
 
 # ---------------------------------------------------------------------------
 # Pass 1: Broad Sweep
 # ---------------------------------------------------------------------------
 
 def pass1_broad_sweep(engine, budget, targets, strategies, grids,
-                      quick=False, skip_composable=False):
-    """Run param sweeps across priority-ordered targets."""
+                      quick=False, skip_composable=False, early_abort=True,
+                      search="grid", cost_model=None, checkpoint=None,
+                      reserve_seconds=0.0):
+    """Run param sweeps across priority-ordered targets.
+
+    With early_abort, combos stop as soon as they break the drawdown
+    disqualification rule (they could never reach Pass 3).
+    search is one of SEARCH_MODES; halving/hyperband runs stop promoting
+    through the shorter slices once the budget expires.
+
+    With a cost_model the sweeps are reordered, shrunk or deferred to fit
+    the budget minus reserve_seconds (see plan_sweeps), and what's left is
+    re-planned after each sweep against the time actually remaining: a
+    deferred sweep runs once it fits, and a shrunk grid sweep can come
+    back for the rest of its grid. Sweeps recorded in the checkpoint are
+    skipped, and each one finished on its full grid is recorded.
+    """
     budget.start_pass("sweep")
 
     total_sweeps = 0
@@ -210,36 +434,62 @@ def pass1_broad_sweep(engine, budget, targets, strategies, grids,
     print(f"Strategies: {strategies}")
     print(f"Time remaining: {budget.fmt_remaining()}")
 
-    for symbol, tf in targets:
+    plan = plan_sweeps(engine, targets, strategies, grids, search, budget,
+                       cost_model, reserve_seconds)
+
+    # Keys not to plan again: run (or checkpointed) on their full grid, or failed
+    finished = set()
+    while plan:
+        item = plan.pop(0)
         if budget.is_expired():
             print("\n*** Time budget expired — stopping sweeps ***")
             break
+        if checkpoint is not None and checkpoint.is_done(item["key"]):
+            finished.add(item["key"])
+            continue
 
-        for strat_name in strategies:
-            if budget.is_expired():
-                break
-
-            strategy_class = STRATEGY_MAP.get(strat_name)
-            grid = grids.get(strat_name)
-            if not strategy_class or not grid:
-                continue
+        sweep_args = dict(
+            strategy_class=item["strategy_class"],
+            param_grid=item["grid"],
+            symbol=item["symbol"],
+            timeframe=item["timeframe"],
+            start=START_DATE,
+            end=END_DATE,
+            skip_tested=True,
+            verbose=True,
+            abort_rules=DISQUALIFICATION_RULES if early_abort else None,
+        )
 
-            try:
-                results = engine.run_sweep(
-                    strategy_class=strategy_class,
-                    param_grid=grid,
-                    symbol=symbol,
-                    timeframe=tf,
-                    start=START_DATE,
-                    end=END_DATE,
-                    skip_tested=True,
-                    verbose=True,
+        try:
+            if item["mode"] == "grid":
+                results = engine.run_sweep(**sweep_args)
+            else:
+                results = run_halving_sweep(
+                    engine, **sweep_args,
+                    hyperband=(item["mode"] == "hyperband"),
+                    should_stop=budget.is_expired,
                 )
-                total_sweeps += 1
-                total_results += len(results)
+            total_sweeps += 1
+            total_results += len(results)
+            # A shrunk grid sweep that made progress may come back for the rest
+            if not (item["shrunk"] and item["mode"] == "grid" and results):
+                finished.add(item["key"])
+                if checkpoint is not None and not item["shrunk"] and not budget.is_expired():
+                    checkpoint.mark_done(item["key"])
 
-            except Exception as e:
-                print(f"  ERROR {strat_name} {symbol} {tf}: {e}")
+        except Exception as e:
+            finished.add(item["key"])
+            print(f"  ERROR {item['strategy']} {item['symbol']} {item['timeframe']}: {e}")
+
+        if cost_model is not None and not budget.is_expired():
+            queued = {it["key"] for it in plan}
+            plan = plan_sweeps(engine, targets, strategies, grids, search, budget,
+                               cost_model, reserve_seconds, skip=finished, verbose=False)
+            added = [it for it in plan if it["key"] not in queued]
+            if added:
+                print(f"\nRe-planned with {budget.fmt_remaining()} left: "
+                      + ", ".join(f"{it['symbol']} {it['timeframe']} {it['strategy']}"
+                                  f"{' (shrunk)' if it['shrunk'] else ''}" for it in added))
 
     # Composable sweeps
     if not skip_composable and not budget.is_expired():
@@ -250,6 +500,9 @@ def pass1_broad_sweep(engine, budget, targets, strategies, grids,
                 print("\n*** Time budget expired — stopping composable sweeps ***")
                 break
 
+            key = f"composable:{symbol}:{tf}"
+            if checkpoint is not None and checkpoint.is_done(key):
+                continue
             try:
                 print(f"  Composable {symbol} {tf}...")
                 run_composable_sweep(
@@ -258,6 +511,8 @@ def pass1_broad_sweep(engine, budget, targets, strategies, grids,
                     quick=quick,
                 )
                 total_sweeps += 1
+                if checkpoint is not None and not budget.is_expired():
+                    checkpoint.mark_done(key)
             except Exception as e:
                 print(f"  ERROR composable {symbol} {tf}: {e}")
 
@@ -328,84 +583,66 @@ def pass2_filter(budget):
 # Pass 3: Validate
 # ---------------------------------------------------------------------------
 
-def pass3_validate(existing, composable, tracker, budget):
-    """Run full validation pipeline on filtered candidates."""
+def pass3_validate(existing, composable, tracker, budget, cost_model=None, workers=1):
+    """Run full validation pipeline on filtered candidates.
+
+    Candidates are validated in parallel processes when workers > 1 (see
+    validation_pool); no new ones start once the budget expires. Each
+    validation's runtime is recorded in cost_model (if given), which
+    sizes the Pass 3 reserve of later nights.
+    """
     budget.start_pass("validate")
 
     print(f"\n{'='*60}")
     print("PASS 3: VALIDATE CANDIDATES")
     print(f"{'='*60}")
     print(f"Candidates: {len(existing)} existing + {len(composable)} composable")
+    print(f"Workers: {workers}")
     print(f"Time remaining: {budget.fmt_remaining()}")
 
     results = {"passed": [], "marginal": [], "rejected": []}
 
-    # --- Existing strategies ---
+    # Labels double as the progress lines: "[3/150] ..." or "[C2/30] ..."
+    candidates, labels = [], []
     for i, exp in enumerate(existing):
-        if budget.is_expired():
-            print("\n*** Time budget expired — stopping validation ***")
-            break
-
         strategy_name = exp["strategy"]
-        strategy_class = STRATEGY_CLASS_MAP.get(strategy_name)
-        if not strategy_class:
+        if strategy_name not in STRATEGY_CLASS_MAP:
             print(f"  [{i+1}/{len(existing)}] Skip (unknown class): {strategy_name}")
             continue
+        candidates.append(exp)
+        labels.append((f"[{i+1}/{len(existing)}] {strategy_name}", None))
 
-        params = exp["parameters"]
-        symbol = exp["symbol"]
-        tf = exp["timeframe"]
-
-        print(f"  [{i+1}/{len(existing)}] {strategy_name} {symbol} {tf} "
-              f"(Sharpe {exp['sharpe']:.3f})...", end=" ", flush=True)
-
-        try:
-            validation = validate_candidate(
-                strategy_class, params, symbol, tf, verbose=False
-            )
-            status = validation["status"]
-            _save_validation(tracker, exp["id"], validation)
-            results[status.lower()].append(_winner_entry(
-                strategy_name, symbol, tf, exp["sharpe"], validation
-            ))
-            print(f"-> {status}")
-
-        except Exception as e:
-            print(f"-> ERROR: {e}")
-
-    # --- Composable strategies ---
     for i, exp in enumerate(composable):
-        if budget.is_expired():
-            print("\n*** Time budget expired — stopping composable validation ***")
-            break
-
         params = exp["parameters"]
-        symbol = exp["symbol"]
-        tf = exp["timeframe"]
         label = f"{params.get('entry', '?')} + {params.get('exit', '?')}"
-
-        print(f"  [C{i+1}/{len(composable)}] {label} {symbol} {tf} "
-              f"(Sharpe {exp['sharpe']:.3f})...", end=" ", flush=True)
-
-        try:
-            full_params = rebuild_params(params, symbol)
-            if not full_params:
-                print("-> Skip (can't rebuild)")
-                continue
-
-            validation = validate_candidate(
-                ComposableStrategy, full_params, symbol, tf, verbose=False
-            )
-            status = validation["status"]
-            _save_validation(tracker, exp["id"], validation)
-            results[status.lower()].append(_winner_entry(
-                "ComposableStrategy", symbol, tf, exp["sharpe"], validation,
-                label=label,
-            ))
-            print(f"-> {status}")
-
-        except Exception as e:
-            print(f"-> ERROR: {e}")
+        if not rebuild_params(params, exp["symbol"]):
+            print(f"  [C{i+1}/{len(composable)}] {label} -> Skip (can't rebuild)")
+            continue
+        candidates.append(exp)
+        labels.append((f"[C{i+1}/{len(composable)}] {label}", label))
+
+    finished = 0
+    for k, validation, error, seconds in validate_candidates(
+            candidates, workers=workers, tracker=tracker, should_stop=budget.is_expired):
+        exp = candidates[k]
+        progress, label = labels[k]
+        symbol, tf = exp["symbol"], exp["timeframe"]
+        line = f"  {progress} {symbol} {tf} (Sharpe {exp['sharpe']:.3f})..."
+        finished += 1
+        if error is not None:
+            print(f"{line} -> ERROR: {error}")
+            continue
+        if cost_model is not None:
+            cost_model.record("validate", exp["strategy"], 1, seconds,
+                              symbol=symbol, timeframe=tf)
+        status = validation["status"]
+        results[status.lower()].append(_winner_entry(
+            exp["strategy"], symbol, tf, exp["sharpe"], validation, label=label,
+        ))
+        print(f"{line} -> {status}")
+
+    if finished < len(candidates):
+        print("\n*** Time budget expired — stopping validation ***")
 
     budget.end_pass("validate")
 
@@ -415,31 +652,6 @@ def pass3_validate(existing, composable, tracker, budget):
     return results
 
 
-def _save_validation(tracker, row_id, validation):
-    """Persist validation result to DB."""
-    test_return = None
-    if "holdout" in validation and "test_return" in validation["holdout"]:
-        test_return = validation["holdout"]["test_return"]
-
-    details = {}
-    if "holdout" in validation:
-        details["holdout_degradation"] = validation["holdout"].get("degradation")
-    if "walk_forward" in validation:
-        details["walk_forward_pass_rate"] = validation["walk_forward"].get("pass_rate")
-        details["avg_test_return"] = validation["walk_forward"].get("avg_test_return")
-    if "multi_asset" in validation:
-        details["multi_asset_positive_rate"] = validation["multi_asset"].get("positive_rate")
-    if "reason" in validation:
-        details["rejection_reason"] = validation["reason"]
-
-    tracker.update_validation(
-        row_id=row_id,
-        validation_status=validation["status"].lower(),
-        test_return_pct=test_return,
-        validation_details=details,
-    )
-
-
 def _winner_entry(strategy, symbol, tf, sharpe, validation, label=None):
     return {
         "strategy": strategy,
@@ -455,8 +667,12 @@ def _winner_entry(strategy, symbol, tf, sharpe, validation, label=None):
 # Pass 4: Expand Winners
 # ---------------------------------------------------------------------------
 
-def pass4_expand(validation_results, engine, budget, grids, skip_composable=False):
-    """Expand winners to adjacent timeframes and related assets."""
+def pass4_expand(validation_results, engine, budget, grids, skip_composable=False,
+                 checkpoint=None):
+    """Expand winners to adjacent timeframes and related assets.
+
+    Expansion sweeps recorded in the checkpoint are skipped.
+    """
     budget.start_pass("expand")
 
     winners = validation_results["passed"] + validation_results["marginal"]
@@ -497,6 +713,9 @@ def pass4_expand(validation_results, engine, budget, grids, skip_composable=Fals
         for new_sym, new_tf in targets:
             if budget.is_expired():
                 break
+            key = f"expand:{strategy_name}:{new_sym}:{new_tf}"
+            if checkpoint is not None and checkpoint.is_done(key):
+                continue
 
             if strategy_name == "ComposableStrategy":
                 if skip_composable:
@@ -507,6 +726,8 @@ def pass4_expand(validation_results, engine, budget, grids, skip_composable=Fals
                         symbol=new_sym, timeframe=new_tf, quick=True,
                     )
                     print("done")
+                    if checkpoint is not None and not budget.is_expired():
+                        checkpoint.mark_done(key)
                 except Exception as e:
                     print(f"ERROR: {e}")
             else:
@@ -532,6 +753,8 @@ def pass4_expand(validation_results, engine, budget, grids, skip_composable=Fals
                         verbose=False,
                     )
                     total_new += len(results)
+                    if checkpoint is not None and not budget.is_expired():
+                        checkpoint.mark_done(key)
                     if results:
                         best = results[0]
                         print(f"    {short_name} {new_sym} {new_tf}: "
@@ -634,14 +857,30 @@ def main():
                         help="Comma-separated symbols to target (e.g. GLD,IAU,SLV)")
     parser.add_argument("--timeframes", type=str, default=None,
                         help="Comma-separated timeframes to target (e.g. 15m,1h,4h)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes per sweep and for validation (default: 1)")
+    parser.add_argument("--no-early-abort", action="store_true",
+                        help="Run every Pass 1 combo to the end (no early disqualification)")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="auto",
+                        help="Pass 1 search: exhaustive grid, successive halving, "
+                             "hyperband, or auto (picked per target; default)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last run: skip passes and sweeps its checkpoint "
+                             "records as done")
+    parser.add_argument("--no-plan", action="store_true",
+                        help="Run Pass 1 in fixed priority order (no cost-model planning)")
+    parser.add_argument("--parquet", action="store_true",
+                        help=f"Also write results to the Parquet store ({STORE_DIR})")
     args = parser.parse_args()
 
     if args.quick and args.max_hours == 10:  # only cap if user didn't specify
         args.max_hours = 1.0
 
     budget = TimeBudget(args.max_hours)
-    tracker = ExperimentTracker()
-    engine = SweepEngine(tracker=tracker)
+    tracker = ExperimentTracker(store=ExperimentStore() if args.parquet else None)
+    cost_model = CostModel()
+    engine = SweepEngine(tracker=tracker, workers=args.workers, cost_model=cost_model)
+    checkpoint = Checkpoint(resume=args.resume)
     count_before = tracker.count()
 
     print(f"{'='*60}")
@@ -651,6 +890,8 @@ def main():
     print(f"Time budget:      {args.max_hours}h")
     grid_mode = "scan" if args.scan else "quick" if args.quick else "medium" if args.medium else "full"
     print(f"Grid mode:        {grid_mode}")
+    print(f"Search mode:      {args.search}")
+    print(f"Resume:           {args.resume} ({len(checkpoint.state['items'])} items done)")
     print(f"Skip composable:  {args.skip_composable}")
     print(f"Skip sweep:       {args.skip_sweep}")
     print(f"Skip validation:  {args.skip_validation}")
@@ -677,20 +918,36 @@ def main():
         allowed_tfs = [t.strip() for t in args.timeframes.split(",")]
         targets = [(s, tf) for s, tf in targets if tf in allowed_tfs]
 
-    # Pass 1: Broad sweep
-    if not args.skip_sweep:
+    # Pass 1: Broad sweep (holding back time for Pass 3)
+    reserve = 0.0
+    if not args.skip_validation:
+        reserve = min(cost_model.predict_validation(VALIDATION_RESERVE_CANDIDATES,
+                                                    workers=args.workers),
+                      budget.remaining() * MAX_VALIDATION_SHARE)
+    if args.skip_sweep:
+        print(f"\n*** Skipping Pass 1 (sweep) ***")
+    elif checkpoint.pass_done("sweep"):
+        print(f"\n*** Pass 1 already complete (checkpoint) ***")
+    else:
         pass1_broad_sweep(
             engine, budget, targets, SWEEP_STRATEGIES, grids,
             quick=args.quick, skip_composable=args.skip_composable,
+            early_abort=not args.no_early_abort,
+            search=args.search,
+            cost_model=None if args.no_plan else cost_model,
+            checkpoint=checkpoint,
+            reserve_seconds=reserve,
         )
-    else:
-        print(f"\n*** Skipping Pass 1 (sweep) ***")
+        if not budget.is_expired():
+            checkpoint.mark_pass("sweep")
 
     # Pass 2 & 3: Filter and validate
     validation_results = {"passed": [], "marginal": [], "rejected": []}
     if not args.skip_validation:
+        # Validated candidates leave 'pending', so a resumed Pass 3 picks up the rest
         existing, composable = pass2_filter(budget)
-        validation_results = pass3_validate(existing, composable, tracker, budget)
+        validation_results = pass3_validate(existing, composable, tracker, budget,
+                                            cost_model=cost_model, workers=args.workers)
     else:
         print(f"\n*** Skipping Pass 2-3 (filter/validation) ***")
 
@@ -710,6 +967,7 @@ def main():
     pass4_expand(
         validation_results, engine, budget, grids,
         skip_composable=args.skip_composable,
+        checkpoint=checkpoint,
     )
 
     # Final report
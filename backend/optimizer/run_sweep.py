@@ -4,6 +4,8 @@ Usage:
     python -m backend.optimizer.run_sweep
     python -m backend.optimizer.run_sweep --strategy StochRSIMeanReversion --symbol SPY --timeframe 5m
     python -m backend.optimizer.run_sweep --quick   # Small test sweep
+    python -m backend.optimizer.run_sweep --strategy StochRSIMeanReversion --workers 16
+    python -m backend.optimizer.run_sweep --strategy StochRSIMeanReversion --search tpe --trials 200
 """
 
 import argparse
@@ -11,6 +13,9 @@ import sys
 
 from backend.optimizer.sweep import SweepEngine
 from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.experiment_store import STORE_DIR, ExperimentStore
+from backend.optimizer.disqualify import DISQUALIFICATION_RULES
+from backend.optimizer.tpe import Categorical, Float, Int, run_tpe_search
 
 # Import strategies from runner.py's STRATEGY_MAP
 from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
@@ -54,6 +59,33 @@ PARAM_GRIDS = {
     },
 }
 
+# Search spaces for --search tpe (same params as PARAM_GRIDS, continuous ranges)
+SEARCH_SPACES = {
+    "StochRSIMeanReversion": {
+        "rsi_period": Int(5, 30),
+        "stoch_period": Int(5, 30),
+        "overbought": Int(65, 90),
+        "oversold": Int(10, 35),
+        "sl_atr": Float(1.0, 4.0, step=0.05),
+        "skip_adx_filter": Categorical([True, False]),
+        "adx_threshold": Int(15, 35, when={"skip_adx_filter": [False]}),
+    },
+    "DonchianBreakout": {
+        "entry_period": Int(5, 80),
+        "exit_period": Int(3, 30),
+        "stop_loss_atr": Float(1.0, 4.0, step=0.05),
+        "atr_period": Int(10, 30),
+    },
+    "MACDBollinger": {
+        "macd_fast": Int(6, 18),
+        "macd_slow": Int(18, 34),
+        "macd_signal": Int(5, 14),
+        "bb_period": Int(10, 30),
+        "bb_std": Float(1.0, 3.0, step=0.05),
+        "sl_atr": Float(1.0, 4.0, step=0.05),
+    },
+}
+
 # Quick test: small grid for smoke testing
 QUICK_GRID = {
     "StochRSIMeanReversion": {
@@ -81,11 +113,22 @@ def main():
     parser.add_argument("--experiment-id", type=str, help="Custom experiment group ID")
     parser.add_argument("--no-skip", action="store_true",
                         help="Don't skip already-tested combinations")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes per sweep (default: 1)")
+    parser.add_argument("--early-abort", action="store_true",
+                        help="Stop combos early once they break the drawdown disqualification rule")
+    parser.add_argument("--search", choices=["grid", "tpe"], default="grid",
+                        help="Exhaustive grid or adaptive TPE search (default: grid)")
+    parser.add_argument("--trials", type=int, default=100,
+                        help="Backtests per symbol/timeframe with --search tpe (default: 100)")
+    parser.add_argument("--parquet", action="store_true",
+                        help=f"Also write results to the Parquet store ({STORE_DIR})")
 
     args = parser.parse_args()
 
-    tracker = ExperimentTracker()
-    engine = SweepEngine(tracker=tracker)
+    tracker = ExperimentTracker(store=ExperimentStore() if args.parquet else None)
+    engine = SweepEngine(tracker=tracker, workers=args.workers)
+    abort_rules = DISQUALIFICATION_RULES if args.early_abort else None
 
     if args.quick:
         # Quick smoke test: 1 strategy, 1 symbol, small grid
@@ -104,6 +147,7 @@ def main():
             end=args.end,
             experiment_id=args.experiment_id or f"quick_{strategy_name}",
             skip_tested=not args.no_skip,
+            abort_rules=abort_rules,
         )
         _print_summary(results, tracker)
         return
@@ -120,6 +164,29 @@ def main():
         timeframes = [args.timeframe] if args.timeframe else DEFAULT_TIMEFRAMES
         grid = PARAM_GRIDS.get(strategy_name, {})
 
+        if args.search == "tpe":
+            space = SEARCH_SPACES.get(strategy_name)
+            if not space:
+                print(f"No search space for {strategy_name}. Add one to SEARCH_SPACES.")
+                sys.exit(1)
+            for symbol in symbols:
+                for tf in timeframes:
+                    run_tpe_search(
+                        engine,
+                        strategy_class=STRATEGY_MAP[strategy_name],
+                        space=space,
+                        symbol=symbol,
+                        timeframe=tf,
+                        start=args.start,
+                        end=args.end,
+                        n_trials=args.trials,
+                        experiment_id=args.experiment_id or f"tpe_{strategy_name}",
+                        warm_start=not args.no_skip,
+                        abort_rules=abort_rules,
+                    )
+            _print_summary(engine.results, tracker)
+            return
+
         if not grid:
             print(f"No default param grid for {strategy_name}. "
                   f"Add one to PARAM_GRIDS or use --quick.")
@@ -136,6 +203,7 @@ def main():
                     end=args.end,
                     experiment_id=args.experiment_id or f"sweep_{strategy_name}",
                     skip_tested=not args.no_skip,
+                    abort_rules=abort_rules,
                 )
 
         _print_summary(engine.results, tracker)
@@ -0,0 +1,259 @@
+"""Parameter sensitivity around a sweep result.
+
+Does the winner sit on a plateau or on a spike? analyze() takes an
+experiments row and backtests every combination of its numeric params
+moved one grid step either way (the values next to it in run_sweep's
+PARAM_GRIDS, or ±10% for params without a grid) — a 3 x 3 x ... N-D
+neighbourhood around the row.
+
+Neighbours already in the experiments table are read back instead of
+re-run (same params hash, inert params folded as in the sweep engine);
+the rest run through SweepEngine (on a process pool with workers > 1)
+and are saved, so the next analysis of a nearby row is mostly cached.
+Rows of early-aborted runs (validation_details["aborted"]) only cover
+part of the period, so they don't count as cached: those neighbours are
+re-run to the end.
+
+The result carries the N-D surface of the chosen metric (a NumPy array
+indexed like the axes) and a stability score in [0, 1]: the mean of
+neighbour/centre metric, each ratio clipped to [0, 1]. A flat plateau
+scores close to 1, a lone spike close to 0. to_payload() makes it JSON
+for the frontend; passes_sensitivity() is the validation filter
+(pipeline.validate_top_candidates(sensitivity=True)).
+
+Usage:
+    python -m backend.optimizer.sensitivity 1234
+    python -m backend.optimizer.sensitivity 1234 --params rsi_period,oversold --workers 8
+"""
+
+import argparse
+from itertools import product
+
+import numpy as np
+
+from backend.engine.data_utils import load_backtest_data
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.pipeline import FULL_END, FULL_START, STRATEGY_CLASS_MAP
+from backend.optimizer.run_sweep import PARAM_GRIDS, STRATEGY_MAP
+from backend.optimizer.sweep import SweepEngine, canonical_params
+
+# Relative step for numeric params that have no grid
+FALLBACK_STEP = 0.1
+
+# passes_sensitivity threshold
+MIN_STABILITY = 0.5
+
+# Grids by strategy class name (as stored in the experiments table)
+GRIDS_BY_CLASS = {cls.__name__: PARAM_GRIDS[name]
+                  for name, cls in STRATEGY_MAP.items() if name in PARAM_GRIDS}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def neighbour_axis(value, grid_values=None):
+    """value with its neighbours one step either side, ascending.
+
+    With grid_values the neighbours are the nearest grid values below and
+    above (value need not be on the grid); otherwise value ± FALLBACK_STEP
+    (at least 1 for ints; positive values stay positive).
+    """
+    numeric = [g for g in grid_values or [] if _is_number(g)]
+    if numeric:
+        values = sorted(set(numeric) | {value})
+        i = values.index(value)
+        return values[max(0, i - 1):i + 2]
+    step = abs(value) * FALLBACK_STEP or FALLBACK_STEP
+    if isinstance(value, int):
+        step = max(1, int(round(step)))
+        lower, upper = value - step, value + step
+    else:
+        lower, upper = round(value - step, 6), round(value + step, 6)
+    return [lower, value, upper] if not (value > 0 and lower <= 0) else [value, upper]
+
+
+def neighbourhood(strategy_name, params, names=None):
+    """{param: axis} for the params to vary (default: every numeric grid param)."""
+    grid = GRIDS_BY_CLASS.get(strategy_name, {})
+    if names is None:
+        names = [k for k, v in params.items()
+                 if _is_number(v) and not k.startswith("_") and k != "symbol"
+                 and (not grid or k in grid)]
+    return {name: neighbour_axis(params[name], grid.get(name))
+            for name in names if _is_number(params.get(name))}
+
+
+def stability_score(surface, center):
+    """Mean of neighbour/centre ratios, clipped to [0, 1] (0 if the centre is <= 0)."""
+    value = surface[center]
+    if not value > 0:
+        return 0.0
+    mask = np.ones(surface.shape, dtype=bool)
+    mask[center] = False
+    neighbours = surface[mask]
+    neighbours = neighbours[~np.isnan(neighbours)]
+    if len(neighbours) == 0:
+        return 0.0
+    return float(np.clip(neighbours / value, 0.0, 1.0).mean())
+
+
+def _cached_row(rows, strategy_class, params):
+    """Latest complete experiments row for params (aborted runs don't count)."""
+    for params_hash in (ExperimentTracker.params_hash(canonical_params(strategy_class, params)),
+                        ExperimentTracker.params_hash(params)):
+        row = rows.get(params_hash)
+        if row and not (row.get("validation_details") or {}).get("aborted"):
+            return row
+    return None
+
+
+def analyze(experiment, names=None, metric="sharpe", tracker=None, workers=1, data=None,
+            start=FULL_START, end=FULL_END, verbose=False):
+    """Evaluate the ±1-step neighbourhood of an experiments row.
+
+    Args:
+        experiment: experiments row (strategy, symbol, timeframe, decoded
+            parameters)
+        names: params to vary (default: every numeric param on the grid)
+        metric: experiments column the surface holds (sharpe, score,
+            return_pct, ...)
+        tracker: ExperimentTracker to read cached neighbours from and save
+            new ones to
+        workers: processes for the neighbours that have to run
+        data: preloaded start..end bars (default: loaded if anything runs)
+
+    Returns:
+        dict with params, axes, center (index into surface), surface
+        (N-D array, NaN where a neighbour failed), center_value,
+        stability, by_param (stability along each axis alone), cached
+        (points read from the table) and evaluated (points run now; a
+        point that errored is neither) counts; empty if the row can't be
+        analysed
+    """
+    strategy_name = experiment["strategy"]
+    strategy_class = STRATEGY_CLASS_MAP.get(strategy_name)
+    if strategy_class is None:
+        print(f"Sensitivity: unknown strategy {strategy_name}")
+        return {}
+    symbol, timeframe = experiment["symbol"], experiment["timeframe"]
+    base = {k: v for k, v in experiment["parameters"].items() if k != "symbol"}
+    axes = neighbourhood(strategy_name, base, names)
+    if not axes:
+        return {}
+
+    names = list(axes)
+    points = [{**base, **dict(zip(names, combo)), "symbol": symbol}
+              for combo in product(*axes.values())]
+
+    tracker = tracker or ExperimentTracker()
+    engine = SweepEngine(tracker=tracker, workers=workers)
+    rows = tracker.results_by_hash(strategy_name, symbol, timeframe)
+    cached = sum(_cached_row(rows, strategy_class, p) is not None for p in points)
+    todo, _, _ = engine.pending_combos([dict(p) for p in points], strategy_class,
+                                       symbol, timeframe, skip_tested=False)
+    todo = [(i, params) for i, params in todo
+            if _cached_row(rows, strategy_class, points[i]) is None]
+
+    evaluated = 0
+    if todo:
+        if data is None:
+            data = load_backtest_data(symbol, timeframe, start, end)
+        if data.empty:
+            print(f"Sensitivity: no data for {symbol} {timeframe}")
+            return {}
+        if verbose:
+            print(f"Sensitivity: {len(points)} points, running {len(todo)}")
+        with tracker.batch():
+            for _, params, result, error in engine.evaluate(data, strategy_class, timeframe, todo):
+                if error is not None:
+                    continue
+                engine.save_result(result, params, strategy_name, symbol, timeframe,
+                                   f"sensitivity_{strategy_name}_{symbol}_{timeframe}")
+                evaluated += 1
+        rows = tracker.results_by_hash(strategy_name, symbol, timeframe)
+
+    values = []
+    for params in points:
+        row = _cached_row(rows, strategy_class, params)
+        value = row.get(metric) if row else None
+        values.append(np.nan if value is None else float(value))
+
+    shape = tuple(len(axis) for axis in axes.values())
+    surface = np.array(values, dtype=float).reshape(shape)
+    center = tuple(axes[name].index(base[name]) for name in names)
+
+    by_param = {}
+    for k, name in enumerate(names):
+        # The line through the centre along this axis only
+        line = tuple(slice(None) if j == k else c for j, c in enumerate(center))
+        by_param[name] = stability_score(surface[line], (center[k],))
+
+    return {
+        "strategy": strategy_name,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "metric": metric,
+        "params": names,
+        "axes": axes,
+        "center": center,
+        "center_value": float(surface[center]),
+        "surface": surface,
+        "stability": stability_score(surface, center),
+        "by_param": by_param,
+        "cached": cached,
+        "evaluated": evaluated,
+    }
+
+
+def passes_sensitivity(result, min_stability=MIN_STABILITY):
+    """(passes, reason) — reason is None if the result sits on a plateau."""
+    if not result:
+        return False, "sensitivity_unavailable"
+    if result["stability"] < min_stability:
+        return False, f"parameter_spike (stability {result['stability']:.2f} < {min_stability})"
+    return True, None
+
+
+def to_payload(result):
+    """JSON-ready copy of an analyze() result (surface as nested lists, NaN -> None)."""
+    if not result:
+        return {}
+    surface = result["surface"]
+    nested = np.where(np.isnan(surface), None, surface.astype(object)).tolist()
+    return {**result, "center": list(result["center"]), "surface": nested}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sensitivity around an experiment")
+    parser.add_argument("row_id", type=int, help="experiments row id")
+    parser.add_argument("--params", type=str, default=None,
+                        help="Comma-separated params to vary (default: all numeric grid params)")
+    parser.add_argument("--metric", type=str, default="sharpe")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for uncached neighbours (default: 1)")
+    args = parser.parse_args()
+
+    tracker = ExperimentTracker()
+    experiment = tracker.get_experiment(args.row_id)
+    if experiment is None:
+        print(f"No experiment with id {args.row_id}")
+        return
+
+    result = analyze(experiment, names=args.params.split(",") if args.params else None,
+                     metric=args.metric, tracker=tracker, workers=args.workers, verbose=True)
+    if not result:
+        return
+
+    print(f"\n{result['strategy']} on {result['symbol']} {result['timeframe']} — "
+          f"{result['metric']} {result['center_value']:.4f} at the centre")
+    print(f"Neighbourhood: {result['surface'].size} points "
+          f"({result['cached']} cached, {result['evaluated']} run)")
+    for name in result["params"]:
+        print(f"  {name:<20s} {result['axes'][name]}  stability {result['by_param'][name]:.2f}")
+    passes, reason = passes_sensitivity(result)
+    print(f"Stability: {result['stability']:.2f} — {'plateau' if passes else reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,28 @@
 Fetches data once per symbol/timeframe, runs Backtester N times with
 different parameter combinations, scores results, and saves to the
 experiments table via ExperimentTracker.
+
+With workers > 1 the combos run on a process pool: the data is sent to
+each worker once (pool initializer), combos go out in chunks, and results
+are saved in combo order as they come back.
+
+Combos are run grouped by the strategy's INDICATOR_PARAMS: the enriched
+frame (data + indicator columns) is computed once per group and every
+threshold/exit variant runs against it, instead of each combo recomputing
+the same indicators.
 """
 
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from contextlib import contextmanager
 from itertools import product
 
 from backend.engine.backtester import Backtester
 from backend.engine.data_utils import load_backtest_data
 from backend.optimizer.scoring import calc_sharpe, score_result
+from backend.optimizer.disqualify import abort_predicates, is_exact_abort
 from backend.optimizer.experiment_tracker import ExperimentTracker
 
 
@@ -29,24 +40,150 @@ def suppress_stdout():
         sys.stdout = old_stdout
 
 
+def silence_worker_stdout():
+    """Silence a pool worker once, from its initializer, instead of per run."""
+    sys.stdout = open(os.devnull, "w")
+
+
 # Hardcoded — validated against live execution. No exceptions.
 SPREAD = 0.0003
 EXECUTION_DELAY = 0
 INITIAL_CAPITAL = 10000.0
 
 
+# ---------------------------------------------------------------------------
+# Single-combo execution (shared by the sequential and process-pool paths)
+# ---------------------------------------------------------------------------
+
+def run_combo(data, strategy_class, params, timeframe,
+              spread=SPREAD, initial_capital=INITIAL_CAPITAL, abort_rules=None,
+              indicator_cache=None):
+    """Backtest one param combo and attach sharpe/score. Caller handles stdout.
+
+    With abort_rules (a DISQUALIFICATION_RULES-style dict) the run stops as
+    soon as it can no longer pass them; such results score -999 and carry
+    result["abort_reason"].
+
+    indicator_cache is a dict kept by the caller across combos on the same
+    data. If the strategy declares INDICATOR_PARAMS, the enriched frame of
+    the current indicator partition is kept there and reused until a combo
+    with different indicator params arrives.
+    """
+    key = indicator_key(strategy_class, params) if indicator_cache is not None else None
+    if key is not None:
+        if indicator_cache.get("key") != key:
+            indicator_cache.clear()  # one partition's frame in memory at a time
+            indicator_cache["frame"] = strategy_class.precompute_indicators(data, params)
+            indicator_cache["key"] = key
+        data = indicator_cache["frame"]
+        params = {**params, "_indicators_ready": True}
+
+    bt = Backtester(
+        data=data,
+        strategy_class=strategy_class,
+        parameters=params,
+        initial_capital=initial_capital,
+        spread=spread,
+        execution_delay=EXECUTION_DELAY,
+        interval=timeframe,
+        abort_predicates=abort_predicates(abort_rules) if abort_rules else None,
+    )
+    result = bt.run()
+
+    equity_curve = result.get("equity_curve", [])
+    result["sharpe"] = calc_sharpe(equity_curve)
+    result["score"] = -999.0 if result.get("aborted") else score_result(result, equity_curve)
+    return result
+
+
+def canonical_params(strategy_class, params):
+    """params without the keys the strategy would ignore given the others.
+
+    Uses the strategy's PARAM_DEPENDENCIES (param -> {parent: active values});
+    a parent missing from params takes its PARAM_DEFAULTS value. Two combos
+    with the same canonical params produce the same backtest.
+    """
+    dependencies = getattr(strategy_class, "PARAM_DEPENDENCIES", None)
+    if not dependencies:
+        return params
+    defaults = getattr(strategy_class, "PARAM_DEFAULTS", {})
+
+    def active(name):
+        return all(params.get(parent, defaults.get(parent)) in allowed
+                   for parent, allowed in dependencies[name].items())
+
+    return {k: v for k, v in params.items() if k not in dependencies or active(k)}
+
+
+def indicator_key(strategy_class, params):
+    """Partition key: the combo's INDICATOR_PARAMS values (None if undeclared)."""
+    names = getattr(strategy_class, "INDICATOR_PARAMS", None)
+    if names is None:
+        return None
+    return tuple(repr(params.get(name)) for name in names)
+
+
+def partition_order(strategy_class, todo):
+    """(index, params) pairs grouped by indicator partition, in first-seen order."""
+    if getattr(strategy_class, "INDICATOR_PARAMS", None) is None:
+        return list(todo)
+    groups = {}
+    for item in todo:
+        groups.setdefault(indicator_key(strategy_class, item[1]), []).append(item)
+    return [item for group in groups.values() for item in group]
+
+
+# Per-worker state: the data is shipped once per process via the initializer
+_WORKER = {}
+
+
+def _init_worker(data, strategy_class, timeframe, spread, initial_capital, abort_rules):
+    _WORKER.update(
+        data=data, strategy_class=strategy_class, timeframe=timeframe,
+        spread=spread, initial_capital=initial_capital, abort_rules=abort_rules,
+        indicator_cache={},
+    )
+    silence_worker_stdout()
+
+
+def _run_chunk(chunk):
+    """Worker: run a list of (index, params). Returns [(index, result, error)]."""
+    out = []
+    for i, params in chunk:
+        try:
+            result = run_combo(
+                _WORKER["data"], _WORKER["strategy_class"], params,
+                _WORKER["timeframe"], _WORKER["spread"], _WORKER["initial_capital"],
+                _WORKER["abort_rules"], _WORKER["indicator_cache"],
+            )
+            out.append((i, result, None))
+        except Exception as e:
+            out.append((i, None, str(e)))
+    return out
+
+
 class SweepEngine:
     """Run parameter sweeps for a strategy across symbols and timeframes."""
 
-    def __init__(self, tracker=None, spread=SPREAD, initial_capital=INITIAL_CAPITAL):
+    def __init__(self, tracker=None, spread=SPREAD, initial_capital=INITIAL_CAPITAL,
+                 workers=1, chunksize=None, cost_model=None):
+        """
+        Args:
+            workers: processes per sweep (1 = run in this process)
+            chunksize: combos per task sent to a worker (default: auto)
+            cost_model: CostModel that records the runtime of every batch
+        """
         self.spread = spread
         self.initial_capital = initial_capital
         self.tracker = tracker or ExperimentTracker()
+        self.workers = max(1, int(workers or 1))
+        self.chunksize = chunksize
+        self.cost_model = cost_model
         self.results = []
 
     def run_sweep(self, strategy_class, param_grid, symbol, timeframe,
                   start, end, experiment_id=None, strategy_source="existing",
-                  skip_tested=True, verbose=True):
+                  skip_tested=True, verbose=True, data=None, abort_rules=None):
         """Run backtests for all parameter combinations.
 
         Fetches data once, runs Backtester for each param combo.
@@ -62,6 +199,11 @@ class SweepEngine:
             strategy_source: "existing", "composable", "llm_generated"
             skip_tested: skip param combos already in experiments table
             verbose: print progress
+            data: preloaded bars for symbol/timeframe (skips loading)
+            abort_rules: disqualification rules to abort doomed combos early
+                (e.g. DISQUALIFICATION_RULES; only the exact drawdown bound
+                is checked). Aborted combos are saved as rejected with the
+                abort reason, so they are not retried.
 
         Returns:
             list of result dicts, sorted by score descending
@@ -79,7 +221,8 @@ class SweepEngine:
             print(f"{'='*60}")
             print("Loading data...")
 
-        data = load_backtest_data(symbol, timeframe, start, end)
+        if data is None:
+            data = load_backtest_data(symbol, timeframe, start, end)
         if data.empty:
             print(f"ERROR: No data for {symbol} {timeframe}")
             return []
@@ -94,81 +237,43 @@ class SweepEngine:
 
         # 3. Run each combination
         sweep_results = []
-        skipped = 0
         errors = 0
         t0 = time.time()
-
-        for i, params in enumerate(combos):
-            # Always include symbol in params (strategies expect it)
-            params["symbol"] = symbol
-
-            # Skip if already tested
-            if skip_tested and self.tracker.has_been_tested(
-                strategy_name, symbol, timeframe, params
+        todo, skipped, duplicates = self.pending_combos(combos, strategy_class, symbol,
+                                                        timeframe, skip_tested)
+        if verbose and duplicates:
+            print(f"Inert-param duplicates: {len(duplicates)} (filled from their canonical combo)")
+        by_index = {}
+
+        # Results are saved in transactions of up to 200 rows
+        with self.tracker.batch():
+            if verbose and self.workers > 1 and len(todo) > 1:
+                print(f"Running {len(todo)} combos on {self.workers} workers")
+            for i, params, result, error in self.evaluate(
+                data, strategy_class, timeframe, todo, abort_rules
             ):
-                skipped += 1
-                continue
-
-            try:
-                bt = Backtester(
-                    data=data,
-                    strategy_class=strategy_class,
-                    parameters=params,
-                    initial_capital=self.initial_capital,
-                    spread=self.spread,
-                    execution_delay=EXECUTION_DELAY,
-                    interval=timeframe,
-                )
-                # Suppress strategy per-bar debug prints
-                with suppress_stdout():
-                    result = bt.run()
-
-                # Score
-                equity_curve = result.get("equity_curve", [])
-                sharpe = calc_sharpe(equity_curve)
-                score = score_result(result, equity_curve)
-
-                result["sharpe"] = sharpe
-                result["score"] = score
-                result["params"] = params
-                result["symbol"] = symbol
-                result["timeframe"] = timeframe
-                result["strategy"] = strategy_name
-
-                sweep_results.append(result)
-
-                # Save to experiments table
-                self.tracker.save(
-                    experiment_id=experiment_id,
-                    strategy=strategy_name,
-                    symbol=symbol,
-                    timeframe=timeframe,
-                    params=params,
-                    results={
-                        "return_pct": result["return_pct"],
-                        "max_drawdown": result["max_drawdown"],
-                        "total_trades": result["total_trades"],
-                        "win_rate": result["win_rate"],
-                        "profit_factor": result["profit_factor"],
-                        "sharpe": sharpe,
-                        "equity_curve": equity_curve,
-                    },
-                    score=score,
-                    strategy_source=strategy_source,
-                )
-
-            except Exception as e:
-                errors += 1
-                if verbose:
-                    print(f"  ERROR combo {i+1}: {e}")
-
-            # Progress update
-            if verbose and (i + 1) % 50 == 0:
-                elapsed = time.time() - t0
-                rate = (i + 1 - skipped) / elapsed if elapsed > 0 else 0
-                print(f"  Progress: {i+1}/{len(combos)} "
-                      f"({skipped} skipped, {errors} errors, "
-                      f"{rate:.1f} runs/sec)")
+                if error is not None:
+                    errors += 1
+                    if verbose:
+                        print(f"  ERROR combo {i+1}: {error}")
+                else:
+                    self.save_result(result, params, strategy_name, symbol, timeframe,
+                                     experiment_id, strategy_source)
+                    sweep_results.append(result)
+                    by_index[i] = result
+
+                done = skipped + len(sweep_results) + errors
+                if verbose and done % 50 == 0:
+                    elapsed = time.time() - t0
+                    rate = (done - skipped) / elapsed if elapsed > 0 else 0
+                    print(f"  Progress: {done}/{len(combos)} "
+                          f"({skipped} skipped, {errors} errors, "
+                          f"{rate:.1f} runs/sec)")
+
+        # Duplicates share their canonical combo's backtest (saved once)
+        for i, params, canonical_index in duplicates:
+            if canonical_index in by_index:
+                sweep_results.append({**by_index[canonical_index], "params": params})
 
         # 4. Sort by score
         sweep_results.sort(key=lambda r: r["score"], reverse=True)
@@ -176,8 +281,9 @@ class SweepEngine:
 
         elapsed = time.time() - t0
         if verbose:
+            aborted = sum(1 for r in sweep_results if r.get("aborted"))
             print(f"\nComplete: {len(sweep_results)} results "
-                  f"({skipped} skipped, {errors} errors) "
+                  f"({skipped} skipped, {errors} errors, {aborted} aborted early) "
                   f"in {elapsed:.1f}s")
             if sweep_results:
                 best = sweep_results[0]
@@ -231,6 +337,156 @@ class SweepEngine:
         all_results.sort(key=lambda r: r["score"], reverse=True)
         return all_results
 
+    # ------------------------------------------------------------------
+    # Building blocks (shared with the successive-halving search)
+    # ------------------------------------------------------------------
+
+    def pending_combos(self, combos, strategy_class, symbol, timeframe, skip_tested=True):
+        """Canonicalise combos, fold duplicates and drop those already tested.
+
+        Each combo gets symbol added and its inert params removed (see
+        canonical_params), so combos differing only in an inert param run once.
+
+        Returns:
+            (todo, skipped, duplicates) — todo is a list of (index, canonical
+            params); duplicates is a list of (index, params, canonical index)
+            for combos that will reuse the result of an earlier one
+        """
+        strategy_name = strategy_class.__name__
+        # One indexed query for everything already tested, then O(1) per combo
+        tested = (self.tracker.tested_hashes(strategy_name, symbol, timeframe)
+                  if skip_tested else set())
+
+        todo = []
+        duplicates = []
+        first_index = {}  # canonical hash -> index of the combo that runs it
+        skipped = 0
+        for i, params in enumerate(combos):
+            # Always include symbol in params (strategies expect it)
+            params["symbol"] = symbol
+            canonical = canonical_params(strategy_class, params)
+            key = ExperimentTracker.params_hash(canonical)
+
+            # Skip if already tested (rows saved before canonicalisation may
+            # still carry the inert params)
+            if tested and (key in tested or ExperimentTracker.params_hash(params) in tested):
+                skipped += 1
+                continue
+            if key in first_index:
+                duplicates.append((i, params, first_index[key]))
+                continue
+            first_index[key] = i
+            todo.append((i, canonical))
+        return todo, skipped, duplicates
+
+    def evaluate(self, data, strategy_class, timeframe, todo, abort_rules=None):
+        """Backtest (index, params) pairs, on the pool when workers > 1.
+
+        Pairs are run grouped by indicator partition (see partition_order) so
+        each enriched frame is computed once per group (once per chunk on
+        the pool); match results to combos by index, not position.
+
+        Yields:
+            (index, params, result, error) in partition order — result is
+            None when error is set
+        """
+        todo = partition_order(strategy_class, todo)
+        t0 = time.time()
+        parallel = self.workers > 1 and len(todo) > 1
+        if parallel:
+            yield from self._run_parallel(data, strategy_class, timeframe, todo, abort_rules)
+        else:
+            indicator_cache = {}
+            for i, params in todo:
+                try:
+                    # Suppress strategy per-bar debug prints
+                    with suppress_stdout():
+                        result = run_combo(data, strategy_class, params, timeframe,
+                                           self.spread, self.initial_capital, abort_rules,
+                                           indicator_cache)
+                except Exception as e:
+                    yield i, params, None, str(e)
+                    continue
+                yield i, params, result, None
+
+        if self.cost_model is not None and todo:
+            self.cost_model.record(
+                "sweep", strategy_class.__name__, units=len(data) * len(todo),
+                seconds=time.time() - t0, symbol=todo[0][1].get("symbol"),
+                timeframe=timeframe, bars=len(data),
+                workers=min(self.workers, len(todo)) if parallel else 1,
+                days=((data.index[-1] - data.index[0]).total_seconds() / 86400
+                      if len(data) > 1 else None),
+            )
+
+    def save_result(self, result, params, strategy_name, symbol, timeframe,
+                    experiment_id, strategy_source="existing"):
+        """Label a result with its combo and save it to the experiments table.
+
+        A run stopped by an inexact abort rule (see disqualify.is_exact_abort)
+        isn't saved: its metrics cover part of the period and the combo
+        should be retried rather than skipped as tested.
+        """
+        result["params"] = params
+        result["symbol"] = symbol
+        result["timeframe"] = timeframe
+        result["strategy"] = strategy_name
+        if result.get("aborted") and not is_exact_abort(result.get("abort_reason")):
+            return
+
+        self.tracker.save(
+            experiment_id=experiment_id,
+            strategy=strategy_name,
+            symbol=symbol,
+            timeframe=timeframe,
+            params=params,
+            results={
+                "return_pct": result["return_pct"],
+                "max_drawdown": result["max_drawdown"],
+                "total_trades": result["total_trades"],
+                "win_rate": result["win_rate"],
+                "profit_factor": result["profit_factor"],
+                "sharpe": result["sharpe"],
+                "equity_curve": result.get("equity_curve", []),
+            },
+            score=result["score"],
+            strategy_source=strategy_source,
+            validation_status="rejected" if result.get("aborted") else "pending",
+            validation_details=({"aborted": result["abort_reason"],
+                                 "bars_processed": result["bars_processed"]}
+                                if result.get("aborted") else None),
+        )
+
+    def _run_parallel(self, data, strategy_class, timeframe, todo, abort_rules=None):
+        """Run (index, params) pairs on a process pool.
+
+        Chunks stream back as they finish, but are yielded in combo order
+        (a chunk is held until every earlier one has arrived), so saved
+        experiments and results are ordered exactly as in a sequential run.
+
+        Yields:
+            (index, params, result, error) — result is None when error is set
+        """
+        chunksize = self.chunksize or max(1, min(16, len(todo) // (self.workers * 4)))
+        chunks = [todo[k:k + chunksize] for k in range(0, len(todo), chunksize)]
+        params_by_index = dict(todo)
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.workers, len(chunks)),
+            initializer=_init_worker,
+            initargs=(data, strategy_class, timeframe, self.spread, self.initial_capital,
+                      abort_rules),
+        ) as pool:
+            futures = {pool.submit(_run_chunk, chunk): n for n, chunk in enumerate(chunks)}
+            ready = {}
+            next_chunk = 0
+            for future in as_completed(futures):
+                ready[futures[future]] = future.result()
+                while next_chunk in ready:
+                    for i, result, error in ready.pop(next_chunk):
+                        yield i, params_by_index[i], result, error
+                    next_chunk += 1
+
     @staticmethod
     def _expand_grid(param_grid):
         """Cartesian product of all parameter values."""
@@ -0,0 +1,335 @@
+"""Tree-structured Parzen Estimator (TPE) search — adaptive alternative to grids.
+
+Grid sweeps spend the same effort everywhere, and continuous parameters
+like sl_atr or trail_atr only get the 3-4 values someone wrote into the
+grid. TPE instead fits two densities over the completed trials:
+
+    l(x): the best GAMMA fraction of trials
+    g(x): the rest
+
+and proposes the candidate (out of N_CANDIDATES drawn from l) with the
+highest l(x) / g(x). Each parameter is modelled on its own (as in
+hyperopt), which keeps the model simple and handles conditional
+parameters naturally: a parameter is only modelled on trials where it was
+active.
+
+Search spaces are dicts of name -> Float / Int / Categorical, in the same
+shape as a param grid. A parameter with `when={"skip_adx_filter": [False]}`
+is only proposed when its parents take one of those values, and is left
+out of the params (so strategy defaults apply) otherwise.
+
+Proposals run in batches of engine.workers through SweepEngine.evaluate.
+Within a batch, pending proposals are counted as bad trials ("constant
+liar") so the batch spreads out instead of proposing one point N times.
+Every trial is saved through the ExperimentTracker, and previous results
+for the same strategy/symbol/timeframe warm-start the model.
+"""
+
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from backend.engine.data_utils import load_backtest_data
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import canonical_params
+
+
+# Fraction of trials that make up the "good" density
+GAMMA = 0.25
+
+# Candidates drawn from l(x) per proposal
+N_CANDIDATES = 24
+
+# Random trials before the model takes over
+N_STARTUP = 10
+
+# Prior weight (one pseudo-trial spread over the whole range)
+PRIOR_WEIGHT = 1.0
+
+# Proposals rejected as duplicates before falling back to a random draw
+MAX_DUPLICATE_RETRIES = 20
+
+
+# ---------------------------------------------------------------------------
+# Search space
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Float:
+    """Continuous parameter in [low, high], optionally log-scaled / rounded to step."""
+    low: float
+    high: float
+    log: bool = False
+    step: float = None
+    when: dict = field(default_factory=dict)
+
+    def to_unit(self, value):
+        lo, hi, v = self._bounds(value)
+        return 0.5 if hi == lo else (v - lo) / (hi - lo)
+
+    def from_unit(self, u):
+        lo, hi, _ = self._bounds(self.low)
+        v = lo + float(np.clip(u, 0.0, 1.0)) * (hi - lo)
+        v = math.exp(v) if self.log else v
+        if self.step:
+            v = self.low + round((v - self.low) / self.step) * self.step
+            v = round(min(max(v, self.low), self.high), 10)
+        return v
+
+    def _bounds(self, value):
+        if self.log:
+            return math.log(self.low), math.log(self.high), math.log(value)
+        return self.low, self.high, value
+
+
+@dataclass
+class Int(Float):
+    """Integer parameter in [low, high] (step defaults to 1)."""
+    step: int = 1
+
+    def from_unit(self, u):
+        return int(round(super().from_unit(u)))
+
+
+@dataclass
+class Categorical:
+    """One of a fixed list of values (bools, strings, ...)."""
+    choices: list
+    when: dict = field(default_factory=dict)
+
+
+def is_active(spec, params):
+    """True if every parent named in spec.when holds one of the allowed values."""
+    return all(params.get(parent) in allowed for parent, allowed in spec.when.items())
+
+
+def sample_random(space, rng):
+    """Uniform draw from the space (inactive conditionals omitted)."""
+    params = {}
+    for name, spec in space.items():
+        if not is_active(spec, params):
+            continue
+        if isinstance(spec, Categorical):
+            params[name] = spec.choices[rng.integers(len(spec.choices))]
+        else:
+            params[name] = spec.from_unit(rng.random())
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Parzen estimators
+# ---------------------------------------------------------------------------
+
+def _numeric_density(points):
+    """Gaussian mixture over unit-interval points plus a flat prior.
+
+    Bandwidth per kernel is the distance to its furthest neighbour in sort
+    order (hyperopt's heuristic), clipped so one trial can't dominate.
+
+    Returns:
+        (mus, sigmas, weights)
+    """
+    mus = np.sort(np.asarray(points, dtype=float))
+    n = len(mus)
+    if n == 0:
+        return np.array([0.5]), np.array([1.0]), np.array([1.0])
+    padded = np.concatenate([[0.0], mus, [1.0]])
+    sigmas = np.maximum(padded[1:-1] - padded[:-2], padded[2:] - padded[1:-1])
+    sigmas = np.clip(sigmas, 1.0 / min(100, n + 1), 1.0)
+    mus = np.append(mus, 0.5)
+    sigmas = np.append(sigmas, 1.0)
+    weights = np.append(np.ones(n), PRIOR_WEIGHT)
+    return mus, sigmas, weights / weights.sum()
+
+
+def _numeric_logpdf(x, density):
+    mus, sigmas, weights = density
+    z = (np.asarray(x)[:, None] - mus) / sigmas
+    pdf = weights * np.exp(-0.5 * z ** 2) / (sigmas * math.sqrt(2 * math.pi))
+    return np.log(pdf.sum(axis=1) + 1e-300)
+
+
+def _numeric_sample(density, n, rng):
+    mus, sigmas, weights = density
+    k = rng.choice(len(mus), size=n, p=weights)
+    return np.clip(rng.normal(mus[k], sigmas[k]), 0.0, 1.0)
+
+
+def _categorical_probs(values, choices):
+    counts = np.full(len(choices), PRIOR_WEIGHT / len(choices))
+    for v in values:
+        if v in choices:
+            counts[choices.index(v)] += 1
+    return counts / counts.sum()
+
+
+def _split(observations, name, gamma):
+    """Values of `name` on good / bad trials where it was active (best first)."""
+    active = [(score, params[name]) for params, score in observations if name in params]
+    active.sort(key=lambda t: t[0], reverse=True)
+    n_good = max(1, int(math.ceil(gamma * len(active))))
+    return [v for _, v in active[:n_good]], [v for _, v in active[n_good:]]
+
+
+def propose(space, observations, rng, gamma=GAMMA, n_candidates=N_CANDIDATES):
+    """Next params from (params, score) observations (higher score is better).
+
+    Falls back to a random draw until N_STARTUP observations exist.
+    """
+    if len(observations) < N_STARTUP:
+        return sample_random(space, rng)
+
+    params = {}
+    for name, spec in space.items():
+        if not is_active(spec, params):
+            continue
+        good, bad = _split(observations, name, gamma)
+
+        if isinstance(spec, Categorical):
+            l_probs = _categorical_probs(good, spec.choices)
+            g_probs = _categorical_probs(bad, spec.choices)
+            candidates = rng.choice(len(spec.choices), size=n_candidates, p=l_probs)
+            ratio = np.log(l_probs[candidates]) - np.log(g_probs[candidates])
+            params[name] = spec.choices[int(candidates[np.argmax(ratio)])]
+        else:
+            l_density = _numeric_density([spec.to_unit(v) for v in good])
+            g_density = _numeric_density([spec.to_unit(v) for v in bad])
+            candidates = _numeric_sample(l_density, n_candidates, rng)
+            ratio = _numeric_logpdf(candidates, l_density) - _numeric_logpdf(candidates, g_density)
+            params[name] = spec.from_unit(candidates[np.argmax(ratio)])
+    return params
+
+
+# ---------------------------------------------------------------------------
+# Search driver
+# ---------------------------------------------------------------------------
+
+def run_tpe_search(engine, strategy_class, space, symbol, timeframe, start, end,
+                   n_trials=100, batch_size=None, fixed_params=None,
+                   experiment_id=None, strategy_source="existing", seed=0,
+                   warm_start=True, verbose=True, data=None, abort_rules=None):
+    """Adaptive counterpart of SweepEngine.run_sweep.
+
+    Args:
+        engine: SweepEngine (backtests, worker pool, tracker)
+        strategy_class: Strategy class reference
+        space: dict of param name -> Float / Int / Categorical
+        symbol, timeframe, start, end: as in run_sweep
+        n_trials: new backtests to run
+        batch_size: proposals evaluated together (default: engine.workers)
+        fixed_params: params added to every proposal unchanged
+        experiment_id: group label (default "tpe_<strategy>_<symbol>_<tf>")
+        strategy_source: "existing", "composable", "llm_generated"
+        seed: RNG seed (same seed + same history = same proposals)
+        warm_start: fit the model to results already in the experiments table
+        verbose: print progress
+        data: preloaded bars (skips loading)
+        abort_rules: disqualification rules to abort doomed trials early
+
+    Returns:
+        list of result dicts from this search, sorted by score descending
+        (fewer than n_trials if the space runs out of untested combos)
+    """
+    strategy_name = strategy_class.__name__
+    if experiment_id is None:
+        experiment_id = f"tpe_{strategy_name}_{symbol}_{timeframe}"
+    batch_size = max(1, int(batch_size or engine.workers))
+    fixed_params = dict(fixed_params or {})
+    rng = np.random.default_rng(seed)
+
+    if verbose:
+        print(f"\n{'='*60}")
+        print(f"TPE search: {strategy_name} on {symbol} {timeframe}")
+        print(f"Period: {start} to {end}")
+        print(f"{'='*60}")
+        print("Loading data...")
+
+    if data is None:
+        data = load_backtest_data(symbol, timeframe, start, end)
+    if data.empty:
+        print(f"ERROR: No data for {symbol} {timeframe}")
+        return []
+
+    # Observations are (searched params, score); seen holds full-params hashes
+    observations = []
+    seen = set()
+    if warm_start:
+        for exp in engine.tracker.get_experiments_for(strategy_name, symbol, timeframe):
+            seen.add(ExperimentTracker.params_hash(exp["parameters"]))
+            searched = {k: v for k, v in exp["parameters"].items() if k in space}
+            if searched and exp["score"] is not None:
+                observations.append((searched, exp["score"]))
+    if verbose:
+        print(f"Data loaded: {len(data)} bars")
+        print(f"Trials: {n_trials} in batches of {batch_size} "
+              f"({len(observations)} previous results as warm start)")
+
+    search_results = []
+    errors = 0
+    t0 = time.time()
+    with engine.tracker.batch():
+        while len(search_results) + errors < n_trials:
+            n = min(batch_size, n_trials - len(search_results) - errors)
+            worst = min((s for _, s in observations), default=-999.0)
+
+            todo = []
+            pending = []
+            searched_by_index = {}
+            for _ in range(n):
+                for attempt in range(MAX_DUPLICATE_RETRIES + 1):
+                    searched = (propose(space, observations + pending, rng)
+                                if attempt < MAX_DUPLICATE_RETRIES
+                                else sample_random(space, rng))
+                    params = canonical_params(strategy_class,
+                                              {**fixed_params, **searched, "symbol": symbol})
+                    key = ExperimentTracker.params_hash(params)
+                    if key not in seen:
+                        break
+                else:
+                    continue  # nothing untested found for this slot
+                seen.add(key)
+                pending.append((searched, worst))
+                i = len(search_results) + errors + len(todo)
+                searched_by_index[i] = searched
+                todo.append((i, params))
+            if not todo:
+                if verbose:
+                    print("  No untested combos left to propose; stopping early")
+                break
+
+            for i, params, result, error in engine.evaluate(data, strategy_class, timeframe,
+                                                            todo, abort_rules):
+                searched = searched_by_index[i]
+                if error is not None:
+                    errors += 1
+                    observations.append((searched, -999.0))
+                    if verbose:
+                        print(f"  ERROR trial {i+1}: {error}")
+                    continue
+                engine.save_result(result, params, strategy_name, symbol, timeframe,
+                                   experiment_id, strategy_source)
+                search_results.append(result)
+                observations.append((searched, result["score"]))
+
+            if verbose:
+                best = max((r["score"] for r in search_results), default=-999.0)
+                print(f"  Trials: {len(search_results) + errors}/{n_trials}, "
+                      f"best score {best:.4f} ({time.time() - t0:.1f}s)")
+
+    search_results.sort(key=lambda r: r["score"], reverse=True)
+    engine.results.extend(search_results)
+
+    if verbose:
+        print(f"\nComplete: {len(search_results)} results ({errors} errors) "
+              f"in {time.time() - t0:.1f}s")
+        if search_results:
+            best = search_results[0]
+            print(f"Best: score={best['score']:.4f}, "
+                  f"return={best['return_pct']:.2f}%, "
+                  f"sharpe={best['sharpe']:.4f}, "
+                  f"trades={best['total_trades']}, "
+                  f"params={best['params']}")
+
+    return search_results
@@ -18,67 +18,17 @@ import json
 from backend.optimizer.composable_strategy import ComposableStrategy
 from backend.optimizer.pipeline import validate_candidate
 from backend.optimizer.experiment_tracker import ExperimentTracker
-from backend.optimizer import building_blocks as bb
-
-
-# Map stored block names back to callables
-ENTRY_MAP = {
-    "stochrsi_cross(os=20,ob=80)": bb.stochrsi_cross(oversold=20, overbought=80),
-    "stochrsi_cross(os=15,ob=85)": bb.stochrsi_cross(oversold=15, overbought=85),
-    "macd_cross": bb.macd_cross(),
-    "bollinger_bounce": bb.bollinger_bounce(),
-    "donchian_breakout": bb.donchian_breakout(),
-    "rsi_extreme(os=30,ob=70)": bb.rsi_extreme(oversold=30, overbought=70),
-    "sma_cross(50/200)": bb.sma_cross(),
-}
-
-EXIT_MAP = {
-    "opposite_zone(os=20,ob=80)": bb.opposite_zone(oversold=20, overbought=80),
-    "atr_stop(2.0x)": bb.atr_stop(multiplier=2.0),
-    "atr_stop(3.0x)": bb.atr_stop(multiplier=3.0),
-    "bollinger_exit": bb.bollinger_exit(),
-    "donchian_exit": bb.donchian_exit(),
-    "trailing_atr(2.0x)": bb.trailing_atr(multiplier=2.0),
-    "trailing_atr(3.0x)": bb.trailing_atr(multiplier=3.0),
-}
-
-FILTER_MAP = {
-    "no_filter": bb.no_filter(),
-    "adx_ranging(<25)": bb.adx_ranging(threshold=25),
-    "adx_trending(>25)": bb.adx_trending(threshold=25),
-    "chop_trending(<38.2)": bb.chop_trending(),
-    "chop_ranging(>61.8)": bb.chop_ranging(),
-    "sma_uptrend": bb.sma_uptrend(),
-}
-
-SIZER_MAP = {
-    "fixed_pct(25%)": bb.fixed_pct(0.25),
-    "risk_atr(2%,2.0x)": bb.risk_atr(risk_pct=0.02, atr_mult=2.0),
-    "risk_atr(2%,3.0x)": bb.risk_atr(risk_pct=0.02, atr_mult=3.0),
-}
+from backend.optimizer.combination_generator import params_from_names
+
+
+# Rows saved before sizers were searched carry no sizer name
+DEFAULT_SIZER = "fixed_pct(25%)"
 
 
 def rebuild_params(stored_params, symbol):
-    """Reconstruct callable params from stored string names."""
-    entry_fn = ENTRY_MAP.get(stored_params["entry"])
-    exit_fn = EXIT_MAP.get(stored_params["exit"])
-    filter_fn = FILTER_MAP.get(stored_params["filter"])
-    sizer_fn = SIZER_MAP.get(stored_params.get("sizer", "fixed_pct(25%)"))
-
-    if not entry_fn or not exit_fn:
-        return None
-
-    return {
-        "symbol": symbol,
-        "entry_fn": entry_fn,
-        "exit_fn": exit_fn,
-        "filter_fn": filter_fn,
-        "sizer_fn": sizer_fn,
-        "_entry_name": stored_params["entry"],
-        "_exit_name": stored_params["exit"],
-        "_filter_name": stored_params["filter"],
-        "_sizer_name": stored_params.get("sizer", "fixed_pct(25%)"),
-    }
+    """Reconstruct callable params from stored block names (None if a block is unknown)."""
+    built = params_from_names({"sizer": DEFAULT_SIZER, **stored_params}, symbol)
+    return built[0] if built else None
 
 
 def get_top_composable(n=10, min_trades=10):
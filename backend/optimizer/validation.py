@@ -4,13 +4,21 @@ Three checks:
 1. Train/test holdout — does the strategy work on unseen data?
 2. Walk-forward — does it work across multiple rolling windows?
 3. Multi-asset consistency — does it work on related assets?
+
+Holdout and walk-forward periods are sliced out of one load of the full
+span (slice_period reproduces the loader's [start, end) range), and
+walk-forward windows can run in parallel processes.
 """
 
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
 
+import pandas as pd
+
 from backend.engine.backtester import Backtester
+from backend.engine.bar_store import to_utc_ts
 from backend.engine.data_utils import load_backtest_data
 from backend.optimizer.scoring import calc_sharpe
 
@@ -41,21 +49,55 @@ def _run_backtest(strategy_class, params, data, timeframe):
         return bt.run()
 
 
+def slice_period(data, start, end):
+    """Bars in [start, end) — the same range load_backtest_data(start, end) returns.
+
+    Returns a copy, since strategies add indicator columns to their data.
+    """
+    if data.empty:
+        return data
+    start, end = to_utc_ts(start), to_utc_ts(end)
+    index = pd.DatetimeIndex(data.index)
+    if index.tz is None:
+        start, end = start.tz_localize(None), end.tz_localize(None)
+    else:
+        index = index.tz_convert("UTC")
+    return data[(index >= start) & (index < end)].copy()
+
+
+def _run_window(job):
+    """Train and test backtests for one walk-forward window (pool worker)."""
+    strategy_class, params, train_data, test_data, timeframe = job
+    train_result = _run_backtest(strategy_class, params, train_data, timeframe)
+    test_result = _run_backtest(strategy_class, params, test_data, timeframe)
+    return {
+        "train_return": train_result["return_pct"],
+        "test_return": test_result["return_pct"],
+        "train_sharpe": calc_sharpe(train_result.get("equity_curve", [])),
+        "test_sharpe": calc_sharpe(test_result.get("equity_curve", [])),
+        "test_trades": test_result["total_trades"],
+    }
+
+
 def validate_holdout(strategy_class, params, symbol, timeframe,
                      train_start="2020-01-01", train_end="2023-12-31",
-                     test_start="2024-01-01", test_end="2025-12-31"):
+                     test_start="2024-01-01", test_end="2025-12-31", data=None):
     """Train/test holdout validation.
 
     Runs the strategy on training period, then independently on test period.
     A strategy that returns +5% in training but -2% in testing is overfit.
 
+    Pass `data` (bars covering both periods) to slice instead of loading.
+
     Returns:
         dict with train_result, test_result, degradation
     """
     params = {**params, "symbol": symbol}
 
-    train_data = load_backtest_data(symbol, timeframe, train_start, train_end)
-    test_data = load_backtest_data(symbol, timeframe, test_start, test_end)
+    if data is None:
+        data = load_backtest_data(symbol, timeframe, train_start, test_end)
+    train_data = slice_period(data, train_start, train_end)
+    test_data = slice_period(data, test_start, test_end)
 
     if train_data.empty or test_data.empty:
         return {"error": f"No data for {symbol} {timeframe}"}
@@ -80,7 +122,8 @@ def validate_holdout(strategy_class, params, symbol, timeframe,
 
 
 def walk_forward(strategy_class, params, symbol, timeframe,
-                 train_years=2, test_years=1, start_year=2020, end_year=2025):
+                 train_years=2, test_years=1, start_year=2020, end_year=2025,
+                 data=None, workers=1):
     """Rolling walk-forward validation.
 
     Tests the strategy on data it was never trained on, across
@@ -88,43 +131,47 @@ def walk_forward(strategy_class, params, symbol, timeframe,
 
     A robust strategy should show positive test returns in most windows.
 
+    The full span is loaded once (or taken from `data`) and each window is
+    sliced from it; with workers > 1 the windows run in parallel processes.
+    Window metrics are identical to loading every period separately.
+
     Returns:
         dict with windows list and pass_rate
     """
     params = {**params, "symbol": symbol}
-    windows = []
 
+    if data is None:
+        data = load_backtest_data(symbol, timeframe, f"{start_year}-01-01", f"{end_year}-12-31")
+
+    periods = []
+    jobs = []
     year = start_year
     while year + train_years + test_years - 1 <= end_year:
         train_start = f"{year}-01-01"
         train_end = f"{year + train_years - 1}-12-31"
         test_start = f"{year + train_years}-01-01"
         test_end = f"{year + train_years + test_years - 1}-12-31"
+        year += 1
 
-        train_data = load_backtest_data(symbol, timeframe, train_start, train_end)
-        test_data = load_backtest_data(symbol, timeframe, test_start, test_end)
-
+        train_data = slice_period(data, train_start, train_end)
+        test_data = slice_period(data, test_start, test_end)
         if train_data.empty or test_data.empty:
-            year += 1
             continue
 
-        train_result = _run_backtest(strategy_class, params, train_data, timeframe)
-        test_result = _run_backtest(strategy_class, params, test_data, timeframe)
+        periods.append((f"{train_start} to {train_end}", f"{test_start} to {test_end}"))
+        jobs.append((strategy_class, params, train_data, test_data, timeframe))
 
-        train_sharpe = calc_sharpe(train_result.get("equity_curve", []))
-        test_sharpe = calc_sharpe(test_result.get("equity_curve", []))
+    workers = min(workers, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            metrics = list(pool.map(_run_window, jobs))
+    else:
+        metrics = [_run_window(job) for job in jobs]
 
-        windows.append({
-            "train_period": f"{train_start} to {train_end}",
-            "test_period": f"{test_start} to {test_end}",
-            "train_return": train_result["return_pct"],
-            "test_return": test_result["return_pct"],
-            "train_sharpe": train_sharpe,
-            "test_sharpe": test_sharpe,
-            "test_trades": test_result["total_trades"],
-        })
-
-        year += 1
+    windows = [
+        {"train_period": train_period, "test_period": test_period, **m}
+        for (train_period, test_period), m in zip(periods, metrics)
+    ]
 
     if not windows:
         return {"windows": [], "pass_rate": 0.0, "avg_test_return": 0.0}
@@ -161,28 +208,41 @@ def get_related_symbols(symbol):
 
 
 def multi_asset_check(strategy_class, params, symbol, timeframe,
-                      start="2020-01-01", end="2025-12-31"):
+                      start="2020-01-01", end="2025-12-31", bars=None, known=None):
     """Test if the strategy works across related assets.
 
     A real edge should generalise to similar assets.
     If StochRSI works on GLD but fails on SLV and IAU,
     it's likely overfit to GLD-specific noise.
 
+    Args:
+        bars: callable symbol -> start..end bars (default: load each asset)
+        known: dict of symbol -> backtest result already run on start..end
+            (e.g. the candidate's own full-period run), reused as is
+
     Returns:
         dict with per-asset results and positive_rate
     """
     related = get_related_symbols(symbol)
+    known = known or {}
     results = {}
 
     for sym in related:
         sym_params = {**params, "symbol": sym}
-        data = load_backtest_data(sym, timeframe, start, end)
+        if sym in known:
+            result = known[sym]
+        else:
+            if bars is not None:
+                data = bars(sym).copy()
+            else:
+                data = load_backtest_data(sym, timeframe, start, end)
 
-        if data.empty:
-            results[sym] = {"error": "no data"}
-            continue
+            if data.empty:
+                results[sym] = {"error": "no data"}
+                continue
+
+            result = _run_backtest(strategy_class, sym_params, data, timeframe)
 
-        result = _run_backtest(strategy_class, sym_params, data, timeframe)
         sharpe = calc_sharpe(result.get("equity_curve", []))
 
         results[sym] = {
@@ -0,0 +1,199 @@
+"""Parallel candidate validation.
+
+validate_top_candidates and run_overnight's Pass 3 used to run the full
+pipeline (disqualification -> Monte Carlo -> holdout -> walk-forward ->
+multi-asset) one candidate at a time. validate_candidates fans experiments
+rows out over a process pool instead:
+
+    - each (symbol, timeframe) is loaded once in the parent, with its
+      related assets, and shared with the workers through SharedDataPlane
+    - candidates of the same strategy on the same bars that agree on
+      INDICATOR_PARAMS are sent to one worker together, so their
+      full-period indicators are computed once (see sweep.run_combo)
+    - validate_candidate returns at the first failed step, so a rejected
+      candidate frees its worker right away
+    - statuses are written through tracker.batch() rather than one
+      commit per candidate
+
+Composable candidates are rebuilt from their stored block names inside
+the worker (the block callables don't pickle).
+"""
+
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import nullcontext
+
+import pandas as pd
+
+from backend.engine.data_utils import load_backtest_data
+from backend.engine.shared_data import SharedDataPlane, attach_frame
+from backend.optimizer.composable_strategy import ComposableStrategy
+from backend.optimizer.pipeline import (
+    FULL_END, FULL_START, STRATEGY_CLASS_MAP, save_validation, validate_candidate,
+)
+from backend.optimizer.sweep import indicator_key, silence_worker_stdout
+from backend.optimizer.validate_composable import rebuild_params
+from backend.optimizer.validation import get_related_symbols
+
+
+# Candidates sharing an indicator partition sent to a worker at once
+MAX_CHUNK = 4
+
+# Loaded frames kept per process (least recently used are dropped)
+MAX_CACHED_FRAMES = 16
+
+
+def resolve_candidate(experiment):
+    """(strategy_class, params) for an experiments row; (None, None) if it can't run."""
+    if experiment["strategy"] == "ComposableStrategy":
+        params = rebuild_params(experiment["parameters"], experiment["symbol"])
+        return (ComposableStrategy, params) if params else (None, None)
+    strategy_class = STRATEGY_CLASS_MAP.get(experiment["strategy"])
+    return (strategy_class, experiment["parameters"]) if strategy_class else (None, None)
+
+
+def _chunks(candidates, max_chunk=MAX_CHUNK):
+    """(index, experiment) chunks grouped by indicator partition, in first-seen order."""
+    groups = {}
+    for k, experiment in enumerate(candidates):
+        strategy_class = STRATEGY_CLASS_MAP.get(experiment["strategy"])
+        key = (experiment["strategy"], experiment["symbol"], experiment["timeframe"],
+               indicator_key(strategy_class, experiment["parameters"]) if strategy_class else None)
+        groups.setdefault(key, []).append((k, experiment))
+    return [group[j:j + max_chunk] for group in groups.values()
+            for j in range(0, len(group), max_chunk)]
+
+
+class _Validator:
+    """Validates candidates on cached (or shared) bars; one per process."""
+
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.handles = {}  # (symbol, timeframe) -> SharedFrameHandle (pool workers)
+        self.frames = OrderedDict()
+        self.group = None
+        self.indicator_cache = {}
+
+    def bars(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key in self.frames:
+            self.frames.move_to_end(key)
+            return self.frames[key]
+        if key in self.handles:
+            handle = self.handles[key]
+            frame = attach_frame(handle) if handle is not None else pd.DataFrame()
+        else:
+            frame = load_backtest_data(symbol, timeframe, FULL_START, FULL_END)
+        self.frames[key] = frame
+        if len(self.frames) > MAX_CACHED_FRAMES:
+            self.frames.popitem(last=False)
+        return frame
+
+    def run(self, k, experiment):
+        """Returns (index, validation, error, seconds)."""
+        t0 = time.time()
+        symbol, timeframe = experiment["symbol"], experiment["timeframe"]
+        group = (experiment["strategy"], symbol, timeframe)
+        if group != self.group:  # the indicator cache is only valid on the same bars
+            self.group, self.indicator_cache = group, {}
+        try:
+            strategy_class, params = resolve_candidate(experiment)
+            if strategy_class is None:
+                raise ValueError(f"cannot run strategy {experiment['strategy']}")
+            validation = validate_candidate(
+                strategy_class, params, symbol, timeframe, verbose=self.verbose,
+                bars=lambda s: self.bars(s, timeframe),
+                indicator_cache=self.indicator_cache,
+            )
+        except Exception as e:
+            return k, None, str(e), time.time() - t0
+        return k, validation, None, time.time() - t0
+
+
+# Per-worker validator (keeps frames and indicator caches across chunks)
+_WORKER = {}
+
+
+def _init_worker():
+    _WORKER["validator"] = _Validator()
+    silence_worker_stdout()
+
+
+def _run_chunk(chunk, handles):
+    """Worker: validate a list of (index, experiment). Returns run() tuples."""
+    validator = _WORKER["validator"]
+    validator.handles.update(handles)
+    return [validator.run(k, experiment) for k, experiment in chunk]
+
+
+def _publish(plane, chunk):
+    """Load (once) and share the bars a chunk needs. Returns their handles."""
+    handles = {}
+    for _, experiment in chunk:
+        timeframe = experiment["timeframe"]
+        for symbol in [experiment["symbol"], *get_related_symbols(experiment["symbol"])]:
+            key = (symbol, timeframe)
+            if key not in plane:
+                plane.publish(key, load_backtest_data(symbol, timeframe, FULL_START, FULL_END))
+            handles[key] = plane.handles[key]
+    return handles
+
+
+def _run_sequential(chunks, should_stop, verbose):
+    validator = _Validator(verbose)
+    for chunk in chunks:
+        for k, experiment in chunk:
+            if should_stop is not None and should_stop():
+                return
+            yield validator.run(k, experiment)
+
+
+def _run_parallel(chunks, workers, should_stop):
+    """One chunk in flight per worker; no new chunks once should_stop() is True."""
+    pending = iter(chunks)
+    with SharedDataPlane() as plane, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        running = set()
+        while True:
+            while len(running) < workers and not (should_stop is not None and should_stop()):
+                chunk = next(pending, None)
+                if chunk is None:
+                    break
+                running.add(pool.submit(_run_chunk, chunk, _publish(plane, chunk)))
+            if not running:
+                return
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield from future.result()
+
+
+def validate_candidates(candidates, workers=1, tracker=None, should_stop=None, verbose=False):
+    """Run validate_candidate on experiments rows, in parallel when workers > 1.
+
+    Args:
+        candidates: experiments rows (dicts with id, strategy, parameters,
+            symbol, timeframe); parameters already decoded from JSON
+        workers: worker processes (1 = run in this process)
+        tracker: ExperimentTracker to write each validation status to
+            (batched); None leaves the table alone
+        should_stop: callable; once it returns True no more candidates are
+            started (those already running finish)
+        verbose: print each candidate's steps (sequential runs only)
+
+    Yields:
+        (index, validation, error, seconds) as candidates finish —
+        validation is None when error is set; index is into candidates
+    """
+    chunks = _chunks(candidates)
+    workers = min(workers, len(chunks))
+    if workers > 1:
+        runs = _run_parallel(chunks, workers, should_stop)
+    else:
+        runs = _run_sequential(chunks, should_stop, verbose)
+
+    with tracker.batch() if tracker is not None else nullcontext():
+        for k, validation, error, seconds in runs:
+            if error is None and tracker is not None:
+                save_validation(tracker, candidates[k]["id"], validation)
+            yield k, validation, error, seconds
@@ -0,0 +1,536 @@
+"""SQLite work queue for running sweeps on several machines.
+
+A coordinator expands grids (or the composable space) into one job per
+(strategy, symbol, timeframe, params) and enqueues them in the
+sweep_jobs table of a shared research DB. Workers on any machine that
+can open that DB claim jobs, backtest them with run_combo and write the
+results to its experiments table, exactly as a local sweep would:
+
+    coordinator:  python -m backend.optimizer.work_queue enqueue --strategy DonchianBreakout
+                  python -m backend.optimizer.work_queue enqueue --composable --symbols GLD
+    workers:      python -m backend.optimizer.work_queue work --processes 8
+    progress:     python -m backend.optimizer.work_queue status
+
+Claims are leases: a worker takes up to CLAIM_BATCH jobs of one target
+(so the bars are loaded once) for LEASE_SECONDS, and a heartbeat thread
+extends the lease while it works. Jobs whose lease runs out (worker
+crashed, machine asleep) go back to the queue on the next claim, up to
+MAX_ATTEMPTS times. A job that raises is marked failed with its error.
+
+A claimed chunk's experiment rows and its 'done' marks are written in
+one all-or-nothing transaction; if it fails (e.g. the shared DB stays
+locked), the chunk's jobs go back to the queue and the worker raises. Jobs whose params are already in the experiments table
+(e.g. finished by a worker whose lease had expired) are marked done
+without running again.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from backend.engine.data_utils import load_backtest_data
+from backend.optimizer.combination_generator import CombinationSpace
+from backend.optimizer.composable_strategy import ComposableStrategy
+from backend.optimizer.experiment_store import STORE_DIR, ExperimentStore
+from backend.optimizer.experiment_tracker import DB_FILE, ExperimentTracker
+from backend.optimizer.pipeline import STRATEGY_CLASS_MAP
+from backend.optimizer.sweep import (
+    SweepEngine, canonical_params, partition_order, run_combo, suppress_stdout,
+)
+from backend.optimizer.validate_composable import rebuild_params
+
+
+# A claim is lost unless renewed within this long
+LEASE_SECONDS = 300
+
+# How often a working worker renews its lease
+HEARTBEAT_SECONDS = 60
+
+# Claims (including lease expiries) before a job is given up on
+MAX_ATTEMPTS = 3
+
+# Jobs claimed at once (all from one strategy/symbol/timeframe/period)
+CLAIM_BATCH = 8
+
+# Idle workers check for new jobs this often (with --wait)
+POLL_SECONDS = 10
+
+
+class WorkQueue:
+    """sweep_jobs table: enqueue, claim with a lease, heartbeat, finish."""
+
+    def __init__(self, db_file=DB_FILE, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS):
+        self.db_file = db_file
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._ensure_table()
+
+    def _get_conn(self):
+        conn = sqlite3.connect(self.db_file, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_table(self):
+        conn = self._get_conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS sweep_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                experiment_id TEXT,
+                strategy TEXT NOT NULL,
+                strategy_source TEXT NOT NULL DEFAULT 'existing',
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                start_date TEXT NOT NULL,
+                end_date TEXT NOT NULL,
+                parameters TEXT NOT NULL,
+                params_hash TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                created_at TEXT NOT NULL,
+                finished_at TEXT,
+                UNIQUE (strategy, symbol, timeframe, start_date, end_date, params_hash)
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_sweep_jobs_status ON sweep_jobs(status, id)')
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Coordinator side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, jobs):
+        """Add job dicts (see sweep_jobs / composable_jobs). Returns how many were new.
+
+        A job already in the queue (same strategy, target, period and
+        params) is left as it is, so enqueueing a grid twice is harmless.
+        """
+        now = datetime.now().isoformat()
+        rows = [(job.get("experiment_id"), job["strategy"],
+                 job.get("strategy_source", "existing"), job["symbol"], job["timeframe"],
+                 job["start"], job["end"], json.dumps(job["params"]),
+                 ExperimentTracker.params_hash(job["params"]), now)
+                for job in jobs]
+        conn = self._get_conn()
+        with conn:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO sweep_jobs (experiment_id, strategy, strategy_source,
+                    symbol, timeframe, start_date, end_date, parameters, params_hash, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            added = conn.total_changes - before
+        conn.close()
+        return added
+
+    def status(self):
+        """Job counts by status."""
+        conn = self._get_conn()
+        rows = conn.execute(
+            'SELECT status, COUNT(*) AS n FROM sweep_jobs GROUP BY status'
+        ).fetchall()
+        conn.close()
+        return {r["status"]: r["n"] for r in rows}
+
+    # ------------------------------------------------------------------
+    # Worker side
+    # ------------------------------------------------------------------
+
+    def claim(self, worker, limit=CLAIM_BATCH):
+        """Lease up to `limit` queued jobs of one target. Returns job dicts (maybe [])."""
+        now = time.time()
+        conn = self._get_conn()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Expired leases go back to the queue (or fail after max_attempts)
+            conn.execute('''
+                UPDATE sweep_jobs
+                SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'queued' END,
+                    error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END,
+                    worker = NULL
+                WHERE status = 'running' AND lease_expires < ?
+            ''', (self.max_attempts, self.max_attempts, now))
+
+            first = conn.execute('''
+                SELECT strategy, symbol, timeframe, start_date, end_date FROM sweep_jobs
+                WHERE status = 'queued' ORDER BY id LIMIT 1
+            ''').fetchone()
+            if first is None:
+                conn.commit()
+                return []
+
+            rows = conn.execute('''
+                SELECT * FROM sweep_jobs
+                WHERE status = 'queued' AND strategy = ? AND symbol = ? AND timeframe = ?
+                  AND start_date = ? AND end_date = ?
+                ORDER BY id LIMIT ?
+            ''', (*first, limit)).fetchall()
+            ids = [r["id"] for r in rows]
+            conn.execute(f'''
+                UPDATE sweep_jobs
+                SET status = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id IN ({",".join("?" * len(ids))})
+            ''', (worker, now + self.lease_seconds, *ids))
+            conn.commit()
+        finally:
+            conn.close()
+
+        jobs = [dict(r) for r in rows]
+        for job in jobs:
+            job["parameters"] = json.loads(job["parameters"])
+            job.update(status="running", worker=worker, lease_expires=now + self.lease_seconds,
+                       attempts=job["attempts"] + 1)
+        return jobs
+
+    def heartbeat(self, worker, job_ids):
+        """Extend this worker's leases. Returns how many it still holds."""
+        if not job_ids:
+            return 0
+        conn = self._get_conn()
+        with conn:
+            cur = conn.execute(f'''
+                UPDATE sweep_jobs SET lease_expires = ?
+                WHERE worker = ? AND status = 'running' AND id IN ({",".join("?" * len(job_ids))})
+            ''', (time.time() + self.lease_seconds, worker, *job_ids))
+        conn.close()
+        return cur.rowcount
+
+    def finish(self, worker, job_id, error=None, batch=None):
+        """Mark a leased job done (or failed with error).
+
+        Pass the tracker's WriteBatcher as `batch` to commit the mark in
+        the same transaction as the job's experiment row.
+        """
+        sql = '''
+            UPDATE sweep_jobs SET status = ?, error = ?, finished_at = ?, lease_expires = NULL
+            WHERE id = ? AND worker = ? AND status = 'running'
+        '''
+        params = ("failed" if error else "done", error, datetime.now().isoformat(),
+                  job_id, worker)
+        if batch is not None:
+            batch.add(sql, params)
+            return
+        conn = self._get_conn()
+        with conn:
+            conn.execute(sql, params)
+        conn.close()
+
+    def release(self, worker, job_ids):
+        """Give unfinished leased jobs back to the queue (e.g. on Ctrl-C)."""
+        if not job_ids:
+            return
+        conn = self._get_conn()
+        with conn:
+            conn.execute(f'''
+                UPDATE sweep_jobs SET status = 'queued', worker = NULL, lease_expires = NULL,
+                    attempts = attempts - 1
+                WHERE worker = ? AND status = 'running' AND id IN ({",".join("?" * len(job_ids))})
+            ''', (worker, *job_ids))
+        conn.close()
+
+
+class _Heartbeat:
+    """Background thread renewing the leases in self.job_ids."""
+
+    def __init__(self, queue, worker, interval=HEARTBEAT_SECONDS):
+        self.queue = queue
+        self.worker = worker
+        self.interval = interval
+        self.job_ids = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.queue.heartbeat(self.worker, list(self.job_ids))
+            except sqlite3.Error as e:
+                print(f"Heartbeat failed for {self.worker}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+
+def sweep_jobs(strategy_class, param_grid, symbols, timeframes, start, end,
+               experiment_id=None):
+    """One job per distinct canonical combo per (symbol, timeframe)."""
+    for symbol in symbols:
+        for timeframe in timeframes:
+            exp_id = experiment_id or f"queue_{strategy_class.__name__}_{symbol}_{timeframe}"
+            for params in SweepEngine._expand_grid(param_grid):
+                yield {
+                    "experiment_id": exp_id,
+                    "strategy": strategy_class.__name__,
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "start": start,
+                    "end": end,
+                    "params": canonical_params(strategy_class, {**params, "symbol": symbol}),
+                }
+
+
+def composable_jobs(symbols, timeframes, start, end, shard=0, n_shards=1, limit=None):
+    """One job per composable combination (stored by block name, as run_composable does)."""
+    for symbol in symbols:
+        for timeframe in timeframes:
+            space = CombinationSpace(symbol=symbol, timeframe=timeframe)
+            for _, params, _ in space.iter(shard, n_shards, limit):
+                yield {
+                    "experiment_id": f"queue_composable_{symbol}_{timeframe}",
+                    "strategy": "ComposableStrategy",
+                    "strategy_source": "composable",
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "start": start,
+                    "end": end,
+                    "params": {
+                        "entry": params["_entry_name"],
+                        "exit": params["_exit_name"],
+                        "filter": params["_filter_name"],
+                        "sizer": params["_sizer_name"],
+                    },
+                }
+
+
+def enqueue_untested(queue, jobs, tracker=None):
+    """Enqueue the jobs whose params aren't in the experiments table yet.
+
+    Returns:
+        (added, skipped) — skipped counts jobs already tested
+    """
+    tracker = tracker or ExperimentTracker(queue.db_file)
+    tested = {}
+    todo = []
+    skipped = 0
+    for job in jobs:
+        key = (job["strategy"], job["symbol"], job["timeframe"])
+        if key not in tested:
+            tested[key] = tracker.tested_hashes(*key)
+        if ExperimentTracker.params_hash(job["params"]) in tested[key]:
+            skipped += 1
+            continue
+        todo.append(job)
+    return queue.enqueue(todo), skipped
+
+
+def _runnable(job):
+    """(strategy_class, params to backtest with) for a job; class is None if unknown."""
+    if job["strategy"] == "ComposableStrategy":
+        params = rebuild_params(job["parameters"], job["symbol"])
+        return (ComposableStrategy, params) if params else (None, None)
+    return STRATEGY_CLASS_MAP.get(job["strategy"]), job["parameters"]
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+def _run_job(engine, job, data, abort_rules=None, indicator_cache=None):
+    """Backtest one job and save its experiment row. Returns an error string or None."""
+    strategy_class, params = _runnable(job)
+    if strategy_class is None:
+        return f"unknown strategy {job['strategy']}"
+    if data.empty:
+        return f"no data for {job['symbol']} {job['timeframe']}"
+    if strategy_class is ComposableStrategy:
+        data = data.copy()  # as run_composable: blocks compute indicators in place
+    try:
+        with suppress_stdout():
+            result = run_combo(data, strategy_class, params, job["timeframe"],
+                               abort_rules=abort_rules, indicator_cache=indicator_cache)
+    except Exception as e:
+        return str(e)
+    engine.save_result(result, job["parameters"], job["strategy"], job["symbol"],
+                       job["timeframe"], job["experiment_id"], job["strategy_source"])
+    return None
+
+
+def run_worker(db_file=DB_FILE, worker_id=None, wait=False, max_chunks=None,
+               abort_rules=None, loader=None, verbose=True, store_dir=None):
+    """Claim and run jobs until the queue is empty (or forever with wait=True).
+
+    Args:
+        db_file: shared research DB holding sweep_jobs and experiments
+        worker_id: name recorded on leases (default host:pid:random)
+        wait: poll for new jobs instead of exiting when the queue is empty
+        max_chunks: stop after this many claims (None = no limit)
+        abort_rules: disqualification rules to abort doomed backtests early
+        loader: AlpacaDataLoader to fetch bars with (default: a new one)
+        verbose: print a line per finished chunk
+        store_dir: also append results to the Parquet ExperimentStore there
+
+    Returns:
+        number of jobs run (not counting ones found already tested)
+    """
+    worker = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    queue = WorkQueue(db_file)
+    tracker = ExperimentTracker(db_file,
+                                store=ExperimentStore(store_dir) if store_dir else None)
+    engine = SweepEngine(tracker=tracker)
+
+    bars_key, data = None, None
+    cache_target, indicator_cache = None, {}
+    ran = 0
+    chunks = 0
+
+    with _Heartbeat(queue, worker) as heartbeat:
+        while max_chunks is None or chunks < max_chunks:
+            jobs = queue.claim(worker)
+            if not jobs:
+                if not wait:
+                    break
+                time.sleep(POLL_SECONDS)
+                continue
+            chunks += 1
+            heartbeat.job_ids = [job["id"] for job in jobs]
+            first = jobs[0]
+            strategy_name, symbol, timeframe = first["strategy"], first["symbol"], first["timeframe"]
+
+            key = (symbol, timeframe, first["start_date"], first["end_date"])
+            if key != bars_key:
+                data = load_backtest_data(symbol, timeframe, key[2], key[3], loader=loader)
+                bars_key = key
+            if (strategy_name, key) != cache_target:
+                cache_target, indicator_cache = (strategy_name, key), {}
+
+            tested = tracker.tested_hashes(strategy_name, symbol, timeframe)
+            by_id = {job["id"]: job for job in jobs}
+            todo = partition_order(_runnable(first)[0],
+                                   [(job["id"], job["parameters"]) for job in jobs])
+            t0 = time.time()
+            try:
+                # One transaction per chunk: results and their 'done' marks land together
+                with tracker.batch(max_rows=10 ** 9, max_seconds=float("inf"),
+                                   atomic=True) as batch:
+                    for job_id, _ in todo:
+                        job = by_id[job_id]
+                        if job["params_hash"] in tested:
+                            queue.finish(worker, job_id, batch=batch)
+                            continue
+                        error = _run_job(engine, job, data, abort_rules, indicator_cache)
+                        queue.finish(worker, job_id, error, batch)
+                        ran += error is None
+            except BaseException:
+                queue.release(worker, heartbeat.job_ids)
+                raise
+            heartbeat.job_ids = []
+            if verbose:
+                print(f"[{worker}] {strategy_name} {symbol} {timeframe}: {len(jobs)} jobs "
+                      f"in {time.time() - t0:.1f}s")
+
+    # Pool processes skip atexit handlers: write the store's last rows here
+    if tracker.store is not None:
+        tracker.store.flush()
+    return ran
+
+
+def start_workers(n, db_file=DB_FILE, wait=False, abort_rules=None, loader=None,
+                  store_dir=None):
+    """Run n worker processes on this machine and wait for them."""
+    processes = [
+        multiprocessing.Process(target=run_worker,
+                                kwargs=dict(db_file=db_file, wait=wait,
+                                            abort_rules=abort_rules, loader=loader,
+                                            store_dir=store_dir))
+        for _ in range(n)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    return [p.exitcode for p in processes]
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main():
+    from backend.optimizer.disqualify import DISQUALIFICATION_RULES
+    from backend.optimizer.run_sweep import (
+        DEFAULT_SYMBOLS, DEFAULT_TIMEFRAMES, PARAM_GRIDS, QUICK_GRID, STRATEGY_MAP,
+    )
+
+    parser = argparse.ArgumentParser(description="Distributed sweep queue")
+    parser.add_argument("--db", type=str, default=DB_FILE,
+                        help=f"Shared research DB (default: {DB_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enq = sub.add_parser("enqueue", help="Add sweep jobs to the queue")
+    enq.add_argument("--strategy", type=str, help="Strategy name (see run_sweep)")
+    enq.add_argument("--composable", action="store_true",
+                     help="Enqueue the composable combinations instead")
+    enq.add_argument("--symbols", type=str, help="Comma-separated symbols")
+    enq.add_argument("--timeframes", type=str, help="Comma-separated timeframes")
+    enq.add_argument("--start", type=str, default="2020-01-01")
+    enq.add_argument("--end", type=str, default="2025-12-31")
+    enq.add_argument("--quick", action="store_true", help="Small grid / first 10 combos")
+    enq.add_argument("--experiment-id", type=str, help="Custom experiment group ID")
+
+    work = sub.add_parser("work", help="Run jobs from the queue")
+    work.add_argument("--processes", type=int, default=1,
+                      help="Worker processes on this machine (default: 1)")
+    work.add_argument("--wait", action="store_true",
+                      help="Keep polling for jobs instead of exiting when the queue is empty")
+    work.add_argument("--early-abort", action="store_true",
+                      help="Stop combos early once they break the drawdown disqualification rule")
+    work.add_argument("--parquet", action="store_true",
+                      help=f"Also write results to the Parquet store ({STORE_DIR})")
+
+    sub.add_parser("status", help="Show job counts")
+    args = parser.parse_args()
+
+    queue = WorkQueue(args.db)
+
+    if args.command == "enqueue":
+        symbols = args.symbols.split(",") if args.symbols else DEFAULT_SYMBOLS
+        timeframes = args.timeframes.split(",") if args.timeframes else DEFAULT_TIMEFRAMES
+        if args.composable:
+            jobs = composable_jobs(symbols, timeframes, args.start, args.end,
+                                   limit=10 if args.quick else None)
+        else:
+            if args.strategy not in STRATEGY_MAP:
+                print(f"Unknown strategy: {args.strategy}")
+                print(f"Available: {list(STRATEGY_MAP.keys())}")
+                return
+            grids = QUICK_GRID if args.quick else PARAM_GRIDS
+            grid = grids.get(args.strategy, list(QUICK_GRID.values())[0])
+            jobs = sweep_jobs(STRATEGY_MAP[args.strategy], grid, symbols, timeframes,
+                              args.start, args.end, args.experiment_id)
+        added, skipped = enqueue_untested(queue, jobs)
+        print(f"Enqueued {added} jobs ({skipped} already tested)")
+
+    elif args.command == "work":
+        abort_rules = DISQUALIFICATION_RULES if args.early_abort else None
+        store_dir = STORE_DIR if args.parquet else None
+        if args.processes > 1:
+            start_workers(args.processes, args.db, args.wait, abort_rules, store_dir=store_dir)
+        else:
+            run_worker(args.db, wait=args.wait, abort_rules=abort_rules, store_dir=store_dir)
+
+    print(f"Queue: {queue.status()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 import argparse
+import gc
 import pandas as pd
 import json
 import os
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from backend.engine.data_loader import DataLoader
 from backend.engine.alpaca_loader import AlpacaDataLoader # New
 from backend.engine.ig_loader import IGDataLoader # IG spread betting data
 from backend.engine.backtester import Backtester
+from backend.engine import metrics
+from backend.engine.shared_data import SharedDataPlane, attach_frame, detach_frame
 from backend.database import DatabaseManager
+from backend.optimizer.cost_model import BARS_PER_YEAR
 from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
 from backend.strategies.bollinger_breakout import BollingerBreakoutStrategy
 # from backend.strategies.nfp_breakout import NFPBreakoutStrategy  # Commented out - missing backend.data module
@@ -484,6 +490,7 @@ def main():
     matrix_parser.add_argument("--timeframes", type=str, default="1h,4h", help="Comma-separated timeframes (default 1h,4h)")
     matrix_parser.add_argument("--source", type=str, default="csv", choices=["csv", "alpaca", "ig"], help="Data Source (csv, alpaca, or ig)")
     matrix_parser.add_argument("--tag", type=str, help="Optional tag to identify this run variation")
+    matrix_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
     
     # Trade Command (Paper/Live)
     trade_parser = subparsers.add_parser('trade', help='Run live/paper trading')
@@ -513,6 +520,7 @@ def run_live_trading(args):
     from datetime import datetime
     from backend.engine.live_broker import LiveBroker
     from backend.engine.alpaca_loader import AlpacaDataLoader
+    from backend.engine.live_bars import LiveBarBuffer, LIVE_BUFFER_BARS
     from backend.database import DatabaseManager
     import uuid
     
@@ -544,7 +552,7 @@ def run_live_trading(args):
         print(f"Using IG source ({broker.acc_type})")
     else:
         broker = LiveBroker(symbol=args.symbol, paper=args.paper, iteration_index=iteration_index)
-        loader = AlpacaDataLoader()
+        loader = AlpacaDataLoader(use_store=False)  # live bars must always be fresh
         print("Using Alpaca source")
     
     # Initialize DB Logger
@@ -583,17 +591,21 @@ def run_live_trading(args):
     if args.timeframe == '5m': fetch_tf = '1m' # We resample
     
     initial_data = loader.fetch_data(args.symbol, fetch_tf, start_date, end_date)
+
+    # Rolling buffer: the live loop only fetches bars after the last one held
+    resample_rule = '5min' if args.timeframe == '5m' else None
+    raw_capacity = LIVE_BUFFER_BARS * (5 if resample_rule else 1)
+    bar_buffer = LiveBarBuffer(loader, args.symbol, fetch_tf, capacity=raw_capacity,
+                               resample_rule=resample_rule)
     
     if initial_data is None or initial_data.empty:
         print("⚠️ Warning: Could not fetch warmup data (API Error). Starting with empty history.")
         # Create empty DataFrame with correct columns
         initial_data = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'])
         # return # Don't exit, proceed with empty data
-        
-    # Resample if needed
-    if args.timeframe == '5m':
-        ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
-        initial_data = initial_data.resample('5min').agg(ohlc_dict).dropna()
+    else:
+        bar_buffer.seed(initial_data)
+        initial_data = bar_buffer.window()  # Resampled if needed
         
     print(f"Warmup Data: {len(initial_data)} bars")
 
@@ -740,7 +752,7 @@ def run_live_trading(args):
 
     print("Entering Live Loop... (Press Ctrl+C to stop)")
 
-    last_bar_time = initial_data.index[-1]
+    last_bar_time = initial_data.index[-1] if len(initial_data) else pd.Timestamp.min.tz_localize('UTC')
     loop_count = 0
 
     try:
@@ -768,25 +780,17 @@ def run_live_trading(args):
                 break
             print(f"[DEBUG] Woke up from sleep, fetching data...")
 
-            # Fetch latest data — need 50+ bars for on_bar guard (i < 50)
-            # 7 days ensures enough 15m bars even over weekends
-            now = datetime.now()
-            start_fetch = (now - pd.Timedelta(days=7)).strftime('%Y-%m-%d')
-            end_fetch = (now + pd.Timedelta(days=1)).strftime('%Y-%m-%d') # Future to get today
-
+            # Fetch only the bars after the last buffered one (the buffer
+            # falls back to a 7-day lookback if it is still empty)
             try:
-                latest_data = loader.fetch_data(args.symbol, fetch_tf, start_fetch, end_fetch)
-                print(f"[DEBUG] Data fetch successful. Rows: {len(latest_data) if latest_data is not None else 'None'}")
+                received = bar_buffer.poll()
+                print(f"[DEBUG] Data fetch successful. New rows: {received}, buffered: {len(bar_buffer)}")
+                latest_data = bar_buffer.window()
             except Exception as fetch_error:
                 print(f"[DEBUG] ⚠️ Data fetch exception: {type(fetch_error).__name__}: {fetch_error}")
                 latest_data = None
 
             if latest_data is not None and not latest_data.empty:
-                # Resample
-                if args.timeframe == '5m':
-                    ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
-                    latest_data = latest_data.resample('5min').agg(ohlc_dict).dropna()
-
                 # Data quality guard — need 50+ bars for indicators
                 if len(latest_data) < 50:
                     print(f"⚠️ Insufficient data: {len(latest_data)} bars (need 50+). Skipping this cycle.")
@@ -798,6 +802,12 @@ def run_live_trading(args):
                     print(f"New Bar: {current_last_time}")
                     last_bar_time = current_last_time
 
+                    # Bars that fell off the front of the buffer shift every
+                    # bar index; keep entry_bar pointing at the same bar
+                    prev_index = getattr(strategy.data, 'index', None)
+                    if getattr(strategy, 'entry_bar', None) is not None and prev_index is not None and len(prev_index):
+                        strategy.entry_bar -= int(prev_index.searchsorted(latest_data.index[0]))
+
                     # Update Strategy
                     strategy.data = latest_data
                     strategy.generate_signals(latest_data)
@@ -915,8 +925,7 @@ def run_live_trading(args):
     print(f"🛑 Live Trading Stopped. (loop iterations: {loop_count})")
 
 def run_matrix(args):
-    import multiprocessing
-    from multiprocessing import Pool, cpu_count
+    from multiprocessing import cpu_count
     
     print(f"--- Starting Matrix Research: {args.strategy} ---")
     
@@ -961,93 +970,171 @@ def run_matrix(args):
                 
     print(f"Total Tasks (Continuous Runs): {len(tasks)}")
     
-    # Batch Processing (Memory Safe)
-    BATCH_SIZE = 4
-    results_buffer = []
-
     # Resume Logic: Filter out existing tasks
     # Note: With continuous runs, it's harder to check "partial" completion.
     # For now, we'll just run them. If we wanted to be smart, we'd check if ALL years for a pair exist.
-    
+
     if not tasks:
         print("All tasks completed.")
         return
-    
-    # Run in batches
-    for i in range(0, len(tasks), BATCH_SIZE):
-        batch = tasks[i:i+BATCH_SIZE]
-        print(f"Processing Batch {i//BATCH_SIZE + 1}/{(len(tasks)-1)//BATCH_SIZE + 1}...")
+
+    workers = min(getattr(args, 'workers', None) or cpu_count(), len(tasks))
+    saved = 0
+    for done, (task, res_list) in enumerate(run_matrix_tasks(tasks, workers), start=1):
+        # worker_task returns a LIST of yearly results (or None); save as each lands
+        if res_list:
+            save_results_db(res_list)
+            saved += len(res_list)
+        print(f"[{done}/{len(tasks)}] {task['symbol']} {task['timeframe']}: "
+              f"{len(res_list) if res_list else 0} yearly results")
+
+    print(f"Saved {saved} yearly results.")
+    print("Matrix Research Complete.")
+
+def task_weight(task_config):
+    """Estimated bars a matrix task backtests (its timeframe over its date range).
+
+    An estimate from BARS_PER_YEAR, not the bars actually loaded: tasks are
+    ordered before any data is loaded, so a symbol with gaps or a shorter
+    history weighs as much as a full one.
+    """
+    years = (pd.Timestamp(task_config['end']) - pd.Timestamp(task_config['start'])).days / 365.25
+    return BARS_PER_YEAR.get(task_config['timeframe'], BARS_PER_YEAR['1h']) * max(years, 0)
+
+
+def run_matrix_tasks(tasks, workers):
+    """Run matrix tasks on one long-lived pool, yielding (task, results) as each finishes.
+
+    Tasks go longest-first (by task_weight, an estimate that ignores the
+    bars actually loaded) so a long 1h/15m run starts early instead of
+    holding up the tail; tasks on the same bars are kept next to each
+    other. Workers pick up the next task as soon as they're free; the
+    parent loads and publishes each task's bars just before submitting it
+    (one task prefetched beyond the workers), so only the frames in
+    flight sit in shared memory. Tasks on the same bars share one block,
+    freed once the last task of the run that uses it finishes.
+    """
+    ordered = sorted(tasks, key=lambda task: (-task_weight(task), str(_data_key(task))))
+    pending = iter(ordered)
+
+    if workers <= 1:
+        for task in pending:
+            yield task, worker_task(task)
+        return
+
+    with SharedDataPlane() as plane, ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        uses = Counter(_data_key(task) for task in ordered)  # key -> tasks yet to finish
+        while True:
+            while len(running) <= workers:
+                task = next(pending, None)
+                if task is None:
+                    break
+                key = _data_key(task)
+                if key not in plane:
+                    try:
+                        plane.publish(key, load_task_data(task))
+                    except Exception as e:
+                        print(f"Data load failed for {task['symbol']} {task['timeframe']}: {e}")
+                        plane.publish(key, None)
+                task['data_handle'] = plane.handles[key]
+                running[pool.submit(pool_task, task)] = (task, key)
+            if not running:
+                return
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, key = running.pop(future)
+                uses[key] -= 1
+                if not uses[key]:
+                    # Last task on these bars: free the block
+                    plane.release(key)
+                try:
+                    yield task, future.result()
+                except Exception as e:
+                    print(f"Task Failed {task['symbol']}: {e}")
+                    yield task, None
+
+
+def _data_key(task_config):
+    """The bars a matrix task runs on (tasks with the same key share them)."""
+    return (task_config['source'], task_config['symbol'], task_config['timeframe'],
+            task_config['start'], task_config['end'])
+
+
+def pool_task(task_config):
+    """worker_task on a long-lived worker: unmaps the task's shared bars afterwards."""
+    try:
+        return worker_task(task_config)
+    finally:
+        handle = task_config.get('data_handle')
+        if handle is not None:
+            gc.collect()
+            detach_frame(handle)
+
+
+def load_task_data(task_config):
+    """Load (and resample if needed) the bars for one matrix task."""
+    if task_config.get('source') == 'ig':
+        from backend.engine.ig_loader import IGDataLoader
+        loader = IGDataLoader()
+        data = loader.fetch_data(task_config['symbol'], task_config['timeframe'], task_config['start'], task_config['end'])
+    elif task_config.get('source') == 'alpaca':
+        # Lazy import to avoid circular dep issues in multiprocessing if any
+        from backend.engine.alpaca_loader import AlpacaDataLoader
+        loader = AlpacaDataLoader()
+        # Alpaca fetch_data returns dataframe directly
+        # Handle Resampling for unsupported timeframes (e.g. 4h)
+        target_tf = task_config['timeframe']
+        fetch_tf = target_tf
         
-        with Pool(processes=min(len(batch), cpu_count())) as pool:
-            batch_results_lists = pool.map(worker_task, batch)
-            
-        # worker_task now returns a LIST of yearly results (or None)
-        # Flatten the list of lists
-        valid_results = []
-        for res_list in batch_results_lists:
-            if res_list:
-                valid_results.extend(res_list)
+        if target_tf == '4h':
+            fetch_tf = '1h'
+        elif target_tf in ['5m', '15m']:
+            fetch_tf = '1m'
         
-        results_buffer.extend(valid_results)
+        data = loader.fetch_data(task_config['symbol'], fetch_tf, task_config['start'], task_config['end'])
         
-        # Save Intermediate
-        save_results_db(valid_results)
+        if data is not None and not data.empty and target_tf != fetch_tf:
+            ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+            # Map timeframe to pandas alias
+            resample_tf = target_tf
+            if target_tf == '5m': resample_tf = '5min'
+            if target_tf == '15m': resample_tf = '15min'
+            
+            data = data.resample(resample_tf).agg(ohlc_dict).dropna()
+    else:
+        loader = DataLoader()
+        data = None
         
-    print("Matrix Research Complete.")
+        # Try Target Timeframe
+        try:
+            data, _ = loader.fetch_ohlcv(task_config['symbol'], task_config['start'], task_config['end'], interval=task_config['timeframe'])
+        except Exception:
+            pass # Fallback to 1m
+    
+    if data is None or data.empty:
+        # Fallback to 1m
+        try:
+            data_1m, _ = loader.fetch_ohlcv(task_config['symbol'], task_config['start'], task_config['end'], interval="1m")
+            if data_1m is not None and not data_1m.empty:
+                ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+                resample_tf = task_config['timeframe']
+                if resample_tf == '5m': resample_tf = '5min'
+                if resample_tf == '15m': resample_tf = '15min'
+                data = data_1m.resample(resample_tf).agg(ohlc_dict).dropna()
+        except Exception:
+            pass # Both failed
+    return data
 
 def worker_task(task_config):
     try:
-        if task_config.get('source') == 'ig':
-            from backend.engine.ig_loader import IGDataLoader
-            loader = IGDataLoader()
-            data = loader.fetch_data(task_config['symbol'], task_config['timeframe'], task_config['start'], task_config['end'])
-        elif task_config.get('source') == 'alpaca':
-            # Lazy import to avoid circular dep issues in multiprocessing if any
-            from backend.engine.alpaca_loader import AlpacaDataLoader
-            loader = AlpacaDataLoader()
-            # Alpaca fetch_data returns dataframe directly
-            # Handle Resampling for unsupported timeframes (e.g. 4h)
-            target_tf = task_config['timeframe']
-            fetch_tf = target_tf
-            
-            if target_tf == '4h':
-                fetch_tf = '1h'
-            elif target_tf in ['5m', '15m']:
-                fetch_tf = '1m'
-            
-            data = loader.fetch_data(task_config['symbol'], fetch_tf, task_config['start'], task_config['end'])
-            
-            if data is not None and not data.empty and target_tf != fetch_tf:
-                ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
-                # Map timeframe to pandas alias
-                resample_tf = target_tf
-                if target_tf == '5m': resample_tf = '5min'
-                if target_tf == '15m': resample_tf = '15min'
-                
-                data = data.resample(resample_tf).agg(ohlc_dict).dropna()
+        # Bars published by the parent (shared memory) or loaded here
+        if 'data_handle' in task_config:
+            handle = task_config['data_handle']
+            data = attach_frame(handle) if handle is not None else None
         else:
-            loader = DataLoader()
-            data = None
-            
-            # Try Target Timeframe
-            try:
-                data, _ = loader.fetch_ohlcv(task_config['symbol'], task_config['start'], task_config['end'], interval=task_config['timeframe'])
-            except Exception:
-                pass # Fallback to 1m
-        
-        if data is None or data.empty:
-            # Fallback to 1m
-            try:
-                data_1m, _ = loader.fetch_ohlcv(task_config['symbol'], task_config['start'], task_config['end'], interval="1m")
-                if data_1m is not None and not data_1m.empty:
-                    ohlc_dict = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
-                    resample_tf = task_config['timeframe']
-                    if resample_tf == '5m': resample_tf = '5min'
-                    if resample_tf == '15m': resample_tf = '15min'
-                    data = data_1m.resample(resample_tf).agg(ohlc_dict).dropna()
-            except Exception:
-                pass # Both failed
-                
+            data = load_task_data(task_config)
+
         if data is None or data.empty:
             return None
 
@@ -1142,53 +1229,25 @@ def worker_task(task_config):
         # Post-Process: Split into Yearly Segments
         yearly_outputs = []
         
-        # Convert equity curve to DataFrame for easy resampling
         equity_curve = full_results['equity_curve']
         if not equity_curve:
             return None
-            
-        df_eq = pd.DataFrame(equity_curve)
-        # Handle timestamp conversion
-        if isinstance(df_eq.iloc[0]['time'], int):
-            df_eq['datetime'] = pd.to_datetime(df_eq['time'], unit='s')
-        else:
-            df_eq['datetime'] = pd.to_datetime(df_eq['time'])
-            
-        df_eq.set_index('datetime', inplace=True)
+
+        # Per-year return and max drawdown (each year as a fresh series)
+        equity, times = metrics.equity_arrays(equity_curve)
+        by_year = metrics.yearly(equity, times)
         
         # Iterate through requested years
         for year in task_config['years_range']:
             year_start = f"{year}-01-01"
             year_end = f"{year}-12-31"
             
-            # Slice the equity curve for this year
-            # We include the last point of previous year as "start" if possible for continuity,
-            # but for simple stats, just taking the year's data is fine.
-            # Actually, to calculate return correctly: (End Equity / Start Equity) - 1
-            # Start Equity = Equity at first timestamp of the year (or last of prev year)
-            
-            year_data = df_eq.loc[year_start:year_end]
-            
-            if year_data.empty:
+            if int(year) not in by_year:
                 continue
-                
-            start_equity = year_data.iloc[0]['equity']
-            end_equity = year_data.iloc[-1]['equity']
-            
-            # Calculate Year Return
-            year_return_pct = ((end_equity - start_equity) / start_equity) * 100
-            
-            # Calculate Year Max Drawdown
-            # We need to recalculate HWM relative to this year's start?
-            # Or just take the drawdown relative to the year's peak?
-            # Standard practice: Max DD *within* the period.
-            # So we treat year_data as a fresh series.
-            
-            # Re-calculate DD for this slice
-            slice_equity = year_data['equity']
-            slice_hwm = slice_equity.cummax()
-            slice_dd = (slice_hwm - slice_equity) / slice_hwm
-            year_max_dd = slice_dd.max() * 100
+            year_metrics = by_year[int(year)]
+            lo, hi = year_metrics['start'], year_metrics['end']
+            year_return_pct = year_metrics['return_pct']
+            year_max_dd = year_metrics['max_drawdown']
             
             # Prepare Metrics
             # Note: win_rate, total_trades etc. would need trade list filtering.
@@ -1242,12 +1301,8 @@ def worker_task(task_config):
 
             # Create the output object
             # Re-convert slice to list of dicts
-            slice_curve = []
-            for ts, row in year_data.iterrows():
-                slice_curve.append({
-                    "time": int(ts.timestamp()) if isinstance(ts, pd.Timestamp) else str(ts),
-                    "equity": row['equity']
-                })
+            slice_curve = [{"time": int(t), "equity": float(e)}
+                           for t, e in zip(times[lo:hi], equity[lo:hi])]
 
             yearly_outputs.append({
                 "test_id": f"{task_config['strategy']}_{task_config['symbol']}_{task_config['timeframe']}_{year}",
@@ -1279,8 +1334,9 @@ def save_results_db(new_results):
     db = DatabaseManager()
     # db.initialize_db() # Assumed initialized in main
     
-    for res in new_results:
-        db.save_test_run(res)
+    with db.batch():
+        for res in new_results:
+            db.save_test_run(res)
     print(f"Batch saved to DB.")
 
 if __name__ == "__main__":
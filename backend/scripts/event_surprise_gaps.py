@@ -23,6 +23,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from backend.engine.data_loader import DataLoader
 from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.economic_calendar import EconomicCalendarStore, CALENDAR_CSV
 
 # Same event config as original diagnostic
 EVENT_TYPES = {
@@ -69,19 +70,12 @@ def load_gld_15m():
 
 
 def load_events_raw():
-    """Load economic events CSV directly (not filtered) for coverage analysis."""
-    csv_path = 'backend/data_csv/economic_calendar.csv'
-    if not os.path.exists(csv_path):
-        print(f"ERROR: CSV not found at {csv_path}")
+    """Load all economic events (not filtered) for coverage analysis."""
+    store = EconomicCalendarStore.load(CALENDAR_CSV)
+    if store is None:
+        print(f"ERROR: CSV not found at {CALENDAR_CSV}")
         sys.exit(1)
-
-    df = pd.read_csv(csv_path)
-    df['DateTime'] = pd.to_datetime(df['DateTime'], utc=True).dt.tz_localize(None)
-    df.rename(columns={
-        'DateTime': 'date', 'Currency': 'currency', 'Impact': 'impact',
-        'Event': 'event', 'Actual': 'actual', 'Forecast': 'forecast', 'Previous': 'previous'
-    }, inplace=True)
-    return df
+    return store.to_frame()
 
 
 def load_events_filtered():
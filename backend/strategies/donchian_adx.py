@@ -7,6 +7,7 @@ class DonchianADXStrategy(DonchianBreakoutStrategy):
     Donchian Breakout Strategy with ADX Regime Filter.
     Only enters trades when ADX is above a threshold (trending market).
     """
+    INDICATOR_PARAMS = DonchianBreakoutStrategy.INDICATOR_PARAMS + ('adx_period',)
     
     def __init__(self, data: pd.DataFrame, events: pd.DataFrame = None, parameters: dict = {}, initial_cash: float = 10000.0, broker=None):
         # Initialize parameters before calling super because super calls _calculate_indicators
@@ -3,6 +3,8 @@ import numpy as np
 from backend.engine.strategy import Strategy
 
 class DonchianBreakoutStrategy(Strategy):
+    INDICATOR_PARAMS = ('entry_period', 'exit_period', 'atr_period', 'atr_col')
+
     def __init__(self, data: pd.DataFrame, events: pd.DataFrame = None, parameters: dict = {}, initial_cash: float = 10000.0, broker=None):
         super().__init__(data, events, parameters, initial_cash, broker)
         
@@ -17,8 +19,9 @@ class DonchianBreakoutStrategy(Strategy):
         # State
         self.bar_index = 0
         
-        # Pre-calculate Indicators
-        self._calculate_indicators()
+        # Pre-calculate Indicators (unless a sweep handed over an enriched frame)
+        if not parameters.get('_indicators_ready'):
+            self._calculate_indicators()
         
     def _calculate_indicators(self):
         from backend.indicators.donchian import donchian_channels
@@ -3,6 +3,9 @@ import numpy as np
 from backend.engine.strategy import Strategy
 
 class MACDBollingerStrategy(Strategy):
+    INDICATOR_PARAMS = ('bb_period', 'bb_std', 'macd_fast', 'macd_slow', 'macd_signal',
+                        'atr_period', 'use_adx_filter')
+
     def __init__(self, data: pd.DataFrame, events: pd.DataFrame = None, parameters: dict = {}, initial_cash: float = 10000.0, broker=None):
         super().__init__(data, events, parameters, initial_cash, broker)
         
@@ -27,8 +30,9 @@ class MACDBollingerStrategy(Strategy):
         self.highest_high = 0.0
         self.lowest_low = float('inf')
         
-        # Pre-calculate Indicators
-        self._calculate_indicators()
+        # Pre-calculate Indicators (unless a sweep handed over an enriched frame)
+        if not parameters.get('_indicators_ready'):
+            self._calculate_indicators()
         
     def _calculate_indicators(self):
         from backend.indicators.bollinger import bollinger_bands
@@ -6,6 +6,17 @@ import pandas as pd
 from datetime import timedelta
 
 class StochRSIMeanReversionStrategy(Strategy):
+    # The ADX params are only read when the filter is on (adx_threshold only by the
+    # static filter); trail_* only with trailing_stop
+    PARAM_DEPENDENCIES = {
+        'dynamic_adx': {'skip_adx_filter': [False]},
+        'adx_threshold': {'skip_adx_filter': [False], 'dynamic_adx': [False]},
+        'trail_after_bars': {'trailing_stop': [True]},
+        'trail_atr': {'trailing_stop': [True]},
+    }
+    PARAM_DEFAULTS = {'skip_adx_filter': True, 'dynamic_adx': True, 'trailing_stop': False}
+    INDICATOR_PARAMS = ('rsi_period', 'stoch_period', 'k_period', 'd_period', 'atr_col')
+
     def __init__(self, data, events, parameters, initial_cash=10000.0, broker=None):
         super().__init__(data, events, parameters, initial_cash, broker)
         
@@ -65,7 +76,9 @@ class StochRSIMeanReversionStrategy(Strategy):
         self.entry_bar = None  # bar index at entry (for duration calc)
         self.entry_price = None  # for trailing stop breakeven check
         
-        self.generate_signals(self.data)
+        # Sweeps may hand over a frame already enriched for these indicator params
+        if not parameters.get('_indicators_ready'):
+            self.generate_signals(self.data)
 
     def generate_signals(self, df: pd.DataFrame):
         # 1. Calculate Indicators Iteratively
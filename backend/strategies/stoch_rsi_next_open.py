@@ -1,6 +1,9 @@
 from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
 
 class StochRSINextOpen(StochRSIMeanReversionStrategy):
+    # Own on_bar: applies adx_threshold unconditionally, no trailing stop
+    PARAM_DEPENDENCIES = {}
+
     def __init__(self, data, events, parameters, initial_cash=10000.0, broker=None):
         super().__init__(data, events, parameters, initial_cash, broker)
         self.pending_order = None
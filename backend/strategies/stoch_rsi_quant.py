@@ -9,6 +9,13 @@ class StochRSIQuantStrategy(StochRSIMeanReversionStrategy):
     1. Time Filter: Avoid Opening Range (09:30-10:00) and Close (15:50-16:00).
     2. ADX Filter: Avoid Strong Trends (ADX > 30).
     """
+
+    # adx_threshold gates every bar here, whatever skip_adx_filter/dynamic_adx say
+    PARAM_DEPENDENCIES = {
+        'trail_after_bars': {'trailing_stop': [True]},
+        'trail_atr': {'trailing_stop': [True]},
+    }
+    INDICATOR_PARAMS = StochRSIMeanReversionStrategy.INDICATOR_PARAMS + ('adx_period',)
     
     def __init__(self, *args, **kwargs):
         # Extract parameters before super().__init__ calls generate_signals
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def make_bars():
+    """Factory for synthetic hourly OHLCV bars: a seeded random walk from 2023-01-02."""
+    def make(periods, seed=5, drift=0.0):
+        idx = pd.date_range("2023-01-02", periods=periods, freq="h", tz="UTC")
+        close = 100 + np.cumsum(np.random.default_rng(seed).normal(drift, 0.6, periods))
+        return pd.DataFrame({"Open": close, "High": close + 0.8, "Low": close - 0.8,
+                             "Close": close, "Volume": 1000.0}, index=idx)
+    return make
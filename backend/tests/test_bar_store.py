@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.bar_store import BarStore
+from backend.engine import bar_transport
+from backend.engine.bar_transport import (
+    AlpacaTransport, FixtureTransport, RecordingTransport, fixture_path,
+)
+from backend.engine.data_utils import load_backtest_data
+
+
+def test_loader_only_fetches_missing_spans(tmp_path, make_bars):
+    bars = make_bars(24 * 60, seed=1)
+    transport = FixtureTransport({("GLD", "1h"): bars})
+    loader = AlpacaDataLoader(transport=transport, store=BarStore(str(tmp_path / "bars.db")))
+
+    first = loader.fetch_data("GLD", "1h", "2023-01-10", "2023-01-20")
+    assert len(first) == 10 * 24
+    assert len(transport.calls) == 1
+
+    # Fully covered: served from the store, no transport call
+    again = loader.fetch_data("GLD", "1h", "2023-01-12", "2023-01-15")
+    assert len(transport.calls) == 1
+    expected = bars.loc["2023-01-12":"2023-01-14 23:00"]
+    assert again.index.equals(expected.index)
+    np.testing.assert_allclose(again.to_numpy(), expected.to_numpy())
+
+    # Overlapping request: only the two uncovered edges are fetched
+    wide = loader.fetch_data("GLD", "1h", "2023-01-05", "2023-01-25")
+    assert len(wide) == 20 * 24
+    fetched = [(c[2], c[3]) for c in transport.calls[1:]]
+    assert fetched == [
+        (pd.Timestamp("2023-01-05", tz="UTC"), pd.Timestamp("2023-01-10", tz="UTC")),
+        (pd.Timestamp("2023-01-20", tz="UTC"), pd.Timestamp("2023-01-25", tz="UTC")),
+    ]
+
+
+def test_empty_spans_are_remembered(tmp_path, make_bars):
+    transport = FixtureTransport({("GLD", "1h"): make_bars(24 * 60, seed=1)})
+    store = BarStore(str(tmp_path / "bars.db"))
+    loader = AlpacaDataLoader(transport=transport, store=store)
+
+    assert loader.fetch_data("GLD", "1h", "2022-01-01", "2022-02-01").empty
+    assert loader.fetch_data("GLD", "1h", "2022-01-01", "2022-02-01").empty
+    assert len(transport.calls) == 1
+    assert store.coverage("GLD", "1h") == [(1640995200, 1643673600)]
+
+
+def test_failed_fetches_are_not_cached(tmp_path, make_bars):
+    class Flaky(FixtureTransport):
+        fail = True
+
+        def fetch_bars(self, *args):
+            if self.fail:
+                self.calls.append(args)
+                raise RuntimeError("429 Too Many Requests")
+            return super().fetch_bars(*args)
+
+    transport = Flaky({("GLD", "1h"): make_bars(24 * 60, seed=1)})
+    store = BarStore(str(tmp_path / "bars.db"))
+    loader = AlpacaDataLoader(transport=transport, store=store)
+
+    assert loader.fetch_data("GLD", "1h", "2023-01-10", "2023-01-20").empty
+    assert store.coverage("GLD", "1h") == []
+    transport.fail = False
+    assert len(loader.fetch_data("GLD", "1h", "2023-01-10", "2023-01-20")) == 10 * 24
+    assert len(transport.calls) == 2
+
+
+class _Response:
+    def __init__(self, payload, status_code=200):
+        self.payload, self.status_code, self.text = payload, status_code, str(payload)
+
+    def json(self):
+        return self.payload
+
+
+def test_forex_pages_are_followed(monkeypatch):
+    idx = pd.date_range("2023-01-02", periods=5, freq="h", tz="UTC")
+    rows = [{"t": t.isoformat(), "o": 1.2, "h": 1.3, "l": 1.1, "c": 1.25} for t in idx]
+    pages = {None: {"rates": {"GBP/USD": rows[:3]}, "next_page_token": "p2"},
+             "p2": {"rates": {"GBP/USD": rows[3:]}, "next_page_token": None}}
+    requested = []
+
+    def get(url, headers, params):
+        requested.append(params.get("page_token"))
+        return pages[params.get("page_token")]
+
+    transport = AlpacaTransport.__new__(AlpacaTransport)
+    transport.api_key = transport.secret_key = "x"
+    start, end = idx[0], idx[-1] + pd.Timedelta(hours=1)
+
+    monkeypatch.setattr(bar_transport.requests, "get", lambda *a, **k: _Response(get(*a, **k)))
+    df = transport._fetch_forex("GBP/USD", "1h", start, end)
+    assert requested == [None, "p2"]
+    assert df.index.equals(idx.rename("Date")) and (df["Volume"] == 0).all()
+
+    monkeypatch.setattr(bar_transport.requests, "get", lambda *a, **k: _Response({}, 429))
+    with pytest.raises(RuntimeError):
+        transport._fetch_forex("GBP/USD", "1h", start, end)
+
+
+def test_recorded_fixtures_replay_offline(tmp_path, make_bars):
+    source = FixtureTransport({("SLV", "1m"): make_bars(24 * 60, seed=1).resample("1min").ffill().iloc[:600]})
+    recorder = RecordingTransport(source, str(tmp_path / "fixtures"))
+    AlpacaDataLoader(transport=recorder, use_store=False).fetch_data("SLV", "1m", "2023-01-02", "2023-01-03")
+    assert (tmp_path / "fixtures").exists()
+    assert fixture_path(str(tmp_path / "fixtures"), "SLV", "1m").endswith("SLV_1m.csv.gz")
+
+    offline = AlpacaDataLoader(transport=FixtureTransport(fixture_dir=str(tmp_path / "fixtures")),
+                               store=BarStore(str(tmp_path / "bars.db")))
+    data = load_backtest_data("SLV", "15m", "2023-01-02", "2023-01-03", loader=offline)
+    assert len(data) == 40
+    assert list(data.columns) == ["Open", "High", "Low", "Close", "Volume"]
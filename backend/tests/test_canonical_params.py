@@ -0,0 +1,46 @@
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import SweepEngine, canonical_params
+from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
+from backend.strategies.stoch_rsi_quant import StochRSIQuantStrategy
+
+GRID = {
+    "rsi_period": [14],
+    "stoch_period": [14],
+    "overbought": [80],
+    "oversold": [20],
+    "skip_adx_filter": [True, False],
+    "dynamic_adx": [True, False],
+    "adx_threshold": [20, 25],
+}
+
+
+def test_inert_params_are_dropped():
+    assert canonical_params(StochRSIMeanReversionStrategy, {"adx_threshold": 20}) == {}
+    static = {"skip_adx_filter": False, "dynamic_adx": False, "adx_threshold": 20}
+    assert canonical_params(StochRSIMeanReversionStrategy, static) == static
+    assert canonical_params(StochRSIMeanReversionStrategy, {"trail_atr": 2.0}) == {}
+
+    # Subclass with its own unconditional ADX gate keeps adx_threshold
+    assert canonical_params(StochRSIQuantStrategy, {"adx_threshold": 20}) == {"adx_threshold": 20}
+
+
+def test_sweep_runs_each_canonical_combo_once(tmp_path, make_bars):
+    data = make_bars(600, seed=11)
+    tracker = ExperimentTracker(str(tmp_path / "canon.db"))
+    engine = SweepEngine(tracker=tracker)
+
+    results = engine.run_sweep(StochRSIMeanReversionStrategy, GRID, "GLD", "1h",
+                               "2023-01-01", "2023-02-28", verbose=False, data=data)
+
+    # 8 grid combos: skip=True (4) -> 1, dynamic (2) -> 1, static (2) -> 2
+    assert len(results) == 8
+    assert tracker.count() == 4
+
+    by_params = {ExperimentTracker.params_hash(r["params"]): r for r in results}
+    for r in results:
+        canonical = canonical_params(StochRSIMeanReversionStrategy, r["params"])
+        assert by_params[ExperimentTracker.params_hash(canonical)]["score"] == r["score"]
+
+    # Re-running skips all of them, duplicates included
+    assert engine.run_sweep(StochRSIMeanReversionStrategy, GRID, "GLD", "1h",
+                            "2023-01-01", "2023-02-28", verbose=False, data=data) == []
@@ -0,0 +1,37 @@
+import itertools
+
+from backend.optimizer.building_blocks import ENTRIES, EXITS, FILTERS, SIZERS
+from backend.optimizer.combination_generator import (
+    CombinationSpace, _is_compatible, count_combinations, generate_combinations,
+)
+
+
+def _labels():
+    return [f"{e.name} | {x.name} | {f.name} | {s.name}"
+            for e, x, f, s in itertools.product(ENTRIES, EXITS, FILTERS, SIZERS)
+            if _is_compatible(e, x, f)]
+
+
+def test_indices_follow_product_order():
+    space = CombinationSpace(symbol="SLV")
+    expected = _labels()
+    assert len(space) == count_combinations() == len(expected)
+    assert [label for _, label in generate_combinations()] == expected
+
+    for i in (0, 1, len(space) // 2, len(space) - 1):
+        params, label = space[i]
+        assert label == expected[i] and params["_label"] == label
+        assert params["symbol"] == "SLV"
+    assert space[-1][1] == expected[-1]
+    assert count_combinations(check_compat=False) == \
+        len(ENTRIES) * len(EXITS) * len(FILTERS) * len(SIZERS)
+
+
+def test_shards_partition_the_space():
+    space = CombinationSpace()
+    shards = [list(space.indices(k, 5)) for k in range(5)]
+    assert sorted(i for shard in shards for i in shard) == list(range(len(space)))
+    assert max(map(len, shards)) - min(map(len, shards)) <= 1
+
+    labels = [label for _, _, label in space.iter(2, 5, limit=3)]
+    assert labels == [space[i][1] for i in shards[2][:3]]
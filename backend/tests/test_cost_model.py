@@ -0,0 +1,120 @@
+import pandas as pd
+
+from backend.optimizer import run_overnight
+from backend.optimizer.cost_model import DEFAULT_RATES, CostModel
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.run_overnight import (
+    END_DATE, START_DATE, Checkpoint, TimeBudget, pass1_broad_sweep, plan_sweeps, shrink_grid,
+)
+from backend.optimizer.sweep import SweepEngine
+
+# Days from START_DATE to END_DATE (a full overnight sweep)
+SPAN = (pd.Timestamp(END_DATE) - pd.Timestamp(START_DATE)).days
+
+GRIDS = {
+    "DonchianBreakout": {
+        "entry_period": [10, 20, 30, 55],
+        "exit_period": [5, 10],
+        "stop_loss_atr": [1.5, 3.0],
+        "atr_period": [14, 20],
+    },
+}
+
+
+def test_rates_fall_back_from_specific_to_default(tmp_path):
+    model = CostModel(str(tmp_path / "costs.db"))
+    assert model.rate("sweep", "DonchianBreakoutStrategy", "1h") == DEFAULT_RATES["sweep"]
+
+    model.record("sweep", "DonchianBreakoutStrategy", units=1000 * 10, seconds=2.0,
+                 symbol="GLD", timeframe="1h", bars=1000, workers=2, days=100)
+    assert model.rate("sweep", "DonchianBreakoutStrategy", "1h") == 4.0 / 10_000
+    assert model.rate("sweep", "DonchianBreakoutStrategy", "15m") == 4.0 / 10_000
+    assert model.rate("sweep", "MACDBollingerStrategy", "15m") == 4.0 / 10_000
+    # Bar counts scale with the span asked for
+    assert model.bars("GLD", "1h", "2024-01-01", "2024-04-10") == 1000
+    assert model.bars("GLD", "1h", "2024-01-01", "2024-01-11") == 100
+    assert model.predict_sweep("DonchianBreakoutStrategy", "GLD", "1h", 10,
+                               "2024-01-01", "2024-04-10", workers=4) == 1.0
+    assert model.bars("SLV", "1h", "2023-01-01", "2024-01-01") == int(1764 * 365 / 365.25)
+
+
+def test_shrink_grid_keeps_ends():
+    assert shrink_grid({"a": [1, 2, 3, 4, 5], "b": [1, 2]}) == {"a": [1, 3, 5], "b": [1, 2]}
+    assert shrink_grid({"a": [1, 2, 3, 4], "b": [1]}) == {"a": [1, 3, 4], "b": [1]}
+    assert shrink_grid({"a": [1, 2], "b": [1]}) == {"a": [1], "b": [1]}
+    assert shrink_grid({"a": [1], "b": [1]}) is None
+
+
+def test_plan_reorders_shrinks_and_defers(tmp_path):
+    model = CostModel(str(tmp_path / "costs.db"))
+    # 1h bars are cheap, 15m bars are 4x as many and 10x slower per bar
+    model.record("sweep", "DonchianBreakoutStrategy", 1000, 1.0, "GLD", "1h", bars=1000,
+                 days=SPAN)
+    model.record("sweep", "DonchianBreakoutStrategy", 4000, 40.0, "GLD", "15m", bars=4000,
+                 days=SPAN)
+    engine = SweepEngine(tracker=ExperimentTracker(str(tmp_path / "exp.db")))
+    budget = TimeBudget(max_hours=1)
+
+    targets = [("GLD", "15m"), ("GLD", "1h")]
+    plan = plan_sweeps(engine, targets, ["DonchianBreakout"], GRIDS, "grid", budget,
+                       cost_model=model)
+    # 1h is second priority but 40x cheaper: it goes first
+    assert [it["timeframe"] for it in plan] == ["1h", "15m"]
+
+    # 32 combos x 4000 bars x 0.01s = 1280s on 15m; only ~10 minutes available
+    tight = plan_sweeps(engine, targets, ["DonchianBreakout"], GRIDS, "grid", budget,
+                        cost_model=model, reserve_seconds=budget.remaining() * 0.9 - 600)
+    by_tf = {it["timeframe"]: it for it in tight}
+    assert by_tf["15m"]["shrunk"] and by_tf["15m"]["todo"] < 32
+    assert sum(it["seconds"] for it in tight) <= 600
+
+    none_left = plan_sweeps(engine, targets, ["DonchianBreakout"], GRIDS, "grid", budget,
+                            cost_model=model, reserve_seconds=budget.remaining())
+    assert none_left == []
+
+
+def test_pass1_replans_deferred_sweeps(tmp_path, monkeypatch):
+    model = CostModel(str(tmp_path / "costs.db"))
+    for symbol in ("GLD", "SLV"):
+        model.record("sweep", "DonchianBreakoutStrategy", 4000, 40.0, symbol, "15m",
+                     bars=4000, days=SPAN)
+    engine = SweepEngine(tracker=ExperimentTracker(str(tmp_path / "exp.db")))
+    budget = TimeBudget(max_hours=1)
+    # Each full grid is predicted at 1280s; ~1500s available: SLV doesn't fit after GLD
+    reserve = budget.remaining() * 0.9 - 1500
+    first = plan_sweeps(engine, [("GLD", "15m"), ("SLV", "15m")], ["DonchianBreakout"],
+                        GRIDS, "grid", budget, cost_model=model, reserve_seconds=reserve)
+    assert [it["symbol"] for it in first] == ["GLD"]
+
+    # GLD finishes at once, far under its prediction: SLV now fits, on its full grid
+    ran = []
+    monkeypatch.setattr(engine, "run_sweep", lambda **kw: ran.append(
+        (kw["symbol"], len(SweepEngine._expand_grid(kw["param_grid"])))) or [])
+    monkeypatch.setattr(run_overnight, "COMPOSABLE_TARGETS", [])
+    pass1_broad_sweep(engine, budget, [("GLD", "15m"), ("SLV", "15m")], ["DonchianBreakout"],
+                      GRIDS, cost_model=model, reserve_seconds=reserve)
+    assert ran == [("GLD", 32), ("SLV", 32)]
+
+
+def test_checkpoint_resumes(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    first = Checkpoint(path)
+    first.mark_done("sweep:GLD:1h:DonchianBreakout")
+    first.mark_pass("sweep")
+
+    resumed = Checkpoint(path, resume=True)
+    assert resumed.is_done("sweep:GLD:1h:DonchianBreakout") and resumed.pass_done("sweep")
+    assert not Checkpoint(path).is_done("sweep:GLD:1h:DonchianBreakout")
+
+
+def test_sweeps_record_their_runtime(tmp_path, make_bars):
+    from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+    data = make_bars(300, seed=2)
+    model = CostModel(str(tmp_path / "costs.db"))
+    engine = SweepEngine(tracker=ExperimentTracker(str(tmp_path / "exp.db")), cost_model=model)
+    engine.run_sweep(DonchianBreakoutStrategy, {"entry_period": [10, 20], "exit_period": [5]},
+                     "GLD", "1h", "2023-01-01", "2023-01-31", verbose=False, data=data)
+
+    assert model.bars("GLD", "1h", data.index[0], data.index[-1]) == 300
+    assert model.rate("sweep", "DonchianBreakoutStrategy", "1h") != DEFAULT_RATES["sweep"]
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pytest
+
+from backend.database import DatabaseManager, WriteBatcher
+
+
+def _run(i):
+    return {
+        "test_id": f"run-{i}", "strategy": "Donchian", "symbol": "GLD", "timeframe": "1h",
+        "year": 2024, "parameters": {"entry_period": i},
+        "metrics": {"return_pct": 1.0 * i, "max_drawdown": 2.0, "win_rate": 0.5, "total_trades": 10,
+                    "equity_curve": [{"time": 0, "equity": 10000.0}]},
+    }
+
+
+def test_batched_test_runs_and_live_trades(tmp_path):
+    db = DatabaseManager(str(tmp_path / "research.db"))
+    db.initialize_db()
+
+    with db.batch(max_rows=1000, max_seconds=3600) as batch:
+        for i in range(20):
+            db.save_test_run(_run(i))
+        db.save_test_run(_run(3))  # replaced, not duplicated
+        db.save_live_trade({"session_id": "s", "symbol": "GLD", "side": "buy", "qty": 1.0})
+        assert len(batch) == 64
+    assert len(db.get_all_test_runs()) == 20
+    assert len(db.get_equity_curve("run-3")) == 1
+    assert len(db.get_live_trades()) == 1
+
+    # Unbatched writes still go straight to the DB
+    db.save_test_run(_run(20))
+    assert len(db.get_all_test_runs()) == 21
+
+
+def test_flush_drops_only_constraint_violations(tmp_path):
+    db_file = str(tmp_path / "batch.db")
+    batch = WriteBatcher(db_file, max_rows=1000, max_seconds=3600)
+    batch.add("INSERT INTO t VALUES (?)", (1,))
+    # No table yet: nothing is written, the rows stay queued and the caller sees it
+    with pytest.raises(sqlite3.OperationalError):
+        batch.flush()
+    assert len(batch) == 1
+
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+    conn.commit()
+    batch.add("INSERT INTO t VALUES (?)", (1,))  # duplicate key
+    batch.add("INSERT INTO t VALUES (?)", (2,))
+    assert batch.flush() == 2 and len(batch) == 0
+    batch.close()
+    assert conn.execute("SELECT id FROM t ORDER BY id").fetchall() == [(1,), (2,)]
+    conn.close()
@@ -0,0 +1,69 @@
+from backend.engine.backtester import Backtester, BacktestProgress
+from backend.optimizer.disqualify import (
+    abort_predicates, is_exact_abort, max_drawdown_abort, min_trades_abort,
+)
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import SweepEngine
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+PARAMS = {"symbol": "GLD", "entry_period": 10, "exit_period": 5, "stop_loss_atr": 1.5, "atr_period": 14}
+
+
+def _run(bars, **kwargs):
+    return Backtester(bars, DonchianBreakoutStrategy, parameters=dict(PARAMS),
+                      spread=0.0003, interval="1h", **kwargs).run()
+
+
+def test_abort_predicate_stops_run(make_bars):
+    result = _run(make_bars(1200), abort_predicates=[lambda p: "stop" if p.bar >= 300 else None],
+                  abort_check_every=100)
+    assert result["aborted"] and result["abort_reason"] == "stop"
+    assert result["bars_processed"] == 300
+
+
+def test_drawdown_abort_agrees_with_final_drawdown(make_bars):
+    bars = make_bars(1200)
+    full = _run(bars)
+    assert not full["aborted"] and full["max_drawdown"] > 0
+
+    # Limit above the final drawdown: identical results
+    same = _run(bars, abort_predicates=[max_drawdown_abort(full["max_drawdown"] + 1)], abort_check_every=1)
+    assert not same["aborted"]
+    assert same["return_pct"] == full["return_pct"]
+    assert same["total_trades"] == full["total_trades"]
+
+    # Limit below it: stopped, and the partial drawdown already breaks the limit
+    limit = full["max_drawdown"] / 2
+    cut = _run(bars, abort_predicates=[max_drawdown_abort(limit)], abort_check_every=1)
+    assert cut["aborted"] and cut["abort_reason"].startswith("drawdown_too_high")
+    assert cut["max_drawdown"] > limit
+    assert cut["bars_processed"] < len(bars)
+
+
+def test_min_trades_projection():
+    check = min_trades_abort(30, min_progress=0.5, slack=2.0)
+    assert check(BacktestProgress(bar=400, total_bars=1000, total_trades=0, max_drawdown=0, equity=0)) is None
+    assert check(BacktestProgress(bar=500, total_bars=1000, total_trades=10, max_drawdown=0, equity=0)) is None
+    reason = check(BacktestProgress(bar=500, total_bars=1000, total_trades=5, max_drawdown=0, equity=0))
+    assert reason.startswith("too_few_trades")
+
+
+def test_only_exact_aborts_by_default_and_persisted(tmp_path, make_bars):
+    assert len(abort_predicates()) == 1 and len(abort_predicates(heuristic=True)) == 2
+    assert is_exact_abort("drawdown_too_high (30.0% > 25.0%)")
+    assert not is_exact_abort("too_few_trades (projected 12 < 30 at 50%)")
+    assert not is_exact_abort(None)
+
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    engine = SweepEngine(tracker=tracker)
+    check = min_trades_abort(10_000, min_progress=0.1)
+    guess = _run(make_bars(1200), abort_predicates=[check], abort_check_every=100)
+    assert guess["aborted"]
+    guess["sharpe"], guess["score"] = 0.0, -999.0
+    engine.save_result(guess, dict(PARAMS), "DonchianBreakoutStrategy", "GLD", "1h", "t")
+    assert tracker.count() == 0  # retried next sweep, not skipped as tested
+
+    cut = _run(make_bars(1200), abort_predicates=[max_drawdown_abort(0.1)], abort_check_every=1)
+    cut["sharpe"], cut["score"] = 0.0, -999.0
+    engine.save_result(cut, dict(PARAMS), "DonchianBreakoutStrategy", "GLD", "1h", "t")
+    assert tracker.count() == 1
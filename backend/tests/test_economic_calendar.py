@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from backend.engine.economic_calendar import EconomicCalendarStore, parse_values
+
+CSV_ROWS = [
+    # DateTime, Currency, Impact, Event, Actual, Forecast, Previous
+    ("2024-01-05T08:30:00-05:00", "USD", "High", "Non-Farm Employment Change", "216K", "170K", "173K"),
+    ("2024-01-11T08:30:00-05:00", "USD", "High", "CPI m/m", "0.3%", "0.2%", "0.1%"),
+    ("2024-01-11T08:30:00-05:00", "USD", "Medium", "Unemployment Claims", "202K", "210K", "203K"),
+    ("2024-01-10T10:00:00+00:00", "EUR", "High", "ECB Press Conference", "", "", ""),
+    ("2024-01-31T14:00:00-05:00", "USD", "High Impact Expected", "FOMC Statement", "", "", ""),
+    ("2024-02-02T08:30:00-05:00", "USD", "High", "Non-Farm Employment Change", "1,353K", "n/a", "216K"),
+]
+
+
+def _write_csv(path):
+    df = pd.DataFrame(CSV_ROWS, columns=["DateTime", "Currency", "Impact", "Event",
+                                         "Actual", "Forecast", "Previous"])
+    df.to_csv(path, index=False)
+
+
+def test_parse_values():
+    vals = parse_values(["216K", "0.3%", "1,353K", "-1.2B", "", None, "n/a", "4"])
+    expected = [216e3, 0.3, 1353e3, -1.2e9, np.nan, np.nan, np.nan, 4.0]
+    np.testing.assert_allclose(vals, expected, equal_nan=True)
+
+
+def test_compile_and_queries(tmp_path):
+    csv_path = tmp_path / "economic_calendar.csv"
+    _write_csv(csv_path)
+
+    store = EconomicCalendarStore.load(str(csv_path), refresh=True)
+    assert len(store) == len(CSV_ROWS)
+    assert (tmp_path / "economic_calendar.compiled.npz").exists()
+    assert np.all(np.diff(store.time) >= 0)
+
+    # High-impact USD events with values (fetch_economic_events semantics)
+    m = store.mask("2024-01-01", "2024-12-31", currency="USD", impact="High", require_values=True)
+    frame = store.to_frame(m)
+    assert list(frame["event"]) == ["Non-Farm Employment Change", "CPI m/m"]
+    assert frame["date"].iloc[0] == pd.Timestamp("2024-01-05 13:30:00")
+    assert frame["actual_val"].iloc[0] == 216e3
+
+    # Keyword blackout times (get_event_blackout_times semantics)
+    times = store.event_times("2024-01-01", "2024-12-31", keywords=["nonfarm", "non-farm", "fomc"])
+    assert [pd.Timestamp(t) for t in times] == [
+        pd.Timestamp("2024-01-05 13:30:00"),
+        pd.Timestamp("2024-01-31 19:00:00"),
+        pd.Timestamp("2024-02-02 13:30:00"),
+    ]
+
+    # End bound is inclusive at midnight, like the old pandas filter
+    assert len(store.event_times("2024-01-01", "2024-01-05")) == 0
+
+
+def test_reload_uses_compiled_file_until_csv_changes(tmp_path):
+    csv_path = tmp_path / "economic_calendar.csv"
+    _write_csv(csv_path)
+    first = EconomicCalendarStore.load(str(csv_path), refresh=True)
+    assert EconomicCalendarStore.load(str(csv_path)) is first
+
+    with open(csv_path, "a") as f:
+        f.write("2024-03-08T08:30:00-05:00,USD,High,Non-Farm Employment Change,275K,200K,229K\n")
+    reloaded = EconomicCalendarStore.load(str(csv_path))
+    assert len(reloaded) == len(CSV_ROWS) + 1
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from backend.engine.backtester import Backtester
+from backend.optimizer import enhancement_sweep
+from backend.optimizer.enhancement_sweep import (
+    BASELINE, baseline_result, delta_table, run_variants,
+)
+from backend.optimizer.sweep import suppress_stdout
+from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
+
+VARIANTS = [
+    ("Skip Monday", {'skip_days': [0]}),
+    ("Trail 2x ATR after 5 bars", {'trailing_stop': True, 'trail_after_bars': 5, 'trail_atr': 2.0}),
+    ("Min hold 5 bars", {'min_hold_bars': 5}),
+    ("US session 14-21", {'trading_hours': [14, 21]}),
+]
+
+
+def _bars(periods=1500):
+    idx = pd.date_range("2024-01-02 14:30", periods=periods, freq="15min", tz="UTC")
+    close = 180 + np.cumsum(np.random.default_rng(11).normal(0, 0.4, periods))
+    return pd.DataFrame({"Open": close, "High": close + 0.3, "Low": close - 0.3,
+                         "Close": close, "Volume": 1000.0}, index=idx)
+
+
+def _direct(data, params):
+    with suppress_stdout():
+        return Backtester(data.copy(), StochRSIMeanReversionStrategy, params, 10000.0, 0.0003,
+                          execution_delay=0, interval="15m").run()
+
+
+def test_variants_match_direct_backtests_in_parallel():
+    data = _bars()
+    expected = [_direct(data, {**BASELINE, **overrides}) for _, overrides in VARIANTS]
+    for workers in (1, 2):
+        out = run_variants(data, VARIANTS, workers=workers)
+        assert [label for label, _, _ in out] == [label for label, _ in VARIANTS]
+        for (_, summary, error), direct in zip(out, expected):
+            assert error is None
+            assert (summary["return_pct"], summary["total_trades"]) == \
+                (direct["return_pct"], direct["total_trades"])
+
+
+def test_blackout_variants_get_the_event_times():
+    data = _bars()
+    # An event at 18:00 UTC every day the bars cover
+    events = {pd.Timestamp(day) + pd.Timedelta(hours=18)
+              for day in data.index.tz_localize(None).normalize().unique()}
+    variants = [("Baseline", {}), ("Blackout 6h around events", {'event_blackout_hours': 6})]
+    (_, baseline, _), (_, blackout, error) = run_variants(data, variants, event_times=events)
+    assert error is None
+    assert blackout["total_trades"] < baseline["total_trades"]
+    # Without event times there is nothing to black out
+    (_, _, _), (_, unchanged, _) = run_variants(data, variants)
+    assert unchanged == baseline
+
+
+def test_baseline_is_cached_per_bars(tmp_path, monkeypatch):
+    data = _bars(800)
+    cache_file = str(tmp_path / "baseline.json")
+    first, cached = baseline_result(data, cache_file=cache_file)
+    assert not cached
+
+    monkeypatch.setattr(enhancement_sweep, "run_backtest",
+                        lambda *a, **k: (_ for _ in ()).throw(AssertionError("re-ran")))
+    assert baseline_result(data, cache_file=cache_file) == (first, True)
+
+    # Different bars or edited strategy code miss the cache
+    monkeypatch.undo()
+    assert baseline_result(data.iloc[:-1], cache_file=cache_file)[1] is False
+    monkeypatch.setattr(enhancement_sweep, "_code_fingerprint", lambda: "edited")
+    assert baseline_result(data, cache_file=cache_file)[1] is False
+
+
+def test_delta_table():
+    base = {"sharpe": 1.0, "return_pct": 10.0, "total_trades": 50, "win_rate": 0.5,
+            "max_drawdown": 5.0, "profit_factor": 1.2}
+    rows = [("A", "better", {**base, "sharpe": 1.4, "total_trades": 40}),
+            ("A", "failed", None),
+            ("B", "worse", {**base, "sharpe": 0.7, "max_drawdown": 7.5})]
+    table = delta_table(base, rows)
+    assert list(table["variant"]) == ["better", "worse"]
+    assert table["d_sharpe"].round(6).tolist() == [0.4, -0.3]
+    assert table.loc[0, "d_total_trades"] == -10 and table.loc[1, "d_max_drawdown"] == 2.5
@@ -0,0 +1,88 @@
+import pytest
+
+from backend.optimizer.experiment_store import ExperimentStore, export_from_db, flatten_params
+from backend.optimizer.experiment_tracker import ExperimentTracker
+
+
+def _save_grid(tracker):
+    for rsi_period in (7, 14):
+        for oversold in (20, 30):
+            for symbol in ("SPY", "BTC/USD"):
+                tracker.save("test", "RSIMeanReversion", symbol, "1h",
+                             {"rsi_period": rsi_period, "oversold": oversold,
+                              "use_trend": oversold == 20, "symbol": symbol},
+                             {"total_trades": 40, "sharpe": rsi_period + oversold / 100,
+                              "return_pct": 1.0})
+    tracker.save("test", "DonchianBreakoutStrategy", "SPY", "1d",
+                 {"entry_period": 20, "mode": "close"}, {"total_trades": 5, "sharpe": 0.5})
+
+
+def test_flatten_params_types():
+    flat = flatten_params({"rsi_period": 14, "oversold": 25.5, "use_trend": True,
+                           "mode": "close", "levels": [1, 2], "symbol": "SPY", "_tag": 1})
+    assert flat == {"p_rsi_period": 14.0, "p_oversold": 25.5, "p_use_trend": True,
+                    "p_mode": "close", "p_levels": "[1, 2]"}
+
+
+def test_tracker_appends_partitioned_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = ExperimentStore(str(tmp_path / "store"), max_rows=3)
+    tracker = ExperimentTracker(str(tmp_path / "research.db"), store=store)
+    with tracker.batch():
+        _save_grid(tracker)
+    store.flush()
+
+    df = store.scan()
+    assert len(df) == tracker.count() == 9
+    assert set(df["symbol"]) == {"SPY", "BTC/USD"}
+    assert (tmp_path / "store" / "strategy=RSIMeanReversion" / "symbol=BTC%2FUSD").is_dir()
+
+    # Only the asked partitions and columns are read
+    spy = store.scan("RSIMeanReversion", symbol="SPY", columns=["p_rsi_period", "sharpe", "nope"])
+    assert list(spy.columns) == ["p_rsi_period", "sharpe"] and len(spy) == 4
+    assert str(spy["p_rsi_period"].dtype) == "float64"
+
+    # Columns absent from a partition read back as nulls
+    mixed = store.scan(columns=["strategy", "p_entry_period", "p_oversold"])
+    assert mixed["p_oversold"].isna().sum() == 1 and mixed["p_entry_period"].notna().sum() == 1
+
+    surface = store.surface("RSIMeanReversion", "rsi_period", "oversold")
+    assert surface.loc[14.0, 30.0] == pytest.approx(14.3)
+    assert store.surface("DonchianBreakoutStrategy", "entry_period", "mode",
+                         min_trades=30).empty
+
+    assert store.compact() >= 2
+    assert len(store.scan()) == 9
+
+
+def test_param_types_stay_readable_across_flushes(tmp_path):
+    pytest.importorskip("pyarrow")
+    store = ExperimentStore(str(tmp_path / "store"))
+    row = {"strategy": "S", "symbol": "SPY", "timeframe": "1h", "sharpe": 1.0}
+    # Strings first: later numbers are written as strings too
+    store.add({**row, "parameters": {"mode": "close", "level": 2}})
+    store.flush()
+    store.add({**row, "parameters": {"mode": 3, "level": 3}})
+    store.flush()
+    # A number column that later gets strings can't stay numeric: read as strings
+    store.add({**row, "parameters": {"mode": "open", "level": "high"}})
+    store.flush()
+
+    df = store.scan()
+    assert list(df["p_mode"]) == ["close", "3.0", "open"]
+    assert list(df["p_level"]) == ["2", "3", "high"]
+    assert store.compact() == 3 and len(store.scan()) == 3
+
+
+def test_export_from_db(tmp_path):
+    pytest.importorskip("pyarrow")
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    _save_grid(tracker)
+
+    store = ExperimentStore(str(tmp_path / "store"))
+    assert export_from_db(tracker.db_file, store, chunk_rows=4) == 9
+    df = store.scan("RSIMeanReversion")
+    assert sorted(df["id"]) == list(range(1, 9))
+    assert df["p_use_trend"].sum() == 4
+    # Exporting again would duplicate every row
+    assert export_from_db(tracker.db_file, store) == 0
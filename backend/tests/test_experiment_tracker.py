@@ -0,0 +1,66 @@
+import json
+import sqlite3
+
+from backend.optimizer.experiment_tracker import ExperimentTracker
+
+RESULTS = {"return_pct": 5.0, "max_drawdown": 2.0, "total_trades": 40,
+           "win_rate": 0.5, "profit_factor": 1.3, "sharpe": 0.8}
+
+
+def test_params_hash_lookup(tmp_path):
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    params = {"rsi_period": 14, "sl_atr": 2.0, "symbol": "GLD"}
+    tracker.save("e1", "StochRSI", "GLD", "1h", params, RESULTS, score=1.0)
+
+    # Key order doesn't matter
+    assert tracker.has_been_tested("StochRSI", "GLD", "1h", dict(reversed(list(params.items()))))
+    assert not tracker.has_been_tested("StochRSI", "GLD", "4h", params)
+    assert not tracker.has_been_tested("StochRSI", "GLD", "1h", {**params, "sl_atr": 3.0})
+    assert tracker.tested_hashes("StochRSI", "GLD", "1h") == {ExperimentTracker.params_hash(params)}
+
+
+def test_migration_backfills_existing_rows(tmp_path):
+    db_file = str(tmp_path / "research.db")
+    # Pre-migration table without params_hash
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE experiments (id INTEGER PRIMARY KEY AUTOINCREMENT, experiment_id TEXT, "
+                 "strategy TEXT, symbol TEXT, timeframe TEXT, parameters TEXT)")
+    conn.executemany("INSERT INTO experiments (strategy, symbol, timeframe, parameters) VALUES (?, ?, ?, ?)", [
+        ("Donchian", "SLV", "1h", json.dumps({"entry_period": p, "symbol": "SLV"})) for p in (10, 20, 30)
+    ])
+    conn.commit()
+    conn.close()
+
+    tracker = ExperimentTracker(db_file)
+    assert tracker.has_been_tested("Donchian", "SLV", "1h", {"symbol": "SLV", "entry_period": 20})
+    assert len(tracker.tested_hashes("Donchian", "SLV", "1h")) == 3
+
+    conn = sqlite3.connect(db_file)
+    indexes = [r[1] for r in conn.execute("PRAGMA index_list(experiments)")]
+    conn.close()
+    assert "idx_experiments_params_hash" in indexes
+
+
+def test_batched_saves_flush_on_read_and_exit(tmp_path):
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    with tracker.batch(max_rows=1000, max_seconds=3600) as batch:
+        for p in range(5):
+            tracker.save("e1", "Donchian", "GLD", "1h", {"entry_period": p}, RESULTS, score=0.1)
+        assert len(batch) == 5
+        # Queries see queued rows
+        assert tracker.count() == 5
+        tracker.save("e1", "Donchian", "GLD", "1h", {"entry_period": 99}, RESULTS, score=0.1)
+    assert tracker.has_been_tested("Donchian", "GLD", "1h", {"entry_period": 99})
+
+    # Rows are flushed even if the block raises
+    try:
+        with tracker.batch(max_rows=1000, max_seconds=3600):
+            tracker.save("e2", "Donchian", "GLD", "4h", {"entry_period": 1}, RESULTS, score=0.1)
+            raise RuntimeError("sweep crashed")
+    except RuntimeError:
+        pass
+    assert tracker.count() == 7
+
+    conn = sqlite3.connect(str(tmp_path / "research.db"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
@@ -0,0 +1,62 @@
+from itertools import product
+
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.halving import (
+    fidelity_schedule, hyperband_brackets, recent_slice, run_halving_sweep, rung_score,
+)
+from backend.optimizer.sweep import SweepEngine, run_combo, suppress_stdout
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+GRID = {
+    "entry_period": [10, 20, 30],
+    "exit_period": [5, 10, 15],
+    "stop_loss_atr": [1.5, 3.0],
+    "atr_period": [14],
+}
+
+
+def test_schedule_and_brackets():
+    assert fidelity_schedule(3, 1 / 9) == [1 / 9, 1 / 3, 1.0]
+    todo = [(i, {"k": i}) for i in range(30)]
+    brackets = hyperband_brackets(todo, 3)
+    assert [len(b) for b in brackets] == [16, 8, 6]
+    assert sorted(i for b in brackets for i, _ in b) == list(range(30))
+
+
+def test_halving_saves_only_full_period_survivors(tmp_path, make_bars):
+    data = make_bars(2700, seed=7)
+    tracker = ExperimentTracker(str(tmp_path / "halving.db"))
+    engine = SweepEngine(tracker=tracker)
+    results = run_halving_sweep(engine, DonchianBreakoutStrategy, GRID, "GLD", "1h",
+                                "2023-01-01", "2023-06-30", verbose=False, data=data)
+
+    # 18 combos -> 6 -> 2 on the full period
+    assert len(results) == 2 == tracker.count()
+    assert all(r["bars_processed"] == len(data) for r in results)
+
+    # Final-rung numbers are identical to a grid sweep of the same combos
+    grid = SweepEngine(tracker=ExperimentTracker(str(tmp_path / "grid.db"))).run_sweep(
+        DonchianBreakoutStrategy, GRID, "GLD", "1h", "2023-01-01", "2023-06-30",
+        verbose=False, data=data,
+    )
+    by_params = {ExperimentTracker.params_hash(r["params"]): r["score"] for r in grid}
+    by_sharpe = {ExperimentTracker.params_hash(r["params"]): r["sharpe"] for r in grid}
+    for r in results:
+        assert by_params[ExperimentTracker.params_hash(r["params"])] == r["score"]
+
+    # Out of budget from the start: rung 0 still ranks the grid, then its
+    # top 2 go straight to the full period
+    rerun = run_halving_sweep(SweepEngine(tracker=ExperimentTracker(str(tmp_path / "stop.db"))),
+                              DonchianBreakoutStrategy, GRID, "GLD", "1h", "2023-01-01",
+                              "2023-06-30", verbose=False, data=data, should_stop=lambda: True)
+    sliced = recent_slice(data, 1 / 9)
+    rung0 = []
+    for combo in product(*GRID.values()):
+        params = {**dict(zip(GRID, combo)), "symbol": "GLD"}
+        with suppress_stdout():
+            rung0.append((rung_score(run_combo(sliced.copy(), DonchianBreakoutStrategy,
+                                               params, "1h"), 1 / 9), params))
+    rung0.sort(key=lambda s: -s[0])
+    assert len(rerun) == 2
+    assert sorted(r["sharpe"] for r in rerun) == \
+        sorted(by_sharpe[ExperimentTracker.params_hash(p)] for _, p in rung0[:2])
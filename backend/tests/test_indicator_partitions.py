@@ -0,0 +1,48 @@
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import SweepEngine, partition_order, run_combo, suppress_stdout
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+from backend.strategies.stoch_rsi_mean_reversion import StochRSIMeanReversionStrategy
+
+DONCHIAN_GRID = {
+    "entry_period": [10, 20],
+    "exit_period": [5],
+    "stop_loss_atr": [1.5, 2.0, 3.0],
+    "atr_period": [14, 20],
+}
+
+STOCH_GRID = {
+    "rsi_period": [7, 14],
+    "stoch_period": [14],
+    "overbought": [75, 80],
+    "oversold": [20, 25],
+    "sl_atr": [2.0],
+}
+
+
+def test_partition_order_groups_indicator_params():
+    todo = list(enumerate(SweepEngine._expand_grid(DONCHIAN_GRID)))
+    ordered = partition_order(DonchianBreakoutStrategy, todo)
+    keys = [(p["entry_period"], p["atr_period"]) for _, p in ordered]
+    assert keys == [(10, 14)] * 3 + [(10, 20)] * 3 + [(20, 14)] * 3 + [(20, 20)] * 3
+    assert sorted(i for i, _ in ordered) == list(range(12))
+
+
+def test_shared_indicators_match_per_combo_runs(tmp_path, monkeypatch, make_bars):
+    data = make_bars(700, seed=21)
+    for strategy_class, grid, partitions in [(DonchianBreakoutStrategy, DONCHIAN_GRID, 4),
+                                             (StochRSIMeanReversionStrategy, STOCH_GRID, 2)]:
+        calls = []
+        original = strategy_class.precompute_indicators.__func__
+        monkeypatch.setattr(strategy_class, "precompute_indicators",
+                            classmethod(lambda cls, d, p: calls.append(1) or original(cls, d, p)))
+
+        engine = SweepEngine(tracker=ExperimentTracker(str(tmp_path / f"{strategy_class.__name__}.db")))
+        results = engine.run_sweep(strategy_class, grid, "GLD", "1h", "2023-01-01", "2023-02-28",
+                                   verbose=False, data=data.copy())
+        assert len(calls) == partitions
+
+        for r in results:
+            with suppress_stdout():
+                fresh = run_combo(data.copy(), strategy_class, r["params"], "1h")
+            assert (r["return_pct"], r["total_trades"], r["sharpe"]) == \
+                (fresh["return_pct"], fresh["total_trades"], fresh["sharpe"])
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.bar_transport import FixtureTransport
+from backend.engine.live_bars import LiveBarBuffer
+
+
+def _minute_bars(periods=300):
+    idx = pd.date_range("2024-03-04 14:30", periods=periods, freq="min", tz="UTC")
+    close = 200 + np.cumsum(np.random.default_rng(3).normal(0, 0.1, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close + 0.2, "Low": close - 0.2, "Close": close, "Volume": 10.0,
+    }, index=idx)
+
+
+def test_poll_only_requests_the_tail():
+    bars = _minute_bars()
+    transport = FixtureTransport({("GLD", "1m"): bars.iloc[:160]})  # feed is at bar 159
+    loader = AlpacaDataLoader(transport=transport, use_store=False)
+    buffer = LiveBarBuffer(loader, "GLD", "1m", capacity=100)
+
+    buffer.seed(bars.iloc[:150])
+    assert len(buffer) == 100
+    assert buffer.window().index[0] == bars.index[50]
+
+    # Last bar was still forming when it was seeded: the poll re-sends it
+    received = buffer.poll(now=bars.index[159])
+    start, end = transport.calls[-1][2:]
+    assert start == bars.index[149]
+    assert received == 11
+
+    window = buffer.window()
+    assert len(window) == 100
+    assert window.index[-1] == bars.index[159]
+    np.testing.assert_allclose(window.to_numpy(), bars.iloc[60:160].to_numpy())
+
+    # Nothing new: the window is unchanged
+    assert buffer.poll(now=bars.index[159]) == 1
+    assert buffer.window().index.equals(window.index)
+
+
+def test_resampled_window_matches_full_resample():
+    bars = _minute_bars()
+    loader = AlpacaDataLoader(transport=FixtureTransport({("SLV", "1m"): bars}), use_store=False)
+    buffer = LiveBarBuffer(loader, "SLV", "1m", capacity=1000, resample_rule="5min")
+    buffer.seed(bars.iloc[:97])
+    for k in range(97, 300, 13):
+        buffer.append(bars.iloc[k - 1:k + 13])
+
+    expected = bars.resample("5min").agg({
+        "Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+    }).dropna()
+    window = buffer.window()
+    assert window.index.equals(expected.index)
+    np.testing.assert_allclose(window.to_numpy(), expected.to_numpy())
@@ -0,0 +1,58 @@
+from backend import runner
+from backend.runner import run_matrix_tasks, task_weight
+
+
+def _tasks():
+    return [{"strategy": "DonchianBreakout", "symbol": symbol, "timeframe": tf,
+             "start": "2023-01-01", "end": "2023-12-31", "years_range": [2023],
+             "spread": 0.0, "delay": 0, "source": "csv"}
+            for symbol in ("GBPJPY=X", "EURUSD=X", "USDJPY=X") for tf in ("4h", "1h")]
+
+
+def test_tasks_run_longest_first_on_one_pool(monkeypatch, make_bars):
+    frames = {("GBPJPY=X", "1h"): 1500, ("EURUSD=X", "1h"): 1200, ("USDJPY=X", "1h"): 900,
+              ("GBPJPY=X", "4h"): 400, ("EURUSD=X", "4h"): 350, ("USDJPY=X", "4h"): 300}
+    monkeypatch.setattr(runner, "load_task_data",
+                        lambda task: make_bars(frames[(task["symbol"], task["timeframe"])]))
+
+    assert task_weight(_tasks()[1]) > task_weight(_tasks()[0])  # 1h before 4h
+    sequential = list(run_matrix_tasks(_tasks(), workers=1))
+    assert [t["timeframe"] for t, _ in sequential] == ["1h"] * 3 + ["4h"] * 3
+
+    parallel = list(run_matrix_tasks(_tasks(), workers=2))
+    assert len(parallel) == 6
+    by_task = {(t["symbol"], t["timeframe"]): r for t, r in parallel}
+    for task, results in sequential:
+        other = by_task[(task["symbol"], task["timeframe"])]
+        assert [r["metrics"]["return_pct"] for r in results] == \
+            [r["metrics"]["return_pct"] for r in other]
+
+
+def test_tasks_on_the_same_bars_share_one_block(monkeypatch, make_bars):
+    loads, planes = [], []
+
+    def load(task):
+        loads.append((task["symbol"], task["timeframe"]))
+        return make_bars(600)
+
+    class RecordingPlane(runner.SharedDataPlane):
+        def __init__(self):
+            super().__init__()
+            planes.append(self)
+
+        def close(self):
+            assert not self._blocks  # every block released as its last task finished
+            super().close()
+
+    monkeypatch.setattr(runner, "load_task_data", load)
+    monkeypatch.setattr(runner, "SharedDataPlane", RecordingPlane)
+    # Three tasks on each of two frames, interleaved
+    tasks = [dict(_tasks()[i]) for _ in range(3) for i in (1, 3)]
+
+    results = list(run_matrix_tasks(tasks, workers=2))
+    assert len(results) == 6 and len(planes) == 1
+    assert sorted(loads) == [("EURUSD=X", "1h"), ("GBPJPY=X", "1h")]
+    for symbol in ("EURUSD=X", "GBPJPY=X"):
+        returns = [[r["metrics"]["return_pct"] for r in res]
+                   for t, res in results if t["symbol"] == symbol]
+        assert returns[0] and returns.count(returns[0]) == 3
@@ -0,0 +1,78 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.engine import metrics
+from backend.optimizer.scoring import calc_sharpe
+
+
+def _curve(n=800, daily=False, seed=0):
+    equity = 10000 * np.cumprod(1 + np.random.default_rng(seed).normal(0.0004, 0.01, n))
+    idx = pd.date_range("2021-03-01", periods=n, freq="D" if daily else "h", tz="UTC")
+    times = idx.strftime("%Y-%m-%d") if daily else (idx.asi8 // 10 ** 9)
+    return [{"time": t if daily else int(t), "equity": round(float(e), 2)}
+            for t, e in zip(times, equity)]
+
+
+def _loop_sharpe(curve):
+    eq = [p["equity"] for p in curve]
+    r = [(eq[i] - eq[i - 1]) / eq[i - 1] for i in range(1, len(eq))]
+    mean = sum(r) / len(r)
+    std = math.sqrt(sum((x - mean) ** 2 for x in r) / (len(r) - 1))
+    span = curve[-1]["time"] - curve[0]["time"]
+    ppy = 365.25 * 24 * 3600 / (span / (len(curve) - 1))
+    return round(mean / std * math.sqrt(ppy), 4)
+
+
+def _loop_drawdown(equity):
+    peak, worst = equity[0], 0.0
+    for e in equity:
+        peak = max(peak, e)
+        worst = max(worst, (peak - e) / peak)
+    return worst
+
+
+def test_calc_sharpe_matches_loop():
+    curve = _curve()
+    assert calc_sharpe(curve) == pytest.approx(_loop_sharpe(curve), abs=1e-4)
+    daily = _curve(daily=True)
+    equity, times = metrics.equity_arrays(daily)
+    assert times[1] - times[0] == 86400
+    assert 360 < metrics.periods_per_year(times) < 370
+    assert calc_sharpe(daily[:1]) == 0.0
+    assert calc_sharpe([{"time": 1, "equity": 100.0}] * 5) == 0.0
+
+
+def test_drawdown_duration_and_profit_factor():
+    equity = np.array([100, 110, 99, 105, 111, 90, 95.0])
+    dd, duration = metrics.drawdown(equity)
+    assert dd == pytest.approx(_loop_drawdown(equity))
+    assert duration == 2  # 111 at index 4, still under water at index 6
+    assert metrics.drawdown(equity, times=np.arange(7) * 60)[1] == 120
+
+    pnl = [50.0, -20.0, 30.0, 0.0, -10.0]
+    assert metrics.profit_factor(pnl) == pytest.approx(80 / 30)
+    assert metrics.profit_factor([5.0, 3.0]) == 0.0
+    closed = metrics.closed_trade_equity(pnl, 1000.0)
+    assert closed.tolist() == [1000, 1050, 1030, 1060, 1060, 1050]
+
+
+def test_yearly_split_and_performance():
+    curve = _curve(n=900, daily=True, seed=2)
+    equity, times = metrics.equity_arrays(curve)
+    by_year = metrics.yearly(equity, times)
+    assert sorted(by_year) == [2021, 2022, 2023]
+    year = [p["equity"] for p in curve if p["time"].startswith("2022")]
+    assert by_year[2022]["return_pct"] == pytest.approx((year[-1] / year[0] - 1) * 100)
+    assert by_year[2022]["max_drawdown"] == pytest.approx(_loop_drawdown(year) * 100)
+    assert by_year[2022]["end"] - by_year[2022]["start"] == 365
+
+    out = metrics.performance(equity, times, pnl=[10.0, -5.0, 20.0])
+    assert out["sharpe"] == pytest.approx(calc_sharpe(curve), abs=1e-4)
+    assert out["max_drawdown"] == pytest.approx(_loop_drawdown(equity) * 100)
+    assert out["calmar"] == pytest.approx(out["annualised_return"] / out["max_drawdown"])
+    assert out["sortino"] > out["sharpe"] > 0
+    assert out["exposure"] == pytest.approx(1.0, abs=0.02)
+    assert (out["total_trades"], out["win_rate"]) == (3, pytest.approx(2 / 3))
@@ -0,0 +1,65 @@
+import time
+
+import numpy as np
+import pytest
+
+from backend.optimizer.monte_carlo import monte_carlo, resample_indices, robustness
+
+
+def _max_drawdown(pnl, capital=10000.0):
+    equity = capital + np.concatenate([[0.0], np.cumsum(pnl)])
+    peak = np.maximum.accumulate(equity)
+    return ((peak - equity) / peak).max() * 100
+
+
+def test_resample_indices_shapes():
+    rng = np.random.default_rng(1)
+    shuffled = resample_indices(10, 5, "shuffle", rng=rng)
+    assert shuffled.shape == (5, 10)
+    assert (np.sort(shuffled, axis=1) == np.arange(10)).all()
+
+    block = resample_indices(10, 5, "block", block_size=3, rng=rng)
+    assert block.shape == (5, 10)
+    # Within a block indices are consecutive (mod n)
+    assert ((block[:, 1] - block[:, 0]) % 10 == 1).all()
+
+    with pytest.raises(ValueError):
+        resample_indices(10, 5, "jackknife")
+
+
+def test_shuffle_keeps_final_return_and_matches_loop():
+    pnl = np.random.default_rng(2).normal(15, 120, 150)
+    out = monte_carlo(pnl, "pnl", "shuffle", resamples=200, seed=3)
+    expected = (pnl.sum() / 10000.0) * 100
+    assert out["final_return"]["p5"] == pytest.approx(expected, abs=1e-3)
+    assert out["final_return"]["p95"] == pytest.approx(expected, abs=1e-3)
+
+    # Same drawdowns as replaying each resample one at a time
+    idx = resample_indices(len(pnl), 200, "shuffle", rng=np.random.default_rng(3))
+    loop = np.array([_max_drawdown(pnl[row]) for row in idx])
+    assert out["max_drawdown"]["mean"] == pytest.approx(loop.mean(), abs=1e-3)
+
+
+def test_returns_series_in_slices(monkeypatch):
+    from backend.optimizer import monte_carlo as mc
+    returns = np.random.default_rng(4).normal(0.0005, 0.01, 500)
+    whole = monte_carlo(returns, "returns", "bootstrap", resamples=300, seed=5)
+    monkeypatch.setattr(mc, "MAX_CELLS", 500 * 7)  # odd slice size
+    sliced = monte_carlo(returns, "returns", "bootstrap", resamples=300, seed=5)
+    assert sliced["resamples"] == 300 and 0 <= sliced["ruin_probability"] <= 1
+    assert sliced["sharpe"]["mean"] == pytest.approx(whole["sharpe"]["mean"], abs=0.3)
+
+
+def test_robustness_rules_and_speed():
+    rng = np.random.default_rng(6)
+    steady = {"trade_history": [{"pnl": p} for p in rng.normal(20, 60, 300)]}
+    t0 = time.time()
+    good = robustness(steady, years=5)
+    assert time.time() - t0 < 1.0
+    assert good["passes"] and set(good) >= {"bootstrap", "block", "shuffle"}
+    assert good == robustness(steady, years=5)  # seeded
+
+    risky = {"trade_history": [{"pnl": p} for p in rng.normal(5, 900, 300)]}
+    bad = robustness(risky, years=5)
+    assert not bad["passes"] and bad["reason"].startswith("mc_")
+    assert robustness({"trade_history": []}) == {"passes": False, "reason": "no_trades"}
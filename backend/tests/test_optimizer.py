@@ -53,5 +53,33 @@ def test_optimizer():
     else:
         print(f"\nFAILURE: Expected 9 combinations, got {len(results)}.")
 
+
+def _mock_data(n=150):
+    dates = pd.date_range(start="2023-01-01", periods=n, freq="D")
+    prices = 100 + np.cumsum(np.random.default_rng(4).normal(0.1, 2, n))
+    return pd.DataFrame({"Open": prices, "High": prices + 2, "Low": prices - 2,
+                         "Close": prices, "Volume": [1000] * n}, index=dates)
+
+
+def test_optimizer_keeps_top_k_and_spills(tmp_path):
+    import json
+
+    ranges = {"entry_period": range(10, 31, 5), "exit_period": (x for x in (5, 10))}
+    optimizer = Optimizer(_mock_data(), DonchianBreakoutStrategy, events=pd.DataFrame())
+    spill = tmp_path / "results.jsonl"
+    top = optimizer.optimize(ranges, top_k=3, spill_path=str(spill))
+
+    every = [json.loads(line) for line in spill.read_text().splitlines()]
+    assert len(every) == 10 and len(top) == 3
+    expected = sorted(every, key=lambda r: r["return_pct"], reverse=True)[:3]
+    assert [r["parameters"] for r in top] == [r["parameters"] for r in expected]
+    assert "_event_data" not in top[0]["parameters"]
+
+    by_trades = optimizer.optimize({"entry_period": [10, 20, 30], "exit_period": [5]},
+                                   top_k=1, objective=lambda r: -r["total_trades"])
+    assert by_trades[0]["total_trades"] == min(
+        r["total_trades"] for r in every
+        if r["parameters"]["exit_period"] == 5 and r["parameters"]["entry_period"] in (10, 20, 30))
+
 if __name__ == "__main__":
     test_optimizer()
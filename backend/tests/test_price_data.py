@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from backend.database import DatabaseManager
+
+
+def _bars(periods=1000):
+    idx = pd.date_range("2024-01-02 14:30", periods=periods, freq="15min", tz="UTC")
+    close = 180 + np.cumsum(np.random.default_rng(7).normal(0, 0.3, periods))
+    return pd.DataFrame({
+        "Open": close - 0.1, "High": close + 0.5, "Low": close - 0.5, "Close": close,
+        "Volume": np.arange(periods, dtype=float),
+    }, index=idx)
+
+
+def test_bulk_save_and_columnar_reads(tmp_path):
+    db = DatabaseManager(str(tmp_path / "research.db"))
+    db.initialize_db()
+    bars = _bars()
+
+    assert db.save_price_bars("GLD", bars) == len(bars)
+    assert db.save_price_bars("GLD", bars.iloc[-10:]) == 0  # existing rows are kept
+    assert db.get_price_data_range("GLD")[2] == len(bars)
+
+    arrays = db.get_price_arrays("GLD")
+    assert arrays["timestamp"].dtype == np.int64
+    assert arrays["timestamp"][0] == int(bars.index[0].timestamp())
+    np.testing.assert_allclose(arrays["close"], bars["Close"].to_numpy())
+
+    # Same rows as the list-of-dicts API
+    legacy = db.get_price_bars("GLD", start_ts=int(arrays["timestamp"][100]))
+    assert [r["timestamp"] for r in legacy] == arrays["timestamp"][100:].tolist()
+
+    frame = db.get_price_frame("GLD")
+    assert frame.index.equals(bars.index)
+    np.testing.assert_allclose(frame.to_numpy(), bars.to_numpy())
+
+
+def test_downsampled_reads_keep_ohlc_extremes(tmp_path):
+    db = DatabaseManager(str(tmp_path / "research.db"))
+    db.initialize_db()
+    bars = _bars()
+    db.save_price_bars("SLV", bars)
+
+    small = db.get_price_arrays("SLV", max_bars=300)
+    assert len(small["timestamp"]) <= 300
+    assert small["high"].max() == bars["High"].max()
+    assert small["low"].min() == bars["Low"].min()
+    assert small["open"][0] == bars["Open"].iloc[0]
+    assert small["close"][-1] == bars["Close"].iloc[-1]
+    assert small["volume"].sum() == bars["Volume"].sum()
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sensitivity import (
+    analyze, neighbour_axis, neighbourhood, passes_sensitivity, stability_score, to_payload,
+)
+from backend.optimizer.sweep import SweepEngine
+
+CENTER = {"entry_period": 20, "exit_period": 10, "stop_loss_atr": 2.0, "atr_period": 14,
+          "symbol": "GLD"}
+
+
+def test_neighbour_axes():
+    assert neighbour_axis(20, [10, 20, 30, 55]) == [10, 20, 30]
+    assert neighbour_axis(10, [10, 20, 30, 55]) == [10, 20]
+    assert neighbour_axis(25, [10, 20, 30, 55]) == [20, 25, 30]
+    assert neighbour_axis(40) == [36, 40, 44]
+    assert neighbour_axis(0.5) == [0.45, 0.5, 0.55]
+    assert neighbour_axis(1) == [1, 2]
+    axes = neighbourhood("DonchianBreakoutStrategy", CENTER)
+    assert list(axes) == ["entry_period", "exit_period", "stop_loss_atr", "atr_period"]
+    assert axes["atr_period"] == [14, 20]
+
+
+def test_stability_score():
+    plateau = np.full((3, 3), 1.0)
+    plateau[1, 1] = 1.1
+    assert stability_score(plateau, (1, 1)) > 0.9
+    spike = np.zeros((3, 3))
+    spike[1, 1] = 2.0
+    assert stability_score(spike, (1, 1)) == 0.0
+    assert stability_score(-plateau, (1, 1)) == 0.0
+
+
+def test_surface_is_cached_in_the_experiments_table(tmp_path, make_bars):
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    experiment = {"strategy": "DonchianBreakoutStrategy", "symbol": "GLD", "timeframe": "1h",
+                  "parameters": CENTER}
+    names = ["entry_period", "stop_loss_atr"]
+    data = make_bars(900, drift=0.02)
+    # A partial (early-aborted) run of the centre doesn't count as cached
+    tracker.save(experiment_id="sweep", strategy="DonchianBreakoutStrategy", symbol="GLD",
+                 timeframe="1h", params=CENTER,
+                 results={"return_pct": -30.0, "max_drawdown": 26.0, "total_trades": 3,
+                          "win_rate": 0.0, "profit_factor": 0.0, "sharpe": -9.0},
+                 score=-999.0, validation_status="rejected",
+                 validation_details={"aborted": "drawdown_too_high (26.0% > 25%)"})
+
+    first = analyze(experiment, names=names, tracker=tracker, data=data, workers=2)
+    assert first["surface"].shape == (3, 3) and first["center"] == (1, 1)
+    assert first["axes"] == {"entry_period": [10, 20, 30], "stop_loss_atr": [1.5, 2.0, 3.0]}
+    assert (first["evaluated"], first["cached"]) == (9, 0) and tracker.count() == 10
+    assert not np.isnan(first["surface"]).any() and first["center_value"] != -9.0
+    assert 0.0 <= first["stability"] <= 1.0
+    assert set(first["by_param"]) == set(names)
+
+    # Everything is read back now; nothing runs (no data is even needed)
+    second = analyze(experiment, names=names, tracker=tracker)
+    assert (second["evaluated"], second["cached"]) == (0, 9)
+    np.testing.assert_array_equal(second["surface"], first["surface"])
+
+    payload = json.loads(json.dumps(to_payload(second)))
+    assert len(payload["surface"]) == 3 and payload["center"] == [1, 1]
+    passes, reason = passes_sensitivity(second, min_stability=2.0)
+    assert not passes and reason.startswith("parameter_spike")
+    assert passes_sensitivity({}) == (False, "sensitivity_unavailable")
+
+
+def test_failed_neighbours_are_not_counted_as_cached(tmp_path, monkeypatch, make_bars):
+    monkeypatch.setattr(SweepEngine, "evaluate", lambda self, data, cls, tf, todo, *a:
+                        ((i, params, None, "boom") for i, params in todo))
+    experiment = {"strategy": "DonchianBreakoutStrategy", "symbol": "GLD", "timeframe": "1h",
+                  "parameters": CENTER}
+    result = analyze(experiment, names=["entry_period"], data=make_bars(300),
+                     tracker=ExperimentTracker(str(tmp_path / "research.db")))
+    assert (result["evaluated"], result["cached"]) == (0, 0)
+    assert np.isnan(result["surface"]).all()
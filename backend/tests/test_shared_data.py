@@ -0,0 +1,53 @@
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.engine.shared_data import SharedDataPlane, attach_frame, detach_frame
+
+
+def _bars(periods=500):
+    idx = pd.date_range("2023-06-01", periods=periods, freq="15min", tz="UTC", name="Date")
+    close = 50 + np.cumsum(np.random.default_rng(11).normal(0, 0.2, periods))
+    return pd.DataFrame({
+        "Open": close, "High": close + 0.3, "Low": close - 0.3, "Close": close, "Volume": 100.0,
+    }, index=idx)
+
+
+def _worker_close_sum(handle):
+    data = attach_frame(handle)
+    data["sma"] = data["Close"].rolling(10).mean()  # workers may still add columns
+    return float(data["Close"].sum()), str(data.index[-1])
+
+
+def test_published_frame_round_trips_without_copying():
+    bars = _bars()
+    with SharedDataPlane() as plane:
+        handle = plane.publish(("GLD", "15m"), bars)
+        assert plane.publish(("GLD", "15m"), bars) is handle
+        assert plane.publish(("SLV", "15m"), bars.iloc[:0]) is None
+
+        shared = attach_frame(handle)
+        assert shared.index.equals(bars.index)
+        np.testing.assert_array_equal(shared.to_numpy(), bars.to_numpy())
+        assert not shared["Close"].to_numpy().flags.writeable
+
+        with Pool(2) as pool:
+            results = pool.map(_worker_close_sum, [handle] * 4)
+        assert results == [(float(bars["Close"].sum()), str(bars.index[-1]))] * 4
+
+
+def test_release_and_detach():
+    bars = _bars()
+    with SharedDataPlane() as plane:
+        handle = plane.publish(("GLD", "15m"), bars)
+        shared = attach_frame(handle)
+        assert not detach_frame(handle)  # shared still points into the block
+        del shared
+        assert detach_frame(handle)
+
+        plane.release(("GLD", "15m"))
+        assert ("GLD", "15m") not in plane
+        with pytest.raises(FileNotFoundError):
+            attach_frame(handle)
@@ -0,0 +1,34 @@
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import SweepEngine
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+GRID = {
+    "entry_period": [10, 20, 30],
+    "exit_period": [5, 10],
+    "stop_loss_atr": [1.5, 3.0],
+    "atr_period": [14],
+}
+
+
+def _sweep(tmp_path, data, name, workers):
+    tracker = ExperimentTracker(str(tmp_path / f"{name}.db"))
+    engine = SweepEngine(tracker=tracker, workers=workers, chunksize=2)
+    results = engine.run_sweep(
+        DonchianBreakoutStrategy, GRID, "GLD", "1h", "2023-01-01", "2023-03-31",
+        experiment_id="t", verbose=False, data=data,
+    )
+    conn = tracker._get_conn()
+    saved = conn.execute("SELECT parameters, return_pct FROM experiments ORDER BY id").fetchall()
+    conn.close()
+    return results, saved
+
+
+def test_parallel_sweep_matches_sequential(tmp_path, make_bars):
+    data = make_bars(800)
+    seq_results, seq_saved = _sweep(tmp_path, data, "seq", workers=1)
+    par_results, par_saved = _sweep(tmp_path, data, "par", workers=3)
+
+    assert len(seq_saved) == 12
+    assert par_saved == seq_saved  # same rows, same insertion order
+    assert [r["params"] for r in par_results] == [r["params"] for r in seq_results]
+    assert [r["score"] for r in par_results] == [r["score"] for r in seq_results]
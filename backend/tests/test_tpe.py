@@ -0,0 +1,74 @@
+import numpy as np
+
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import SweepEngine
+from backend.optimizer.tpe import Categorical, Float, Int, propose, run_tpe_search, sample_random
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+SPACE = {
+    "sl_atr": Float(0.5, 5.0, step=0.01),
+    "period": Int(5, 50),
+    "skip_adx_filter": Categorical([True, False]),
+    "adx_threshold": Int(15, 35, when={"skip_adx_filter": [False]}),
+}
+
+
+def _objective(params):
+    score = -(params["sl_atr"] - 3.2) ** 2 - ((params["period"] - 20) / 10) ** 2
+    if not params["skip_adx_filter"]:
+        score -= abs(params["adx_threshold"] - 25) / 10
+    return score
+
+
+def test_conditional_params_only_when_active():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        params = sample_random(SPACE, rng)
+        assert ("adx_threshold" in params) == (params["skip_adx_filter"] is False)
+        assert isinstance(params["period"], int) and 5 <= params["period"] <= 50
+
+
+def test_tpe_beats_random_search():
+    def best_of(use_model, seed):
+        rng = np.random.default_rng(seed)
+        observations = []
+        for _ in range(60):
+            params = propose(SPACE, observations, rng) if use_model else sample_random(SPACE, rng)
+            observations.append((params, _objective(params)))
+        return max(score for _, score in observations)
+
+    tpe = np.mean([best_of(True, s) for s in range(5)])
+    rand = np.mean([best_of(False, s) for s in range(5)])
+    assert tpe > rand
+
+
+def test_search_records_trials_and_warm_starts(tmp_path, make_bars):
+    data = make_bars(800)
+    space = {"entry_period": Int(5, 40), "exit_period": Int(3, 15),
+             "stop_loss_atr": Float(1.0, 4.0, step=0.1)}
+    tracker = ExperimentTracker(str(tmp_path / "tpe.db"))
+    engine = SweepEngine(tracker=tracker)
+
+    first = run_tpe_search(engine, DonchianBreakoutStrategy, space, "GLD", "1h",
+                           "2023-01-01", "2023-03-31", n_trials=6, batch_size=3,
+                           fixed_params={"atr_period": 14}, verbose=False, data=data)
+    assert len(first) == 6 == tracker.count()
+    assert all(r["params"]["atr_period"] == 14 for r in first)
+
+    run_tpe_search(engine, DonchianBreakoutStrategy, space, "GLD", "1h",
+                   "2023-01-01", "2023-03-31", n_trials=4, batch_size=2,
+                   fixed_params={"atr_period": 14}, verbose=False, data=data)
+    hashes = [ExperimentTracker.params_hash(e["parameters"])
+              for e in tracker.get_experiments_for("DonchianBreakoutStrategy", "GLD", "1h")]
+    assert len(hashes) == 10 == len(set(hashes))
+
+
+def test_search_stops_when_the_space_is_exhausted(tmp_path, make_bars):
+    space = {"entry_period": Categorical([10, 20]), "stop_loss_atr": Categorical([1.5, 2.0])}
+    tracker = ExperimentTracker(str(tmp_path / "tpe.db"))
+    results = run_tpe_search(SweepEngine(tracker=tracker), DonchianBreakoutStrategy, space,
+                             "GLD", "1h", "2023-01-01", "2023-03-31", n_trials=10, batch_size=3,
+                             fixed_params={"exit_period": 5, "atr_period": 14},
+                             verbose=False, data=make_bars(800))
+    assert len(results) == 4 == tracker.count()
+    assert len({ExperimentTracker.params_hash(r["params"]) for r in results}) == 4
@@ -0,0 +1,103 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from backend.engine import data_utils
+from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.bar_transport import FixtureTransport
+from backend.optimizer import pipeline, validation, validation_pool
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.pipeline import validate_candidate
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+BASE = {"entry_period": 20, "exit_period": 10, "atr_period": 14}
+DRIFT = 0.2
+
+
+def _patch_loads(monkeypatch):
+    idx = pd.date_range("2020-01-01", "2025-12-31", freq="D", tz="UTC")
+    frames = {}
+    for seed, symbol in enumerate(["GLD", "SLV", "IAU"]):
+        close = 100 + np.cumsum(np.random.default_rng(seed).normal(DRIFT, 1.0, len(idx)))
+        frames[(symbol, "1d")] = pd.DataFrame({"Open": close, "High": close + 1.0,
+                                               "Low": close - 1.0, "Close": close,
+                                               "Volume": 1000.0}, index=idx)
+    loader = AlpacaDataLoader(transport=FixtureTransport(frames), use_store=False)
+    original = data_utils.load_backtest_data
+    calls = []
+
+    def load(symbol, timeframe, start, end):
+        calls.append((symbol, timeframe, start, end))
+        return original(symbol, timeframe, start, end, loader=loader)
+
+    for module in (data_utils, validation, validation_pool):
+        monkeypatch.setattr(module, "load_backtest_data", load)
+    return calls
+
+
+def _candidates(tracker):
+    for stop in (1.5, 3.0):
+        tracker.save("test", "DonchianBreakoutStrategy", "GLD", "1d",
+                     {**BASE, "stop_loss_atr": stop}, {"total_trades": 40})
+    tracker.save("test", "DonchianBreakoutStrategy", "XYZ", "1d",
+                 {**BASE, "stop_loss_atr": 2.0}, {"total_trades": 40})
+    tracker.save("test", "NoSuchStrategy", "GLD", "1d", {}, {"total_trades": 40})
+    return _rows(tracker)
+
+
+def _rows(tracker):
+    conn = sqlite3.connect(tracker.db_file)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM experiments ORDER BY id").fetchall()
+    conn.close()
+    return [tracker._row_to_dict(r) for r in rows]
+
+
+def test_pool_matches_sequential_validation(tmp_path, monkeypatch):
+    calls = _patch_loads(monkeypatch)
+    # Let candidates through to the later steps (random walks rarely pass)
+    monkeypatch.setattr(pipeline, "passes_disqualification", lambda *a, **k: (True, None))
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    candidates = _candidates(tracker)
+
+    expected = [validate_candidate(DonchianBreakoutStrategy, c["parameters"], c["symbol"], "1d",
+                                   verbose=False) for c in candidates[:3]]
+    assert "multi_asset" in expected[0]
+    assert expected[2] == {"status": "REJECTED", "reason": "no_data"}
+
+    for workers in (1, 2):
+        calls.clear()
+        out = {k: (v, e) for k, v, e, _ in validation_pool.validate_candidates(
+            candidates, workers=workers, tracker=tracker)}
+        assert sorted(out) == list(range(4))
+        assert [out[k][0] for k in range(3)] == expected
+        assert out[3][0] is None and "NoSuchStrategy" in out[3][1]
+        # Each asset is loaded once, whatever the number of candidates on it
+        assert len(calls) == len(set(calls))
+
+    statuses = [row["validation_status"] for row in _rows(tracker)]
+    assert statuses == [v["status"].lower() for v in expected] + ["pending"]
+
+
+def test_candidates_share_full_period_indicators(tmp_path, monkeypatch):
+    _patch_loads(monkeypatch)
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    candidates = _candidates(tracker)[:2]
+
+    precomputed = []
+    original = DonchianBreakoutStrategy.precompute_indicators.__func__
+    monkeypatch.setattr(DonchianBreakoutStrategy, "precompute_indicators",
+                        classmethod(lambda cls, d, p: precomputed.append(1) or original(cls, d, p)))
+    list(validation_pool.validate_candidates(candidates))
+    assert len(precomputed) == 1
+
+
+def test_should_stop_starts_no_new_candidates(tmp_path, monkeypatch):
+    _patch_loads(monkeypatch)
+    tracker = ExperimentTracker(str(tmp_path / "research.db"))
+    candidates = _candidates(tracker)
+    started = []
+    out = list(validation_pool.validate_candidates(
+        candidates, should_stop=lambda: started.append(1) or len(started) > 3))
+    assert len(out) == 3
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.bar_transport import FixtureTransport
+from backend.engine.data_utils import load_backtest_data
+from backend.optimizer import validation
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+PARAMS = {"entry_period": 20, "exit_period": 10, "stop_loss_atr": 2.0, "atr_period": 14}
+
+
+def _loader():
+    idx = pd.date_range("2020-01-01", "2022-12-31 23:00", freq="h", tz="UTC")
+    close = 100 + np.cumsum(np.random.default_rng(5).normal(0, 0.3, len(idx)))
+    bars = pd.DataFrame({"Open": close, "High": close + 0.4, "Low": close - 0.4,
+                         "Close": close, "Volume": 100.0}, index=idx)
+    return AlpacaDataLoader(transport=FixtureTransport({("GLD", "1h"): bars}), use_store=False)
+
+
+def test_slice_period_matches_separate_load():
+    loader = _loader()
+    full = load_backtest_data("GLD", "4h", "2020-01-01", "2022-12-31", loader=loader)
+    for start, end in [("2020-01-01", "2020-12-31"), ("2021-03-15", "2022-06-30")]:
+        expected = load_backtest_data("GLD", "4h", start, end, loader=loader)
+        sliced = validation.slice_period(full, start, end)
+        assert sliced.index.equals(expected.index)
+        np.testing.assert_allclose(sliced.to_numpy(), expected.to_numpy())
+
+
+def test_walk_forward_loads_once_and_matches_per_window_runs(monkeypatch):
+    loader = _loader()
+    calls = []
+    monkeypatch.setattr(validation, "load_backtest_data",
+                        lambda *a: calls.append(a) or load_backtest_data(*a, loader=loader))
+
+    wf = validation.walk_forward(DonchianBreakoutStrategy, PARAMS, "GLD", "4h",
+                                 train_years=1, test_years=1, start_year=2020, end_year=2022,
+                                 workers=2)
+    assert len(calls) == 1
+    assert [w["test_period"] for w in wf["windows"]] == \
+        ["2021-01-01 to 2021-12-31", "2022-01-01 to 2022-12-31"]
+
+    params = {**PARAMS, "symbol": "GLD"}
+    for w in wf["windows"]:
+        train_start, train_end = w["train_period"].split(" to ")
+        test_start, test_end = w["test_period"].split(" to ")
+        train = validation._run_backtest(DonchianBreakoutStrategy, params, load_backtest_data(
+            "GLD", "4h", train_start, train_end, loader=loader), "4h")
+        test = validation._run_backtest(DonchianBreakoutStrategy, params, load_backtest_data(
+            "GLD", "4h", test_start, test_end, loader=loader), "4h")
+        assert (w["train_return"], w["test_return"], w["test_trades"]) == \
+            (train["return_pct"], test["return_pct"], test["total_trades"])
+        assert w["test_sharpe"] == validation.calc_sharpe(test["equity_curve"])
@@ -0,0 +1,110 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from backend.engine.alpaca_loader import AlpacaDataLoader
+from backend.engine.bar_transport import FixtureTransport
+from backend.optimizer.experiment_tracker import ExperimentTracker
+from backend.optimizer.sweep import run_combo, suppress_stdout
+from backend.optimizer.work_queue import (
+    WorkQueue, composable_jobs, enqueue_untested, run_worker, start_workers, sweep_jobs,
+)
+from backend.strategies.donchian_breakout import DonchianBreakoutStrategy
+
+GRID = {
+    "entry_period": [10, 20],
+    "exit_period": [5],
+    "stop_loss_atr": [1.5, 2.0, 3.0],
+    "atr_period": [14],
+}
+
+
+def _jobs(symbols=("GLD",)):
+    return sweep_jobs(DonchianBreakoutStrategy, GRID, list(symbols), ["1h"],
+                      "2023-01-01", "2023-03-01")
+
+
+def test_leases_expire_and_requeue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "research.db"), lease_seconds=-1, max_attempts=2)
+    added, skipped = enqueue_untested(queue, _jobs())
+    assert (added, skipped) == (6, 0)
+    assert enqueue_untested(queue, _jobs())[0] == 0  # idempotent
+
+    first = queue.claim("a", limit=4)
+    assert len(first) == 4 and queue.status() == {"queued": 2, "running": 4}
+    # "a" never heartbeats: its jobs come back (ahead of the rest) on the next claim
+    second = queue.claim("b", limit=4)
+    assert [j["id"] for j in second] == [j["id"] for j in first]
+    assert all(j["attempts"] == 2 for j in second)
+
+    # A finish from the worker that lost the lease is ignored
+    queue.finish("a", first[0]["id"])
+    assert queue.status()["running"] == 4
+
+    # Out of attempts: expired jobs are failed instead of requeued
+    third = queue.claim("c", limit=4)
+    assert len(third) == 2 and not {j["id"] for j in third} & {j["id"] for j in first}
+    assert queue.status() == {"failed": 4, "running": 2}
+
+
+def test_worker_processes_drain_the_queue(tmp_path, make_bars):
+    db = str(tmp_path / "research.db")
+    data = make_bars(700, seed=8)
+    frames = {(symbol, "1h"): data for symbol in ("GLD", "SLV")}
+    loader = AlpacaDataLoader(transport=FixtureTransport(frames), use_store=False)
+
+    queue = WorkQueue(db)
+    assert enqueue_untested(queue, _jobs(("GLD", "SLV")))[0] == 12
+    queue.enqueue(composable_jobs(["GLD"], ["1h"], "2023-01-01", "2023-03-01", limit=2))
+
+    assert start_workers(3, db, loader=loader) == [0, 0, 0]
+    assert queue.status() == {"done": 14}
+
+    tracker = ExperimentTracker(db)
+    rows = _experiments(db)
+    assert len(rows) == 14
+    assert len({(r["strategy"], r["symbol"], r["params_hash"]) for r in rows}) == 14
+    assert sum(r["strategy_source"] == "composable" for r in rows) == 2
+
+    # Same numbers as a local backtest of the same combo
+    window = data[(data.index >= pd.Timestamp("2023-01-01", tz="UTC"))
+                  & (data.index < pd.Timestamp("2023-03-01", tz="UTC"))]
+    for r in rows:
+        if r["strategy"] != "DonchianBreakoutStrategy":
+            continue
+        with suppress_stdout():
+            local = run_combo(window.copy(), DonchianBreakoutStrategy,
+                              tracker._row_to_dict(r)["parameters"], "1h")
+        assert (r["return_pct"], r["total_trades"]) == (local["return_pct"], local["total_trades"])
+
+    # Everything is tested now: nothing new to enqueue
+    assert enqueue_untested(WorkQueue(db), _jobs(("GLD", "SLV")))[0] == 0
+
+
+def _experiments(db):
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT * FROM experiments ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_failed_chunk_commit_requeues_its_jobs(tmp_path, make_bars):
+    db = str(tmp_path / "research.db")
+    frames = {("GLD", "1h"): make_bars(700, seed=8)}
+    loader = AlpacaDataLoader(transport=FixtureTransport(frames), use_store=False)
+    queue = WorkQueue(db)
+    queue.enqueue(_jobs())
+    ExperimentTracker(db)
+    conn = sqlite3.connect(db)
+    conn.execute("""CREATE TRIGGER no_results BEFORE INSERT ON experiments
+                    BEGIN SELECT RAISE(ABORT, 'results rejected'); END""")
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        run_worker(db, worker_id="w", loader=loader, verbose=False)
+    # Neither the results nor the 'done' marks were written
+    assert queue.status() == {"queued": 6}
+    assert _experiments(db) == []
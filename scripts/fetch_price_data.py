@@ -30,6 +30,10 @@ def fetch_and_store(symbol, start, end, loader, db):
         print(f", last bar={existing_end}", end='')
     print()
 
+    # Only fetch what's missing past the stored tail (bulk insert ignores overlaps)
+    if max_ts and min_ts <= int(datetime.strptime(start, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()):
+        start = max(start, existing_end)
+
     print(f"{symbol}: fetching {TIMEFRAME} bars from {start} to {end} ...")
     df = loader.fetch_data(symbol, TIMEFRAME, start, end)
 
@@ -41,7 +45,7 @@ def fetch_and_store(symbol, start, end, loader, db):
     min_ts2, max_ts2, count2 = db.get_price_data_range(symbol)
     first = datetime.fromtimestamp(min_ts2, tz=timezone.utc).strftime('%Y-%m-%d')
     last = datetime.fromtimestamp(max_ts2, tz=timezone.utc).strftime('%Y-%m-%d')
-    print(f"{symbol}: inserted {saved} rows → total {count2} bars ({first} to {last})")
+    print(f"{symbol}: inserted {saved} new rows → total {count2} bars ({first} to {last})")
 
 
 def main():